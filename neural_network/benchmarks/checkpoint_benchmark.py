@@ -0,0 +1,68 @@
+# benchmarks/checkpoint_benchmark.py
+
+import argparse
+import numpy as np
+
+from ..core.model import Sequential
+from ..core.objective import SoftmaxCrossEntropyWithLogits
+from ..core.profiler import peak_memory
+from ..layers.activations import ReluLayer
+from ..layers.basic import FlattenLayer
+from ..layers.convolution import Conv3DLayer
+from ..layers.dense import FullyConnectedLayer
+from ..utils.optimizers import SGD
+from .conv_benchmark import best_time
+
+def deep_cnn(depth, channels, size, classes=10):
+    """A stack of padded depthwise Conv3D + ReLU blocks with a dense head."""
+    np.random.seed(0)
+    layers = []
+    for _ in range(depth):
+        layers += [Conv3DLayer(1, (3, 3), padding=1), ReluLayer()]
+    return Sequential(layers + [FlattenLayer(), FullyConnectedLayer(channels * size * size, classes)])
+
+def run(depth=32, batch_size=32, channels=8, size=16, segments=(None, 2, 4, 8), repeat=3):
+    """
+    Peak training-step memory and step time for each checkpointing setting.
+
+    Returns:
+        List of dicts with the segment setting, peak bytes, step seconds, the
+        memory saved and the extra compute relative to no checkpointing
+    """
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((batch_size, channels, size, size))
+    Y = np.eye(10)[rng.integers(0, 10, batch_size)]
+    objective, optimizer = SoftmaxCrossEntropyWithLogits(), SGD(1e-3)
+
+    results = []
+    for setting in segments:
+        model = deep_cnn(depth, channels, size).setCheckpointing(setting)
+        step = lambda: model.trainStep(X, Y, objective, optimizer)
+        step()
+        model.clearCaches()
+        _, peak = peak_memory(step)
+        model.clearCaches()
+        results.append({"segments": setting, "peak_bytes": peak, "step_s": best_time(step, repeat)})
+
+    base = results[0]
+    for r in results:
+        r["memory_saved"] = 1 - r["peak_bytes"] / base["peak_bytes"]
+        r["extra_compute"] = r["step_s"] / base["step_s"] - 1
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory and compute of gradient checkpointing.")
+    parser.add_argument("--depth", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--size", type=int, default=16)
+    parser.add_argument("--segments", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"{'segments':>8} {'peak (MiB)':>11} {'step (ms)':>10} {'memory saved':>13} {'extra compute':>14}")
+    for r in run(args.depth, args.batch_size, args.channels, args.size, [None] + args.segments):
+        print(f"{str(r['segments'] or 'off'):>8} {r['peak_bytes']/2**20:>11.2f} {r['step_s']*1e3:>10.2f} "
+              f"{r['memory_saved']:>12.0%} {r['extra_compute']:>13.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# benchmarks/conv_benchmark.py
+
+import argparse
+import time
+import numpy as np
+
+from ..layers.convolution import Conv2DLayer, Conv3DLayer
+from ..utils.conv_algorithms import ConvAutotuner
+
+def best_time(fn, repeat):
+    """Best wall time of `repeat` calls to fn, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def run(batch_sizes=(8, 32, 128), channels=3, size=28, filters=16, kernel=3, repeat=3):
+    """
+    Time the per-sample reference convolution against the batched engine.
+
+    Returns:
+        List of dicts with the layer, batch size, both timings and the speedup
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for name, layer, shape in [
+        ("Conv2DLayer", Conv2DLayer(filters, (kernel, kernel)), (size, size)),
+        ("Conv3DLayer", Conv3DLayer(filters, (kernel, kernel)), (channels, size, size)),
+    ]:
+        for n in batch_sizes:
+            X = rng.standard_normal((n,) + shape)
+            reference = best_time(lambda: layer.convolve(X, layer.kernel, layer.padding, layer.stride), repeat)
+            engine = best_time(lambda: layer.forward(X), repeat)
+            results.append({
+                "layer": name,
+                "batch": n,
+                "reference_s": reference,
+                "engine_s": engine,
+                "speedup": reference / engine,
+            })
+    return results
+
+def run_algorithms(kernels=(3, 5, 7, 11), batch=16, channels=3, size=64, filters=8, repeat=3):
+    """
+    Time each applicable forward algorithm (direct GEMM, FFT, Winograd) on
+    Conv3DLayer-shaped problems with "same" padding, per kernel size.
+
+    Returns:
+        List of dicts with the kernel size, per-algorithm seconds and the
+        algorithm the autotuner would pick
+    """
+    rng = np.random.default_rng(0)
+    tuner = ConvAutotuner(repeat=repeat)
+    X = rng.standard_normal((batch, channels, size, size))
+    results = []
+    for k in kernels:
+        kernel = rng.standard_normal((filters, k, k))
+        times = tuner.benchmark(X, kernel, 1, k // 2)
+        results.append({"kernel": k, "times_s": times, "best": min(times, key=times.get)})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched convolution engine.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--size", type=int, default=28)
+    parser.add_argument("--filters", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--algorithms", action="store_true",
+                        help="compare the direct, FFT and Winograd forward algorithms instead")
+    args = parser.parse_args()
+
+    if args.algorithms:
+        print(f"{'kernel':>6} {'direct (ms)':>12} {'fft (ms)':>10} {'winograd (ms)':>14} {'best':>9}")
+        for r in run_algorithms(filters=args.filters, size=args.size, repeat=args.repeat):
+            winograd = r["times_s"].get("winograd")
+            winograd = f"{winograd*1e3:>14.2f}" if winograd is not None else f"{'-':>14}"
+            print(f"{r['kernel']:>6} {r['times_s']['direct']*1e3:>12.2f} {r['times_s']['fft']*1e3:>10.2f} "
+                  f"{winograd} {r['best']:>9}")
+        return
+
+    print(f"{'layer':<12} {'batch':>6} {'reference (ms)':>15} {'engine (ms)':>12} {'speedup':>8}")
+    for r in run(args.batch_sizes, size=args.size, filters=args.filters, repeat=args.repeat):
+        print(f"{r['layer']:<12} {r['batch']:>6} {r['reference_s']*1e3:>15.2f} "
+              f"{r['engine_s']*1e3:>12.2f} {r['speedup']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# benchmarks/optimizer_benchmark.py
+
+import argparse
+
+from ..layers.dense import FullyConnectedLayer
+from ..utils.optimizers import Adam
+from ..utils.parameters import ParameterBuffer
+from .conv_benchmark import best_time
+
+def run(depths=(4, 16, 64), width=32, steps=50, repeat=3):
+    """
+    Time Adam steps over per-layer arrays against the same MLP flattened
+    into one ParameterBuffer.
+
+    Returns:
+        List of dicts with the depth, both timings per step and the speedup
+    """
+    results = []
+    for depth in depths:
+        layers = [FullyConnectedLayer(width, width) for _ in range(depth)]
+        per_array = Adam()
+        per_array_s = best_time(lambda: [per_array.step(layers) for _ in range(steps)], repeat) / steps
+
+        flat_layers = [FullyConnectedLayer(width, width) for _ in range(depth)]
+        buffer = ParameterBuffer(flat_layers)
+        flat = Adam()
+        flat_s = best_time(lambda: [flat.step([buffer]) for _ in range(steps)], repeat) / steps
+
+        results.append({
+            "depth": depth,
+            "per_array_s": per_array_s,
+            "flat_s": flat_s,
+            "speedup": per_array_s / flat_s,
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark flat parameter buffers against per-array updates.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--width", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'depth':>6} {'per-array (us)':>15} {'flat (us)':>10} {'speedup':>8}")
+    for r in run(args.depths, args.width, repeat=args.repeat):
+        print(f"{r['depth']:>6} {r['per_array_s']*1e6:>15.1f} {r['flat_s']*1e6:>10.1f} {r['speedup']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/parallel_benchmark.py
+
+import argparse
+import os
+import time
+import numpy as np
+
+from ..core.model import Sequential
+from ..core.objective import SquaredError
+from ..core.parallel import DataParallel
+from ..layers.activations import ReluLayer
+from ..layers.dense import FullyConnectedLayer
+from ..utils.optimizers import SGD
+
+def make_model(width, depth, seed=0):
+    np.random.seed(seed)
+    layers = []
+    for _ in range(depth):
+        layers += [FullyConnectedLayer(width, width), ReluLayer()]
+    return Sequential(layers + [FullyConnectedLayer(width, 1)])
+
+def throughput(trainer, X, Y, steps):
+    """Samples per second over `steps` training steps, after one warm-up step."""
+    objective, optimizer = SquaredError(), SGD(1e-4)
+    trainer.trainStep(X, Y, objective, optimizer)
+    start = time.perf_counter()
+    for _ in range(steps):
+        trainer.trainStep(X, Y, objective, optimizer)
+    return steps * len(X) / (time.perf_counter() - start)
+
+def run(workers=(1, 2, 4), batch_size=1024, width=512, depth=4, steps=10):
+    """
+    Measure data-parallel training throughput for each worker count.
+
+    Returns:
+        List of dicts with the worker count, samples/sec, the speedup over one
+        worker and the scaling efficiency (speedup / workers). The single
+        process baseline is reported as workers=0.
+    """
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((batch_size, width))
+    Y = rng.standard_normal((batch_size, 1))
+
+    results = [{"workers": 0, "samples_per_sec": throughput(make_model(width, depth), X, Y, steps)}]
+    for n in workers:
+        with DataParallel(make_model(width, depth), workers=n) as parallel:
+            results.append({"workers": n, "samples_per_sec": throughput(parallel, X, Y, steps)})
+
+    base = next((r["samples_per_sec"] for r in results if r["workers"] == 1), results[0]["samples_per_sec"])
+    for r in results[1:]:
+        r["speedup"] = r["samples_per_sec"] / base
+        r["efficiency"] = r["speedup"] / r["workers"]
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark data-parallel training scaling.")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=[n for n in (1, 2, 4, 8, 16, 32) if n <= (os.cpu_count() or 1)])
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--width", type=int, default=512)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'samples/sec':>12} {'speedup':>8} {'efficiency':>11}")
+    for r in run(args.workers, args.batch_size, args.width, args.depth, args.steps):
+        if r["workers"] == 0:
+            print(f"{'single':>8} {r['samples_per_sec']:>12.0f}")
+        else:
+            print(f"{r['workers']:>8} {r['samples_per_sec']:>12.0f} {r['speedup']:>7.2f}x {r['efficiency']:>10.0%}")
+
+if __name__ == "__main__":
+    main()
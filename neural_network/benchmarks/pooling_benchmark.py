@@ -0,0 +1,53 @@
+# benchmarks/pooling_benchmark.py
+
+import argparse
+import numpy as np
+
+from ..layers.pooling import PoolingLayer
+from .conv_benchmark import best_time
+
+def run(batch_sizes=(8, 32, 128), channels=16, size=28, pool=2, repeat=3):
+    """
+    Time the per-channel reference max pooling against the batched engine,
+    forward and backward.
+
+    Returns:
+        List of dicts with the pass, batch size, both timings and the speedup
+    """
+    rng = np.random.default_rng(0)
+    layer = PoolingLayer(pool, pool)
+    results = []
+    for n in batch_sizes:
+        X = rng.standard_normal((n, channels, size, size))
+        G = rng.standard_normal(layer.forward(X).shape)
+        cases = [
+            ("forward", lambda: layer.pool(X), lambda: layer.forward(X)),
+            ("backward", lambda: layer.referenceBackward(G, X), lambda: layer.backward(G)),
+        ]
+        for name, reference_fn, engine_fn in cases:
+            reference = best_time(reference_fn, repeat)
+            engine = best_time(engine_fn, repeat)
+            results.append({
+                "pass": name,
+                "batch": n,
+                "reference_s": reference,
+                "engine_s": engine,
+                "speedup": reference / engine,
+            })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the batched pooling engine.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--size", type=int, default=28)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'pass':<9} {'batch':>6} {'reference (ms)':>15} {'engine (ms)':>12} {'speedup':>8}")
+    for r in run(args.batch_sizes, args.channels, args.size, repeat=args.repeat):
+        print(f"{r['pass']:<9} {r['batch']:>6} {r['reference_s']*1e3:>15.2f} "
+              f"{r['engine_s']*1e3:>12.2f} {r['speedup']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/quantization_benchmark.py
+
+import argparse
+import numpy as np
+
+from ..layers.quantized import quantize
+from ..utils.quantization import quantization_report
+from .conv_benchmark import best_time
+from .serving_benchmark import mlp
+
+def run(batch_sizes=(1, 32, 256), features=784, hidden=1024, repeat=5):
+    """
+    Predict latency of a float64 MLP against its int8 quantization, plus the
+    accuracy report of the quantized model on held-out inputs.
+
+    Returns:
+        (list of dicts with batch size, both timings and the speedup, report dict)
+    """
+    X = np.random.default_rng(0).standard_normal((2048, features))
+    model = mlp(X, hidden)
+    quantized = quantize(model, X[:512])
+    report = quantization_report(model, quantized, X[512:])
+    results = []
+    for n in batch_sizes:
+        batch = X[:n]
+        float_s = best_time(lambda: model.predict(batch), repeat)
+        int8_s = best_time(lambda: quantized.predict(batch), repeat)
+        results.append({"batch": n, "float_s": float_s, "int8_s": int8_s, "speedup": float_s / int8_s})
+    return results, report
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark int8 quantized dense inference.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32, 256])
+    parser.add_argument("--hidden", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results, report = run(args.batch_sizes, hidden=args.hidden, repeat=args.repeat)
+    print(f"{'batch':>6} {'float64 (ms)':>13} {'int8 (ms)':>10} {'speedup':>8}")
+    for r in results:
+        print(f"{r['batch']:>6} {r['float_s']*1e3:>13.2f} {r['int8_s']*1e3:>10.2f} {r['speedup']:>7.2f}x")
+    print(f"weights: {report['float_bytes'] / 2**20:.2f} MiB -> {report['quantized_bytes'] / 2**20:.2f} MiB "
+          f"({report['compression']:.1f}x), relative output error {report['relative_error']:.2e}")
+
+if __name__ == "__main__":
+    main()
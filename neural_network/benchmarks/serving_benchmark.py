@@ -0,0 +1,56 @@
+# benchmarks/serving_benchmark.py
+
+import argparse
+import asyncio
+import numpy as np
+
+from ..core.model import Sequential
+from ..layers.activations import ReluLayer
+from ..layers.basic import InputLayer
+from ..layers.dense import FullyConnectedLayer
+from ..utils.serving import BatchingServer, synthetic_load
+
+def mlp(X, hidden=512, classes=10):
+    np.random.seed(0)
+    return Sequential([InputLayer(X), FullyConnectedLayer(X.shape[1], hidden), ReluLayer(),
+                       FullyConnectedLayer(hidden, hidden), ReluLayer(), FullyConnectedLayer(hidden, classes)])
+
+async def serve(model, X, max_batch_size, max_delay, requests, concurrency, rate):
+    async with BatchingServer(model, max_batch_size, max_delay) as server:
+        await synthetic_load(server, X, requests, concurrency, rate)
+        return server.stats()
+
+def run(batch_sizes=(1, 8, 32, 128), max_delay=0.002, requests=2000, concurrency=128, rate=None, features=784):
+    """
+    Latency and throughput of the micro-batching server under synthetic load
+    for each maximum batch size; a maximum of 1 is unbatched serving.
+
+    Returns:
+        List of BatchingServer.stats() dicts with the "max_batch_size" added
+    """
+    X = np.random.default_rng(0).standard_normal((1024, features))
+    model = mlp(X)
+    results = []
+    for size in batch_sizes:
+        stats = asyncio.run(serve(model, X, size, max_delay, requests, concurrency, rate))
+        results.append({"max_batch_size": size, **stats})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and throughput of micro-batched serving.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--max-delay", type=float, default=0.002, help="seconds a request may wait for a batch")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=128, help="closed-loop clients")
+    parser.add_argument("--rate", type=float, help="open-loop Poisson arrival rate (requests/s) instead")
+    parser.add_argument("--features", type=int, default=784)
+    args = parser.parse_args()
+
+    print(f"{'max batch':>9} {'mean batch':>11} {'req/s':>9} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for r in run(args.batch_sizes, args.max_delay, args.requests, args.concurrency, args.rate, args.features):
+        latency = r["latency_ms"]
+        print(f"{r['max_batch_size']:>9} {r['mean_batch_size']:>11.1f} {r['throughput_rps']:>9.0f} "
+              f"{latency['p50']:>8.2f} {latency['p90']:>8.2f} {latency['p99']:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+# benchmarks/suite.py
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+from ..core.model import Sequential
+from ..core.objective import (SquaredError, LogLoss, CrossEntropy, NegativeLikelihood,
+                              SoftmaxCrossEntropyWithLogits, SigmoidCrossEntropyWithLogits)
+from ..layers.activations import ReluLayer, LogisticSigmoidLayer, SoftmaxLayer, TanhLayer
+from ..layers.basic import InputLayer, FlattenLayer
+from ..layers.convolution import Conv2DLayer, Conv3DLayer, ConvLayer
+from ..layers.dense import FullyConnectedLayer
+from ..layers.normalization import BatchNormLayer, LayerNormLayer
+from ..layers.pooling import PoolingLayer
+from ..layers.regularization import DropoutLayer
+from ..utils.optimizers import Adam
+
+# Parameter grids. "quick" is meant for CI and pre-merge checks, "full" for
+# release comparisons.
+GRIDS = {
+    "quick": {"batch": [8, 64], "features": [256], "channels": [3], "size": [16], "classes": [10]},
+    "full": {"batch": [1, 8, 64, 256], "features": [64, 256, 1024], "channels": [1, 3, 16],
+             "size": [16, 32], "classes": [10, 1000]},
+}
+
+def measure(fn, min_time=0.05, repeat=5):
+    """
+    Time fn like timeit: pick a loop count that runs for at least min_time,
+    then take `repeat` samples of that many loops.
+
+    Returns:
+        Dict with the median and minimum seconds per call and the loop count
+    """
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - start) / loops)
+    return {"median_s": float(np.median(samples)), "min_s": min(samples), "loops": loops}
+
+def grid(values, *names):
+    """Every combination of the named grid axes as dicts."""
+    for combo in itertools.product(*(values[name] for name in names)):
+        yield dict(zip(names, combo))
+
+def benchmark_key(name, phase, params):
+    return f"{name}/{phase}[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+def layer_case(layer, X):
+    """Forward and backward callables for one layer and input; backward includes parameter gradients."""
+    rng = np.random.default_rng(1)
+    out = layer.forward(X)
+    G = rng.standard_normal(np.shape(out))
+
+    def backward():
+        layer.computeGradients(G)
+        layer.backward(G)
+
+    return {"forward": lambda: layer.forward(X), "backward": backward}
+
+def layer_cases(values):
+    """(name, params, layer factory, input shape) for every layer benchmark in the grid."""
+    for p in grid(values, "batch", "features"):
+        n, k = p["batch"], p["features"]
+        yield "FullyConnectedLayer", p, lambda k=k: FullyConnectedLayer(k, k), (n, k)
+        for cls in (ReluLayer, LogisticSigmoidLayer, SoftmaxLayer, TanhLayer):
+            yield cls.__name__, p, cls, (n, k)
+        yield "DropoutLayer", p, lambda: DropoutLayer(0.5), (n, k)
+        yield "BatchNormLayer", p, lambda k=k: BatchNormLayer(k), (n, k)
+        yield "LayerNormLayer", p, lambda k=k: LayerNormLayer(k), (n, k)
+    for p in grid(values, "batch", "channels", "size"):
+        n, c, s = p["batch"], p["channels"], p["size"]
+        yield "Conv2DLayer", p, lambda c=c: Conv2DLayer(max(c, 4), (3, 3), padding=1), (n, s, s)
+        yield "Conv3DLayer", p, lambda: Conv3DLayer(4, (3, 3), padding=1), (n, c, s, s)
+        yield "ConvLayer", p, lambda c=c: ConvLayer(c, 16, 3, padding=1), (n, c, s, s)
+        yield "DepthwiseConvLayer", p, lambda c=c: ConvLayer(c, c, 3, padding=1, groups=c), (n, c, s, s)
+        yield "BatchNorm2DLayer", p, lambda c=c: BatchNormLayer(c), (n, c, s, s)
+        yield "PoolingLayer", p, lambda: PoolingLayer(2, 2), (n, c, s, s)
+        yield "FlattenLayer", p, FlattenLayer, (n, c, s, s)
+
+def objective_cases(values):
+    for p in grid(values, "batch", "classes"):
+        yield p, [SquaredError(), LogLoss(), CrossEntropy(), NegativeLikelihood(),
+                  SoftmaxCrossEntropyWithLogits(), SigmoidCrossEntropyWithLogits()]
+
+def mlp(X, classes):
+    return Sequential([InputLayer(X), FullyConnectedLayer(X.shape[1], 256), ReluLayer(),
+                       FullyConnectedLayer(256, 128), ReluLayer(), FullyConnectedLayer(128, classes)])
+
+def cnn(X, classes):
+    s = X.shape[1] // 2
+    return Sequential([InputLayer(X), Conv2DLayer(8, (3, 3), padding=1), ReluLayer(), PoolingLayer(2, 2),
+                       FlattenLayer(), FullyConnectedLayer(8 * s * s, 64), ReluLayer(),
+                       FullyConnectedLayer(64, classes)])
+
+def run(grid_name="quick", pattern=None, min_time=0.05, repeat=5):
+    """
+    Run every benchmark in a grid.
+
+    Args:
+        grid_name (str): Key of GRIDS
+        pattern (str): Only run benchmarks whose key contains this substring
+        min_time (float): Minimum seconds per timing sample
+        repeat (int): Timing samples per benchmark
+
+    Returns:
+        List of result dicts with a unique "key", the benchmark "name",
+        "phase", "params" and the timings from measure()
+    """
+    values = GRIDS[grid_name]
+    rng = np.random.default_rng(0)
+    results = []
+
+    def selected(name, phase, params):
+        return pattern is None or pattern in benchmark_key(name, phase, params)
+
+    def record(name, phase, params, fn):
+        if selected(name, phase, params):
+            results.append({"key": benchmark_key(name, phase, params), "name": name, "phase": phase,
+                            "params": params, **measure(fn, min_time, repeat)})
+
+    for name, params, factory, shape in layer_cases(values):
+        if not (selected(name, "forward", params) or selected(name, "backward", params)):
+            continue
+        np.random.seed(0)
+        case = layer_case(factory(), rng.standard_normal(shape))
+        for phase, fn in case.items():
+            record(name, phase, params, fn)
+
+    for params, objectives in objective_cases(values):
+        n, k = params["batch"], params["classes"]
+        Y = np.eye(k)[rng.integers(0, k, n)]
+        logits = rng.standard_normal((n, k))
+        probs = np.exp(logits) / np.sum(np.exp(logits), axis=1, keepdims=True)
+        for objective in objectives:
+            Yhat = logits if "WithLogits" in type(objective).__name__ else probs
+            record(type(objective).__name__, "eval", params, lambda o=objective, Yhat=Yhat: o.eval(Y, Yhat))
+            record(type(objective).__name__, "gradient", params,
+                   lambda o=objective, Yhat=Yhat: o.gradient(Y, Yhat))
+
+    for params in grid(values, "batch"):
+        n = params["batch"]
+        for name, build, X in (("MLP", mlp, rng.standard_normal((n, 784))),
+                               ("CNN", cnn, rng.standard_normal((n, 28, 28)))):
+            if not selected(name, "train_step", params):
+                continue
+            Y = np.eye(10)[rng.integers(0, 10, n)]
+            np.random.seed(0)
+            model = build(X, 10)
+            objective, optimizer = SoftmaxCrossEntropyWithLogits(), Adam(1e-4)
+            record(name, "train_step", params, lambda m=model, X=X, Y=Y, o=objective, opt=optimizer:
+                   m.trainStep(X, Y, o, opt))
+    return results
+
+def environment():
+    """Versions and machine details stored with every result file."""
+    return {
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Compare median timings against a baseline result file.
+
+    Args:
+        results (list): Output of run()
+        baseline (dict): A saved result file ({"environment", "results"})
+        threshold (float): Relative slowdown above which a benchmark is a regression
+
+    Returns:
+        List of dicts with key, baseline and current medians, their ratio and a
+        status of "regression", "improvement", "ok", "new" or "missing"
+    """
+    previous = {r["key"]: r for r in baseline["results"]}
+    current = {r["key"]: r for r in results}
+    rows = []
+    for key, r in current.items():
+        if key not in previous:
+            rows.append({"key": key, "baseline_s": None, "current_s": r["median_s"], "ratio": None, "status": "new"})
+            continue
+        ratio = r["median_s"] / previous[key]["median_s"]
+        status = "regression" if ratio > 1 + threshold else "improvement" if ratio < 1 / (1 + threshold) else "ok"
+        rows.append({"key": key, "baseline_s": previous[key]["median_s"], "current_s": r["median_s"],
+                     "ratio": ratio, "status": status})
+    for key in previous.keys() - current.keys():
+        rows.append({"key": key, "baseline_s": previous[key]["median_s"], "current_s": None,
+                     "ratio": None, "status": "missing"})
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the layer, objective and training-step benchmark suite.")
+    parser.add_argument("--grid", choices=sorted(GRIDS), default="quick")
+    parser.add_argument("--filter", help="only run benchmarks whose key contains this text")
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    results = run(args.grid, args.filter, args.min_time, args.repeat)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "grid": args.grid, "results": results}, f, indent=1)
+
+    if not args.baseline:
+        print(f"{'benchmark':<72} {'median (us)':>12}")
+        for r in results:
+            print(f"{r['key']:<72} {r['median_s']*1e6:>12.1f}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.filter:
+        baseline["results"] = [r for r in baseline["results"] if args.filter in r["key"]]
+    rows = compare(results, baseline, args.threshold)
+    print(f"{'benchmark':<72} {'baseline (us)':>14} {'current (us)':>13} {'ratio':>7}  status")
+    for row in rows:
+        base = f"{row['baseline_s']*1e6:.1f}" if row["baseline_s"] is not None else "-"
+        cur = f"{row['current_s']*1e6:.1f}" if row["current_s"] is not None else "-"
+        ratio = f"{row['ratio']:.2f}" if row["ratio"] is not None else "-"
+        print(f"{row['key']:<72} {base:>14} {cur:>13} {ratio:>7}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) slower than the baseline by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# core/arena.py
+
+import numpy as np
+
+class BufferArena:
+    def __init__(self):
+        """
+        Pool of scratch arrays keyed by (owner key, shape, dtype). Layers write
+        their outputs and gradients into these with `out=` operations, so once
+        batch shapes are stable a training step allocates no new arrays.
+        Contents of a returned buffer are undefined.
+        """
+        self.buffers = {}
+        self.allocations = 0
+        self.reuses = 0
+        self.bytesAllocated = 0
+        self.bytesReused = 0
+
+    def allocate(self, key, shape, dtype):
+        buf = np.empty(shape, dtype=dtype)
+        self.buffers[key] = buf
+        self.allocations += 1
+        self.bytesAllocated += buf.nbytes
+        return buf
+
+    def reuse(self, buf):
+        self.reuses += 1
+        self.bytesReused += buf.nbytes
+        return buf
+
+    def request(self, key, shape, dtype):
+        """A buffer private to `key` (e.g. a layer and a tag) with the given shape and dtype."""
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        buf = self.buffers.get((key, shape, dtype))
+        if buf is None:
+            return self.allocate((key, shape, dtype), shape, dtype)
+        return self.reuse(buf)
+
+    def requestShared(self, shape, dtype, avoid=None):
+        """
+        A buffer shared by every caller with this shape and dtype. Two are kept
+        per key and the one returned never overlaps `avoid`, so a chain of
+        layers can alternate between them.
+        """
+        shape = tuple(shape)
+        dtype = np.dtype(dtype)
+        for slot in range(2):
+            key = ("shared", slot, shape, dtype)
+            buf = self.buffers.get(key)
+            if buf is None:
+                return self.allocate(key, shape, dtype)
+            if avoid is None or not np.may_share_memory(buf, avoid):
+                return self.reuse(buf)
+        return np.empty(shape, dtype=dtype)
+
+    def stats(self):
+        return {
+            "buffers": len(self.buffers),
+            "bytes_held": sum(buf.nbytes for buf in self.buffers.values()),
+            "allocations": self.allocations,
+            "allocations_avoided": self.reuses,
+            "bytes_allocated": self.bytesAllocated,
+            "bytes_reused": self.bytesReused,
+        }
+
+    def resetCounters(self):
+        self.allocations = self.reuses = 0
+        self.bytesAllocated = self.bytesReused = 0
+
+    def clear(self):
+        """Release every buffer; counters are kept."""
+        self.buffers.clear()
@@ -1,29 +1,266 @@
 # core/base.py
 
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+import threading
 import numpy as np
 
+from .arena import BufferArena
+from ..utils.rng import RandomStream
+from ..utils.masks import PackedMask
+
 EPSILON = 1e-7
 
+class _InferenceState(threading.local):
+    def __init__(self):
+        self.active = False
+        self.arena = BufferArena()
+        # False inside inference_mode() and no_activation_cache()
+        self.caching = True
+
+_inference = _InferenceState()
+
+def is_inference():
+    """Whether the current thread is inside inference_mode()."""
+    return _inference.active
+
+@contextmanager
+def inference_mode(arena=None):
+    """
+    Run forward passes for serving: layers do not cache activations for
+    backward, dropout is a no-op, and layer outputs are written into scratch
+    buffers shared across calls on this thread. An output stays valid only
+    until the next inference forward pass, so copy anything you keep.
+
+    Args:
+        arena (BufferArena): Arena for the shared buffers; defaults to one
+            kept per thread
+    """
+    previous = _inference.active, _inference.arena, _inference.caching
+    _inference.active = True
+    _inference.caching = False
+    if arena is not None:
+        _inference.arena = arena
+    try:
+        yield _inference.arena
+    finally:
+        _inference.active, _inference.arena, _inference.caching = previous
+
+@contextmanager
+def no_activation_cache():
+    """
+    Training-mode forward passes that keep no activations for backward, as
+    used by gradient checkpointing for the segments it later recomputes.
+    Unlike inference_mode(), dropout stays active and outputs are not shared.
+    """
+    previous = _inference.caching
+    _inference.caching = False
+    try:
+        yield
+    finally:
+        _inference.caching = previous
+
+def is_caching():
+    """Whether forward passes on this thread keep what backward needs."""
+    return _inference.caching
+
+def inference_buffer(shape, dtype, avoid=None):
+    """Scratch output array for inference_mode() that never overlaps `avoid`."""
+    return _inference.arena.requestShared(shape, dtype, avoid)
+
 class Layer(ABC):
+    # Names of trainable array attributes; each has a matching `<name>Grad` buffer
+    parameterNames = ()
+    # Names of non-trainable array attributes saved with checkpoints
+    stateNames = ()
+    # Whether backward/computeGradients read the cached input or output.
+    # Activations that are not needed are not kept alive between passes.
+    needsPrevIn = True
+    needsPrevOut = True
+
     def __init__(self):
         self.__prevIn = []
         self.__prevOut = []
+        self.__mask = None
+        self.__training = True
+        self.parameterBuffer = None
+        # Optional BufferArena supplying output and gradient buffers
+        self.arena = None
+        # Compute dtype for layers that own parameters or cast their input;
+        # None means the layer follows the dtype of whatever it receives
+        self.dtype = None
+        # RandomStream of layers that draw random numbers during forward
+        self.rng = None
 
     def setPrevIn(self,dataIn):
-        self.__prevIn = dataIn
+        if self.needsPrevIn and _inference.caching:
+            self.__prevIn = dataIn
 
     def setPrevOut(self, out):
-        self.__prevOut = out
+        if self.needsPrevOut and _inference.caching:
+            self.__prevOut = out
+
+    def setMask(self, mask):
+        """
+        Cache a boolean mask for backward bit-packed (a PackedMask, or a bool
+        array to pack), for layers whose backward only needs to know which
+        elements were active.
+        """
+        if _inference.caching:
+            self.__mask = mask if isinstance(mask, PackedMask) else PackedMask.pack(mask)
+
+    def getMask(self):
+        """The cached mask unpacked to a bool array, or None if there is none."""
+        return None if self.__mask is None else self.__mask.unpack()
+
+    def clearCache(self):
+        """Drop references to the cached activations of the last forward pass."""
+        self.__prevIn = []
+        self.__prevOut = []
+        self.__mask = None
 
     def getPrevIn(self):
         return self.__prevIn
 
     def getPrevOut(self):
         return self.__prevOut
+
+    def setTraining(self, training):
+        self.__training = training
+
+    def isTraining(self):
+        return self.__training
+
+    def setArena(self, arena):
+        self.arena = arena
+
+    def setSeed(self, seed, stream=0):
+        """Rekey the layer's random stream, if it has one, to (seed, stream) at step 0."""
+        if self.rng is not None:
+            self.rng = RandomStream(seed, stream)
+
+    def getConfig(self):
+        """Constructor arguments that rebuild this layer, minus its tensors, as JSON-able values."""
+        return {}
+
+    @classmethod
+    def fromConfig(cls, config):
+        return cls(**config)
+
+    def getTensors(self):
+        """Parameters and state arrays by attribute name, as stored in checkpoints."""
+        names = tuple(self.parameterNames) + tuple(self.stateNames)
+        return {name: getattr(self, name) for name in names}
+
+    def setTensors(self, tensors):
+        """Rebind tensor attributes to the given arrays without copying them."""
+        for name, value in tensors.items():
+            setattr(self, name, value)
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        """
+        Rough floating-point operation count of one call, for the profiler.
+        Defaults to one operation per output element.
+
+        Args:
+            phase (str): "forward" (dataIn -> dataOut), "backward" (gradIn ->
+                gradOut) or "gradients" (gradIn; dataOut is None)
+        """
+        return int(np.size(dataOut if dataOut is not None else dataIn))
+
+    def cachedArrays(self):
+        """Arrays kept alive between forward and backward, for memory reports."""
+        arrays = [a for a in (self.__prevIn, self.__prevOut) if isinstance(a, np.ndarray)]
+        return arrays + ([self.__mask.bits] if self.__mask is not None else [])
+
+    def getParameters(self):
+        """Trainable arrays by name. Optimizers update these in place."""
+        return {name: getattr(self, name) for name in self.parameterNames}
+
+    def getGradients(self):
+        """Gradients filled by the last computeGradients call, keyed like getParameters."""
+        return {name: self.gradientBuffer(name) for name in self.parameterNames}
+
+    def assignParameter(self, name, value):
+        """
+        Set a parameter. Parameters bound to a ParameterBuffer are overwritten
+        in place so they stay views into the shared storage.
+        """
+        if self.parameterBuffer is None:
+            setattr(self, name, np.asarray(value, dtype=self.dtype if self.dtype is not None else float))
+            return
+        current = getattr(self, name)
+        if np.size(value) != current.size:
+            raise ValueError(f"cannot resize bound parameter '{name}' from {current.shape} to {np.shape(value)}")
+        current[...] = np.reshape(value, current.shape)
+
+    def castInput(self, dataIn):
+        """Convert input to the layer's dtype; a no-op when it already matches."""
+        if self.dtype is None or getattr(dataIn, "dtype", None) == self.dtype:
+            return dataIn
+        return np.asarray(dataIn, dtype=self.dtype)
+
+    def outputBuffer(self, shape, dtype, dataIn):
+        """
+        Array for this layer's forward output that does not alias its input:
+        a shared buffer in inference mode, otherwise scratch("out").
+        """
+        if _inference.active:
+            return inference_buffer(shape, dtype, avoid=dataIn)
+        return self.scratch("out", shape, dtype)
+
+    def scratch(self, tag, shape, dtype):
+        """
+        A per-layer array identified by tag. It comes from the layer's arena
+        when one is set (and is reused by the next call with the same tag,
+        shape and dtype), otherwise it is freshly allocated. Contents are undefined.
+        """
+        if self.arena is None:
+            return np.empty(shape, dtype=dtype)
+        return self.arena.request((id(self), tag), shape, dtype)
+
+    def scratchAllocator(self):
+        """scratch() as a plain function, for the conv and pooling engines."""
+        if self.arena is None:
+            return None
+        return self.scratch
+
+    def bindParameter(self, name, value, grad, buffer):
+        """
+        Rebind a parameter and its gradient to views owned by a ParameterBuffer.
+        Layers that keep their parameters elsewhere forward this to the owner.
+        """
+        setattr(self, name, value)
+        setattr(self, name + "Grad", grad)
+        self.parameterBuffer = buffer
+
+    def gradientBuffer(self, name):
+        """The preallocated gradient array for a parameter, reallocated only if the parameter changed shape."""
+        param = getattr(self, name)
+        grad = getattr(self, name + "Grad", None)
+        if grad is None or grad.shape != param.shape or grad.dtype != param.dtype:
+            grad = np.zeros_like(param)
+            setattr(self, name + "Grad", grad)
+        return grad
+
+    def computeGradients(self, gradIn):
+        """Fill the parameter gradients given the gradient w.r.t. this layer's output."""
+        pass
  
     def backward(self, gradIn):
+        return self.jacobianBackward(gradIn)
+
+    def jacobianBackward(self, gradIn):
+        """
+        Reference backward pass through the per-sample Jacobians from gradient().
+
+        Layers override backward with a direct vector-Jacobian product; this path
+        materializes the Jacobians and is kept for gradient checks. Element-wise
+        layers return only the Jacobian diagonal, which is applied directly.
+        """
         grad = self.gradient()
+        if np.shape(grad) == np.shape(gradIn):
+            return gradIn * grad
         return np.array([np.dot(gradIn_i, grad_i) for gradIn_i, grad_i in zip(gradIn, grad)])
 
     @abstractmethod
@@ -0,0 +1,361 @@
+# core/model.py
+
+import time
+import numpy as np
+
+from .arena import BufferArena
+from .base import inference_mode, no_activation_cache
+from .profiler import Profiler
+from ..layers.fused import fuse
+from ..layers.normalization import fold
+from ..utils.optimizers import Adam
+from ..utils.parameters import ParameterBuffer
+
+class Callback:
+    """
+    Base class for training callbacks. Override any of the hooks; `logs` is
+    the dict that is also appended to Sequential.history at the end of an epoch.
+    Setting `model.stopTraining = True` from a hook ends fit() after the
+    current step.
+    """
+    def onEpochBegin(self, model, epoch):
+        pass
+
+    def onStepEnd(self, model, step, logs):
+        pass
+
+    def onEpochEnd(self, model, epoch, logs):
+        pass
+
+class Sequential:
+    def __init__(self, layers=None):
+        """
+        A stack of layers trained end to end.
+
+        Args:
+            layers (list): Layers applied in order; the first is usually an InputLayer
+        """
+        self.layers = list(layers) if layers is not None else []
+        self.history = []
+        self.step = 0
+        self.stopTraining = False
+        self.parameterBuffer = None
+        self.arena = None
+        self.checkpointSegments = None
+
+    def add(self, layer):
+        layer.setArena(self.arena)
+        self.layers.append(layer)
+        return self
+
+    def train(self):
+        """Put every layer in training mode (dropout active)."""
+        for layer in self.layers:
+            layer.setTraining(True)
+
+    def eval(self):
+        """Put every layer in evaluation mode (dropout disabled)."""
+        for layer in self.layers:
+            layer.setTraining(False)
+
+    def isTraining(self):
+        return all(layer.isTraining() for layer in self.layers)
+
+    def forward(self, dataIn):
+        for layer in self.layers:
+            dataIn = layer.forward(dataIn)
+        return dataIn
+
+    def backward(self, gradIn):
+        # The first layer's input gradient is never consumed, so it is not computed
+        for layer in reversed(self.layers[1:]):
+            gradIn = layer.backward(gradIn)
+        return gradIn
+
+    def getParameterLayers(self):
+        """Objects the optimizer steps over: the flat buffer if there is one, else each layer with parameters."""
+        if self.parameterBuffer is not None:
+            return [self.parameterBuffer]
+        return [layer for layer in self.layers if layer.parameterNames]
+
+    def flattenParameters(self, dtype=None):
+        """
+        Move all parameters and gradients into one contiguous ParameterBuffer.
+        Call before training; optimizer state created earlier is not carried over.
+        """
+        self.parameterBuffer = ParameterBuffer(self.layers, dtype=dtype)
+        return self.parameterBuffer
+
+    def setCheckpointing(self, segments=None):
+        """
+        Enable gradient checkpointing: the forward pass keeps only the input
+        of each segment, and each segment's forward is recomputed during
+        backward. Peak activation memory drops to roughly one segment plus the
+        boundaries, for about one extra forward pass of compute. Gradients are
+        identical to the uncheckpointed pass; the global random state and
+        the layers' random streams are replayed so dropout masks match.
+
+        Args:
+            segments: Number of equal segments, or a list of layer indices at
+                which segments start; None disables checkpointing
+        """
+        self.checkpointSegments = segments
+        return self
+
+    def segmentBounds(self):
+        """(start, stop) layer ranges of the checkpoint segments."""
+        n = len(self.layers)
+        if isinstance(self.checkpointSegments, int):
+            starts = {round(i * n / self.checkpointSegments) for i in range(self.checkpointSegments)}
+        else:
+            starts = {0, *self.checkpointSegments}
+        starts = sorted(start for start in starts if start < n)
+        return list(zip(starts, starts[1:] + [n]))
+
+    def backwardRange(self, start, stop, grad):
+        """Parameter gradients and backward for layers[start:stop], last to first."""
+        for i in range(stop - 1, start - 1, -1):
+            layer = self.layers[i]
+            layer.computeGradients(grad)
+            if i > 0:
+                grad = layer.backward(grad)
+        return grad
+
+    def seed(self, seed):
+        """
+        Key the random stream of every layer that draws random numbers (e.g.
+        dropout) by (seed, layer index), starting at step 0, so training is
+        reproducible and no two layers share a stream.
+        """
+        for i, layer in enumerate(self.layers):
+            layer.setSeed(seed, i)
+        return self
+
+    def randomState(self):
+        """NumPy's global RNG state and every layer stream's step, enough to replay a forward pass."""
+        return np.random.get_state(), [None if layer.rng is None else layer.rng.step for layer in self.layers]
+
+    def setRandomState(self, state):
+        globalState, steps = state
+        np.random.set_state(globalState)
+        for layer, step in zip(self.layers, steps):
+            if step is not None:
+                layer.rng.step = step
+
+    def checkpointedGradients(self, X, Y, objective):
+        bounds = self.segmentBounds()
+        inputs, states = [], []
+        out = X
+        with no_activation_cache():
+            for start, stop in bounds[:-1]:
+                inputs.append(out)
+                states.append(self.randomState())
+                for layer in self.layers[start:stop]:
+                    out = layer.forward(out)
+        # The last segment is needed right away, so it caches normally
+        for layer in self.layers[bounds[-1][0]:]:
+            out = layer.forward(out)
+        loss = objective.eval(Y, out)
+        grad = objective.gradient(Y, out)
+        after = self.randomState()
+
+        grad = self.backwardRange(*bounds[-1], grad)
+        for k in range(len(bounds) - 2, -1, -1):
+            start, stop = bounds[k]
+            for layer in self.layers[stop:bounds[k + 1][1]]:
+                layer.clearCache()
+            self.setRandomState(states[k])
+            out = inputs[k]
+            for layer in self.layers[start:stop]:
+                out = layer.forward(out)
+            grad = self.backwardRange(start, stop, grad)
+        self.setRandomState(after)
+        return loss
+
+    def computeGradients(self, X, Y, objective):
+        """
+        Run one forward/backward pass on a single mini-batch, leaving the
+        batch-mean parameter gradients in each layer's gradient buffers.
+
+        Returns:
+            The objective value for the batch
+        """
+        if self.checkpointSegments is not None:
+            return self.checkpointedGradients(X, Y, objective)
+        out = self.forward(X)
+        loss = objective.eval(Y, out)
+        grad = objective.gradient(Y, out)
+        self.backwardRange(0, len(self.layers), grad)
+        return loss
+
+    def trainStep(self, X, Y, objective, optimizer):
+        """
+        Run one forward/backward pass on a single mini-batch followed by a
+        single optimizer step over all parameters.
+
+        Returns:
+            The objective value for the batch before the update
+        """
+        loss = self.computeGradients(X, Y, objective)
+        optimizer.step(self.getParameterLayers())
+        self.step += 1
+        return loss
+
+    def batches(self, n, batch_size, shuffle=False, rng=None):
+        """Yield index slices (or shuffled index arrays) covering n samples."""
+        if shuffle:
+            order = rng.permutation(n)
+            for start in range(0, n, batch_size):
+                yield order[start:start + batch_size]
+        else:
+            for start in range(0, n, batch_size):
+                yield slice(start, start + batch_size)
+
+    def epochBatches(self, X, Y, batch_size, shuffle, rng):
+        """(X, Y) mini-batches for one epoch, from arrays or from a batch iterable when Y is None."""
+        if Y is None:
+            return iter(X)
+        return ((X[index], Y[index]) for index in self.batches(len(X), batch_size, shuffle, rng))
+
+    def fit(self, X, Y=None, objective=None, epochs=1, batch_size=32, learning_rate=0.0001, optimizer=None,
+            shuffle=True, seed=None, callbacks=(), validation_data=None, verbose=False, trainer=None):
+        """
+        Train the model with mini-batch gradient descent.
+
+        Args:
+            X: Training inputs, indexed along the first axis, or an iterable of
+                (X, Y) batches such as a utils.data.DataLoader when Y is None
+            Y: Training targets aligned with X
+            objective: Objective from core.objective
+            epochs (int): Number of passes over the data
+            batch_size (int): Samples per training step
+            learning_rate (float): Step size for the default Adam optimizer
+            optimizer: Optimizer from utils.optimizers; defaults to Adam. Reuse
+                the same instance across fit calls to keep its state
+            shuffle (bool): Reshuffle the samples at the start of every epoch
+            seed (int): Seed for the shuffling order
+            callbacks (list): Callback instances notified during training
+            validation_data (tuple): Optional (X, Y) evaluated after every epoch
+            verbose (bool): Print one summary line per epoch
+            trainer: Object whose trainStep(X, Y, objective, optimizer) runs
+                each step, e.g. a DataParallel wrapping this model; defaults
+                to the model itself
+
+        Returns:
+            The history list, one logs dict per epoch
+        """
+        if optimizer is None:
+            optimizer = Adam(learning_rate)
+        if trainer is None:
+            trainer = self
+        rng = np.random.default_rng(seed)
+        self.stopTraining = False
+        self.train()
+
+        for epoch in range(epochs):
+            for callback in callbacks:
+                callback.onEpochBegin(self, epoch)
+
+            start = time.perf_counter()
+            total, seen = 0.0, 0
+            for xb, yb in self.epochBatches(X, Y, batch_size, shuffle, rng):
+                loss = trainer.trainStep(xb, yb, objective, optimizer)
+                total += loss * len(xb)
+                seen += len(xb)
+                for callback in callbacks:
+                    callback.onStepEnd(self, self.step, {"epoch": epoch, "loss": loss, "batch_size": len(xb)})
+                if self.stopTraining:
+                    break
+            elapsed = time.perf_counter() - start
+
+            logs = {
+                "epoch": epoch,
+                "loss": float(total / max(seen, 1)),
+                "time": elapsed,
+                "samples_per_sec": seen / elapsed if elapsed > 0 else float("inf"),
+            }
+            if validation_data is not None:
+                logs["val_loss"] = float(self.evaluate(*validation_data, objective, batch_size=batch_size))
+                self.train()
+            self.history.append(logs)
+
+            for callback in callbacks:
+                callback.onEpochEnd(self, epoch, logs)
+            if verbose:
+                extra = f" - val_loss {logs['val_loss']:.6f}" if "val_loss" in logs else ""
+                print(f"epoch {epoch + 1}/{epochs} - loss {logs['loss']:.6f}{extra}"
+                      f" - {logs['samples_per_sec']:.0f} samples/sec")
+            if self.stopTraining:
+                break
+
+        return self.history
+
+    def predict(self, X, batch_size=None):
+        """
+        Forward pass in inference mode, optionally in batches. No activations are
+        cached and intermediate buffers are reused between calls.
+        """
+        with inference_mode():
+            if batch_size is None or batch_size >= len(X):
+                return np.array(self.forward(X))
+            out = None
+            for start in range(0, len(X), batch_size):
+                batch = self.forward(X[start:start + batch_size])
+                if out is None:
+                    out = np.empty((len(X),) + batch.shape[1:], dtype=batch.dtype)
+                out[start:start + len(batch)] = batch
+            return out
+
+    def fuse(self):
+        """
+        Replace eligible adjacent layers (dense + activation, conv + ReLU + max
+        pool) with fused blocks that share their parameters. Call before
+        training so optimizer state is keyed by the fused blocks.
+        """
+        self.layers = fuse(self.layers)
+        return self
+
+    def fold(self):
+        """
+        Fold every BatchNormLayer into the dense or conv layer before it, for
+        export and serving: the folded model computes what this one does in
+        evaluation mode without any normalization work. Train before folding;
+        the folded layers no longer normalize with batch statistics.
+        """
+        self.layers = fold(self.layers)
+        return self
+
+    def profile(self, optimizer=None):
+        """
+        A Profiler for this model: `with model.profile(optimizer) as prof: ...`
+        then `print(prof.table())` or `prof.exportChromeTrace(path)`.
+        """
+        return Profiler(self, optimizer)
+
+    def useArena(self, arena=None):
+        """
+        Give every layer a shared BufferArena so forward outputs and backward
+        gradients are written into reused buffers. Outputs of model.forward are
+        then only valid until the next forward pass.
+
+        Returns:
+            The arena, whose stats() report allocations avoided and bytes reused
+        """
+        self.arena = arena if arena is not None else BufferArena()
+        for layer in self.layers:
+            layer.setArena(self.arena)
+        return self.arena
+
+    def clearCaches(self):
+        """Release the activations cached by the last training forward pass."""
+        for layer in self.layers:
+            layer.clearCache()
+
+    def evaluate(self, X, Y, objective, batch_size=None):
+        """Objective value of the model's predictions on (X, Y)."""
+        if batch_size is None or batch_size >= len(X):
+            return objective.eval(Y, self.predict(X))
+        total = 0.0
+        for index in self.batches(len(X), batch_size):
+            total += objective.eval(Y[index], self.predict(X[index])) * len(X[index])
+        return total / len(X)
@@ -2,34 +2,114 @@
 
 import numpy as np
 
+from .precision import float_dtype
+
 EPSILON = 1e-7
 
+def match_dtype(Y, Yhat):
+    """Targets in the prediction's floating dtype, so float32 models stay float32."""
+    dtype = getattr(Yhat, "dtype", None)
+    if dtype is not None and np.issubdtype(dtype, np.floating):
+        return np.asarray(Y, dtype=dtype)
+    return Y
+
+def log_softmax(logits):
+    """Row-wise log-softmax via log-sum-exp, stable for large logits."""
+    shifted = np.subtract(logits, np.max(logits, axis=1, keepdims=True), dtype=float_dtype(logits))
+    shifted -= np.log(np.sum(np.exp(shifted), axis=1, keepdims=True))
+    return shifted
+
+def softmax(logits):
+    out = np.subtract(logits, np.max(logits, axis=1, keepdims=True), dtype=float_dtype(logits))
+    np.exp(out, out=out)
+    out /= np.sum(out, axis=1, keepdims=True)
+    return out
+
+def sigmoid(logits):
+    # exp of a non-positive argument only, so neither branch overflows
+    out = np.exp(-np.abs(logits))
+    return np.where(logits >= 0, 1 / (1 + out), out / (1 + out))
+
 class SquaredError:
     def eval(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return np.mean((Y - Yhat) ** 2)
 
     def gradient(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return -2*(Y - Yhat)
 
 class LogLoss:
     def eval(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return np.mean(-(Y * np.log(Yhat + EPSILON) + (1 - Y) * np.log(1 - Yhat + EPSILON)))
 
     def gradient(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return -((Y - Yhat) / (Yhat * (1 - Yhat) + EPSILON))
 
 class CrossEntropy:
     def eval(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return -np.mean(np.sum(Y * np.log(Yhat + EPSILON), axis = 1))
     
     def gradient(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
         return -np.divide(Y, (Yhat + EPSILON))
     
 class NegativeLikelihood():
     def eval(self, y , yhat):
+        y = match_dtype(y, yhat)
         yhat = np.clip(yhat, EPSILON, 1 - EPSILON)
         return -np.mean(y * np.log(yhat) + (1 - y) * np.log(1 - yhat))
         ## should return a single value
 
     def gradient(self, y, yhat):
-        return -np.divide(y, yhat + EPSILON) + np.divide((1-y), (1-yhat + EPSILON))
\ No newline at end of file
+        y = match_dtype(y, yhat)
+        return -np.divide(y, yhat + EPSILON) + np.divide((1-y), (1-yhat + EPSILON))
+
+class SoftmaxCrossEntropyWithLogits:
+    """
+    CrossEntropy applied on top of a softmax, taking the raw logits of the last
+    layer instead of SoftmaxLayer probabilities. The gradient with respect to
+    the logits is softmax(logits) - Y, so the softmax Jacobian is never formed
+    and no EPSILON is needed.
+
+    Y is either one-hot (N, K) or integer class indices (N,).
+    """
+    def eval(self, Y, Yhat):
+        logp = log_softmax(Yhat)
+        if np.ndim(Y) == 1:
+            return -np.mean(logp[np.arange(len(logp)), Y])
+        Y = match_dtype(Y, Yhat)
+        return -np.mean(np.sum(Y * logp, axis=1))
+
+    def gradient(self, Y, Yhat):
+        grad = softmax(Yhat)
+        if np.ndim(Y) == 1:
+            grad[np.arange(len(grad)), Y] -= 1
+            return grad
+        grad -= match_dtype(Y, Yhat)
+        return grad
+
+    def activation(self, Yhat):
+        """Class probabilities for logits produced by the model."""
+        return softmax(Yhat)
+
+class SigmoidCrossEntropyWithLogits:
+    """
+    LogLoss / NegativeLikelihood applied on top of a sigmoid, taking raw logits
+    instead of LogisticSigmoidLayer outputs. The loss is computed as
+    max(z, 0) - z*y + log(1 + exp(-|z|)) and its gradient is sigmoid(z) - Y.
+    """
+    def eval(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
+        return np.mean(np.maximum(Yhat, 0) - Yhat * Y + np.log1p(np.exp(-np.abs(Yhat))))
+
+    def gradient(self, Y, Yhat):
+        Y = match_dtype(Y, Yhat)
+        return sigmoid(Yhat) - Y
+
+    def activation(self, Yhat):
+        """Probabilities for logits produced by the model."""
+        return sigmoid(Yhat)
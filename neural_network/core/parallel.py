@@ -0,0 +1,251 @@
+# core/parallel.py
+
+import os
+import traceback
+import multiprocessing as mp
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ..utils.parameters import ParameterBuffer
+from ..utils.statistics import RunningStatistics
+
+BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+ALIGNMENT = 64
+
+def aligned(nbytes):
+    return (nbytes + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+@contextmanager
+def blas_threads(threads):
+    """Set the BLAS thread count seen by processes started inside the block."""
+    if threads is None:
+        yield
+        return
+    saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: str(threads) for name in BLAS_THREAD_VARIABLES})
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def _worker(conn, model, paramName, gradName, slot, dtype):
+    """
+    Replica loop run in each worker process. Parameters are views into the
+    shared parameter block, gradients into this worker's slot of the shared
+    gradient block; every "step" message names the shared batch block and the
+    rows this worker handles.
+    """
+    try:
+        params = shared_memory.SharedMemory(name=paramName)
+        grads = shared_memory.SharedMemory(name=gradName)
+        size = sum(value.size for layer in model.layers for value in layer.getParameters().values())
+        nbytes = size * np.dtype(dtype).itemsize
+        model.parameterBuffer = ParameterBuffer(model.layers, dtype=dtype, buffer=params.buf,
+                                                grad_buffer=grads.buf[slot * nbytes:(slot + 1) * nbytes])
+        model.train()
+        # Each replica draws its own dropout masks for its shard
+        for layer in model.layers:
+            if layer.rng is not None:
+                layer.rng = layer.rng.fork(slot)
+        batch, retired = None, []
+        conn.send((None, None))
+    except Exception:
+        conn.send((None, traceback.format_exc()))
+        return
+
+    while True:
+        message = conn.recv()
+        if message[0] == "close":
+            break
+        _, batchName, xSpec, ySpec, start, stop, objective = message
+        try:
+            if batch is None or batch.name != batchName:
+                # Cached activations may still view the old block, so it is
+                # kept mapped rather than closed; it only changes when it grows
+                retired.append(batch)
+                batch = shared_memory.SharedMemory(name=batchName)
+            offset = aligned(int(np.prod(xSpec[0])) * np.dtype(xSpec[1]).itemsize)
+            X = np.ndarray(xSpec[0], dtype=xSpec[1], buffer=batch.buf)[start:stop]
+            Y = np.ndarray(ySpec[0], dtype=ySpec[1], buffer=batch.buf, offset=offset)[start:stop]
+            loss = model.computeGradients(X, Y, objective)
+            # Batch moments of BatchNorm layers, for the parent's running estimates
+            moments = [getattr(layer, "batchStatistics", None) for layer in model.layers]
+            conn.send(((float(loss), moments), None))
+        except Exception:
+            conn.send((None, traceback.format_exc()))
+
+    # Move the replica off the shared blocks so they can be unmapped; the
+    # parent unlinks them
+    model.parameterBuffer = ParameterBuffer(model.layers, dtype=dtype)
+    model.clearCaches()
+    X = Y = None
+    for block in retired[1:] + [batch, params, grads]:
+        if block is not None:
+            block.close()
+
+class DataParallel:
+    def __init__(self, model, workers=None, start_method="spawn", threads_per_worker=1):
+        """
+        Data-parallel training on one machine. Each mini-batch is split across
+        worker processes that hold replicas of the model; the replicas'
+        parameters are views into one shared-memory block owned by this
+        object, so an update made by the optimizer here is seen by every
+        worker without copying.
+
+        Each step the batch is copied once into shared memory, every worker
+        runs forward/backward on its rows (the same computeGradients path the
+        layers' updateWeights/updateKernel hooks use) and writes its gradient
+        into its own shared slot. The slots are all-reduced here as a
+        batch-size weighted mean and a single optimizer step is taken.
+
+        Use as a context manager, or call start() and close().
+
+        Args:
+            model (Sequential): Model to train; its parameters are flattened into
+                shared memory while the workers run and copied back on close()
+            workers (int): Number of worker processes; defaults to os.cpu_count()
+            start_method (str): multiprocessing start method for the workers
+            threads_per_worker (int): BLAS threads per worker; None leaves the
+                environment unchanged
+        """
+        self.model = model
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.threads_per_worker = threads_per_worker
+        self.processes = []
+        self.connections = []
+        self.params = None
+        self.grads = None
+        self.batch = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        if self.processes:
+            return self
+        model = self.model
+        dtype = model.parameterBuffer.dtype if model.parameterBuffer is not None else None
+        local = ParameterBuffer(model.layers, dtype=dtype)
+        self.dtype = local.dtype
+        self.size = len(local)
+
+        nbytes = max(local.nbytes, 1)
+        self.params = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.grads = shared_memory.SharedMemory(create=True, size=nbytes * self.workers)
+        model.parameterBuffer = ParameterBuffer(model.layers, dtype=self.dtype, buffer=self.params.buf)
+        self.slots = np.ndarray((self.workers, self.size), dtype=self.dtype, buffer=self.grads.buf)
+
+        context = mp.get_context(self.start_method)
+        with blas_threads(self.threads_per_worker):
+            for slot in range(self.workers):
+                parent, child = context.Pipe()
+                process = context.Process(target=_worker, daemon=True,
+                                          args=(child, model, self.params.name, self.grads.name, slot, self.dtype))
+                process.start()
+                child.close()
+                self.processes.append(process)
+                self.connections.append(parent)
+        # Replicas copy their initial values into the shared block; wait for all
+        # of them before any update is made
+        self.gather(self.connections)
+        return self
+
+    def gather(self, connections):
+        try:
+            results = [conn.recv() for conn in connections]
+        except EOFError:
+            self.close()
+            raise RuntimeError("DataParallel worker exited unexpectedly") from None
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            raise RuntimeError("DataParallel worker failed:\n" + errors[0])
+        return [value for value, _ in results]
+
+    def stage(self, X, Y):
+        """Copy a batch into the shared batch block, growing it if needed."""
+        X, Y = np.ascontiguousarray(X), np.ascontiguousarray(Y)
+        nbytes = aligned(X.nbytes) + Y.nbytes
+        if self.batch is None or self.batch.size < nbytes:
+            if self.batch is not None:
+                self.batch.close()
+                self.batch.unlink()
+            self.batch = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+        np.copyto(np.ndarray(X.shape, dtype=X.dtype, buffer=self.batch.buf), X)
+        np.copyto(np.ndarray(Y.shape, dtype=Y.dtype, buffer=self.batch.buf, offset=aligned(X.nbytes)), Y)
+        return (X.shape, X.dtype.str), (Y.shape, Y.dtype.str)
+
+    def trainStep(self, X, Y, objective, optimizer):
+        """
+        Same contract as Sequential.trainStep, with the batch split across the
+        workers. Pass the object as `trainer=` to Sequential.fit, or use fit().
+
+        Returns:
+            The objective value for the batch before the update
+        """
+        if not self.processes:
+            self.start()
+        n = len(X)
+        xSpec, ySpec = self.stage(X, Y)
+        bounds = np.linspace(0, n, min(self.workers, n) + 1).astype(int)
+        active = self.connections[:len(bounds) - 1]
+        for conn, start, stop in zip(active, bounds[:-1], bounds[1:]):
+            conn.send(("step", self.batch.name, xSpec, ySpec, int(start), int(stop), objective))
+        losses, moments = zip(*self.gather(active))
+        self.updateRunningStatistics(moments)
+
+        # All-reduce: every layer averages over its own rows, so the batch mean
+        # is the row-count weighted mean of the worker gradients
+        weights = (np.diff(bounds) / n).astype(self.dtype)
+        buffer = self.model.parameterBuffer
+        np.dot(weights, self.slots[:len(active)], out=buffer.grad)
+        optimizer.step([buffer])
+        self.model.step += 1
+        return float(np.dot(weights, losses))
+
+    def updateRunningStatistics(self, moments):
+        """
+        Update the running estimates of the model's BatchNorm layers from the
+        batch moments of every replica, merged so they describe the whole
+        batch. Each replica still normalizes with its own shard's moments.
+        """
+        for index, layer in enumerate(self.model.layers):
+            parts = [layerMoments[index] for layerMoments in moments if layerMoments[index] is not None]
+            if parts:
+                layer.updateRunningStatistics(RunningStatistics.merged(parts))
+
+    def fit(self, X, Y, objective, **kwargs):
+        """Sequential.fit with every step run by the workers; see Sequential.fit for the arguments."""
+        with self:
+            return self.model.fit(X, Y, objective, trainer=self, **kwargs)
+
+    def close(self):
+        """Stop the workers and move the model's parameters back into private memory."""
+        for conn in self.connections:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self.processes:
+            process.join()
+        for conn in self.connections:
+            conn.close()
+        self.processes, self.connections = [], []
+
+        if self.params is not None:
+            self.model.parameterBuffer = ParameterBuffer(self.model.layers, dtype=self.dtype)
+            self.slots = None
+            for block in (self.params, self.grads, self.batch):
+                if block is not None:
+                    block.close()
+                    block.unlink()
+            self.params = self.grads = self.batch = None
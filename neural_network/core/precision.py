@@ -0,0 +1,38 @@
+# core/precision.py
+
+from contextlib import contextmanager
+import numpy as np
+
+# Global floating-point policy. Layers created without an explicit dtype
+# take this one; parameter-free layers simply keep the dtype of their input.
+_default_dtype = np.dtype(np.float64)
+
+def get_default_dtype():
+    return _default_dtype
+
+def set_default_dtype(dtype):
+    """Set the dtype used for parameters and inputs of newly created layers."""
+    global _default_dtype
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError(f"default dtype must be a floating type, got {dtype}")
+    _default_dtype = dtype
+
+def resolve_dtype(dtype=None):
+    """An explicit per-layer dtype, or the global default."""
+    return np.dtype(dtype) if dtype is not None else _default_dtype
+
+@contextmanager
+def default_dtype(dtype):
+    """Temporarily change the default dtype, e.g. `with default_dtype(np.float32): ...`."""
+    previous = _default_dtype
+    set_default_dtype(dtype)
+    try:
+        yield
+    finally:
+        set_default_dtype(previous)
+
+def float_dtype(dataIn):
+    """The dtype a float-valued op on dataIn produces: its own if floating, else float64."""
+    dtype = np.asarray(dataIn).dtype
+    return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
@@ -0,0 +1,179 @@
+# core/profiler.py
+
+import json
+import time
+import tracemalloc
+from functools import wraps
+import numpy as np
+
+PHASES = ("forward", "backward", "gradients", "update")
+
+def nbytes(value):
+    return int(value.nbytes) if isinstance(value, np.ndarray) else 0
+
+class Profiler:
+    def __init__(self, model, optimizer=None):
+        """
+        Per-layer timing, FLOP and memory profile of a Sequential model.
+
+        Inside the `with` block each layer's forward, backward,
+        computeGradients and updateWeights/updateKernel are replaced by
+        timing wrappers installed on the layer instance; the optimizer's step
+        is split into one timed step per layer. Times are self times: a hook
+        that calls other profiled methods is charged only for its own work.
+        Leaving the block deletes the wrappers again, so nothing is checked or
+        recorded when the profiler is not active.
+
+        Args:
+            model (Sequential): Model whose layers are profiled
+            optimizer: Optional optimizer whose per-layer update time is recorded
+        """
+        self.model = model
+        self.optimizer = optimizer
+        self.events = []
+        self.names = {}
+        self.installed = []
+        self.origin = None
+
+    def __enter__(self):
+        self.origin = time.perf_counter()
+        for i, layer in enumerate(self.model.layers):
+            name = f"{i}:{type(layer).__name__}"
+            self.names[id(layer)] = name
+            self.wrap(layer, "forward", name, "forward")
+            self.wrap(layer, "backward", name, "backward")
+            self.wrap(layer, "computeGradients", name, "gradients")
+            for hook in ("updateWeights", "updateKernel"):
+                if hasattr(layer, hook):
+                    self.wrap(layer, hook, name, "update")
+        if self.optimizer is not None:
+            self.wrapOptimizer(self.optimizer)
+        return self
+
+    def __exit__(self, *exc):
+        for obj, attr in self.installed:
+            delattr(obj, attr)
+        self.installed = []
+
+    def record(self, name, phase, start, duration, flops=0, outputBytes=0, cachedBytes=0):
+        self.events.append({"name": name, "phase": phase, "start": start - self.origin, "duration": duration,
+                            "flops": flops, "output_bytes": outputBytes, "cached_bytes": cachedBytes})
+
+    def wrap(self, layer, attr, name, phase):
+        method = getattr(layer, attr)
+
+        @wraps(method)
+        def timed(*args, **kwargs):
+            mark = len(self.events)
+            start = time.perf_counter()
+            out = method(*args, **kwargs)
+            # Self time: hooks like updateWeights call other profiled methods
+            duration = time.perf_counter() - start - sum(e["duration"] for e in self.events[mark:])
+            dataIn = args[0] if args else None
+            if phase == "forward":
+                flops = layer.estimateFlops(phase, dataIn, out)
+                cached = sum(nbytes(a) for a in unique(layer.cachedArrays()))
+            else:
+                flops = layer.estimateFlops("backward" if phase == "backward" else "gradients", dataIn,
+                                            out if phase == "backward" else None)
+                cached = 0
+            self.record(name, phase, start, duration, flops, nbytes(out), cached)
+            return out
+
+        setattr(layer, attr, timed)
+        self.installed.append((layer, attr))
+
+    def wrapOptimizer(self, optimizer):
+        step = optimizer.step
+
+        @wraps(step)
+        def timed(layers, t=None):
+            # One step per layer, all with the same step number, so the update
+            # is attributed per layer without changing the result
+            t = optimizer.t + 1 if t is None else t
+            for layer in layers:
+                start = time.perf_counter()
+                step([layer], t=t)
+                name = self.names.get(id(layer), type(layer).__name__)
+                self.record(name, "update", start, time.perf_counter() - start)
+
+        optimizer.step = timed
+        self.installed.append((optimizer, "step"))
+
+    def summary(self):
+        """
+        Aggregated per-layer statistics, in first-seen order.
+
+        Returns:
+            List of dicts with the layer name, call count, total seconds per
+            phase, total FLOPs, achieved GFLOP/s, peak output bytes and peak
+            cached-activation bytes
+        """
+        rows = {}
+        for event in self.events:
+            row = rows.setdefault(event["name"], {"layer": event["name"], "calls": 0, "flops": 0,
+                                                  "output_bytes": 0, "cached_bytes": 0,
+                                                  **{f"{phase}_s": 0.0 for phase in PHASES}})
+            row["calls"] += event["phase"] == "forward"
+            row[f"{event['phase']}_s"] += event["duration"]
+            row["flops"] += event["flops"]
+            row["output_bytes"] = max(row["output_bytes"], event["output_bytes"])
+            row["cached_bytes"] = max(row["cached_bytes"], event["cached_bytes"])
+        for row in rows.values():
+            row["total_s"] = sum(row[f"{phase}_s"] for phase in PHASES)
+            row["gflops"] = row["flops"] / row["total_s"] / 1e9 if row["total_s"] > 0 else 0.0
+        return list(rows.values())
+
+    def table(self):
+        """The summary as a fixed-width text table, sorted by total time."""
+        rows = sorted(self.summary(), key=lambda row: row["total_s"], reverse=True)
+        total = sum(row["total_s"] for row in rows) or 1.0
+        lines = [f"{'layer':<28} {'calls':>6} {'fwd ms':>9} {'bwd ms':>9} {'grad ms':>9} {'upd ms':>9} "
+                 f"{'%':>6} {'GFLOP/s':>8} {'out KiB':>9} {'cache KiB':>10}"]
+        for row in rows:
+            lines.append(f"{row['layer']:<28} {row['calls']:>6} {row['forward_s']*1e3:>9.2f} "
+                         f"{row['backward_s']*1e3:>9.2f} {row['gradients_s']*1e3:>9.2f} "
+                         f"{row['update_s']*1e3:>9.2f} {row['total_s']/total:>6.1%} {row['gflops']:>8.2f} "
+                         f"{row['output_bytes']/1024:>9.1f} {row['cached_bytes']/1024:>10.1f}")
+        return "\n".join(lines)
+
+    def chromeTrace(self):
+        """The recorded events in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        return {"traceEvents": [{
+            "name": event["name"], "cat": event["phase"], "ph": "X", "pid": 0, "tid": 0,
+            "ts": event["start"] * 1e6, "dur": event["duration"] * 1e6,
+            "args": {"phase": event["phase"], "flops": event["flops"], "output_bytes": event["output_bytes"],
+                     "cached_bytes": event["cached_bytes"]},
+        } for event in self.events], "displayTimeUnit": "ms"}
+
+    def exportChromeTrace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chromeTrace(), f)
+
+def unique(arrays):
+    """Arrays with distinct memory, so a buffer cached twice is counted once."""
+    seen = set()
+    for array in arrays:
+        key = (array.__array_interface__["data"][0], array.nbytes)
+        if key not in seen:
+            seen.add(key)
+            yield array
+
+def peak_memory(fn):
+    """
+    Run fn under tracemalloc, which also sees NumPy's array allocations.
+
+    Returns:
+        (result of fn, peak bytes allocated above what was live before the call)
+    """
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        if started:
+            tracemalloc.stop()
@@ -1,69 +1,106 @@
 # layers/activations.py
 
-from ..core.base import Layer
+from ..core.base import Layer, is_caching
+from ..core.precision import float_dtype
 import numpy as np
 
 EPSILON = 1e-7
 
+# Forward passes write into outputBuffer() and backward passes into scratch(),
+# so with an arena (or in inference mode) no arrays are allocated per call.
+
 class ReluLayer(Layer):
+    # Backward only needs the sign of the output, cached as a bit mask
+    needsPrevIn = False
+    needsPrevOut = False
+
     def __init__(self):
         super().__init__()
 
     def forward(self,dataIn):
-        self.setPrevIn(dataIn)
-        dataOut = np.maximum(0, dataIn)
-        self.setPrevOut(dataOut)
+        dataOut = np.maximum(dataIn, 0, out=self.outputBuffer(dataIn.shape, dataIn.dtype, dataIn))
+        if is_caching():
+            self.setMask(np.greater(dataOut, 0, out=self.scratch("mask", dataOut.shape, bool)))
         return dataOut
 
     def gradient(self):
-        grad = np.where(self.getPrevOut() > 0, 1, 0)
+        grad = np.where(self.getMask(), 1, 0)
         return grad
 
     def backward(self, gradIn):
-        gradOut = gradIn * self.gradient()
-        return gradOut
+        gradOut = self.scratch("grad", gradIn.shape, gradIn.dtype)
+        return np.multiply(gradIn, self.getMask(), out=gradOut)
 
 class LogisticSigmoidLayer(Layer):
+    needsPrevIn = False
+
     def __init__(self):
         super().__init__()
 
     def forward(self,dataIn):
         self.setPrevIn(dataIn)
-        self.setPrevOut(1 / (1 + np.exp(-dataIn)))
-        return self.getPrevOut()
+        out = self.outputBuffer(dataIn.shape, float_dtype(dataIn), dataIn)
+        np.negative(dataIn, out=out)
+        np.exp(out, out=out)
+        out += 1
+        np.reciprocal(out, out=out)
+        self.setPrevOut(out)
+        return out
     
     def gradient(self):
         diag = self.getPrevOut() * (1 - self.getPrevOut()) + EPSILON
         return np.eye(len(self.getPrevOut()[0])) * diag[:, np.newaxis]
 
+    def backward(self, gradIn):
+        out = self.getPrevOut()
+        gradOut = self.scratch("grad", gradIn.shape, np.result_type(gradIn, out))
+        np.subtract(1, out, out=gradOut)
+        gradOut *= out
+        gradOut += EPSILON
+        gradOut *= gradIn
+        return gradOut
+
 class SoftmaxLayer(Layer):
+    needsPrevIn = False
+
     def __init__(self):
         super().__init__()
 
     def forward(self,dataIn):
         self.setPrevIn(dataIn)
-        max = np.max(dataIn, axis = 1)[:, np.newaxis]
-        self.setPrevOut(np.exp(dataIn - max) / np.sum(np.exp(dataIn - max), axis=1, keepdims=True))
-        return self.getPrevOut()
+        out = self.outputBuffer(dataIn.shape, float_dtype(dataIn), dataIn)
+        np.subtract(dataIn, np.max(dataIn, axis=1, keepdims=True), out=out)
+        np.exp(out, out=out)
+        out /= np.sum(out, axis=1, keepdims=True)
+        self.setPrevOut(out)
+        return out
 
     def gradient(self):
         out = self.getPrevOut()
-        tensor = np.empty((0, out.shape[1], out.shape[1]))
-        for row in out:
-            grad = -(row[:, np.newaxis])*row
-            np.fill_diagonal(grad, row*(1-row))
-            tensor = np.append(tensor, grad[np.newaxis], axis = 0)
+        tensor = -out[:, :, np.newaxis] * out[:, np.newaxis, :]
+        diag = np.arange(out.shape[1])
+        tensor[:, diag, diag] = out * (1 - out)
         return tensor
 
+    def backward(self, gradIn):
+        # J^T g = s * (g - <g, s>) for the symmetric softmax Jacobian
+        out = self.getPrevOut()
+        gradOut = self.scratch("grad", gradIn.shape, np.result_type(gradIn, out))
+        np.multiply(gradIn, out, out=gradOut)
+        dot = np.sum(gradOut, axis=1, keepdims=True)
+        np.subtract(gradIn, dot, out=gradOut)
+        gradOut *= out
+        return gradOut
+
 class TanhLayer(Layer):
+    needsPrevIn = False
+
     def __init__(self):
         super().__init__()
     
     def forward(self,dataIn):
         self.setPrevIn(dataIn)
-        dataInCal = np.where(dataIn > 100, 99, dataIn)
-        dataInCal = np.where(dataInCal < -100, -99, dataInCal)
-        dataOut = (np.exp(dataInCal) - np.exp(-dataInCal)) / (np.exp(dataInCal) + np.exp(-dataInCal))
+        dataOut = np.tanh(dataIn, out=self.outputBuffer(dataIn.shape, float_dtype(dataIn), dataIn))
         self.setPrevOut(dataOut)
         return dataOut
 
@@ -74,5 +111,10 @@ class TanhLayer(Layer):
         return tensor
 
     def backward(self, gradIn):
-        gradOut = gradIn * self.gradient()
-        return gradOut
\ No newline at end of file
+        out = self.getPrevOut()
+        gradOut = self.scratch("grad", gradIn.shape, np.result_type(gradIn, out))
+        np.multiply(out, out, out=gradOut)
+        np.subtract(1, gradOut, out=gradOut)
+        gradOut += .000000000000001
+        gradOut *= gradIn
+        return gradOut
@@ -1,24 +1,101 @@
 # layers/basic.py
 
 from ..core.base import Layer
+from ..core.precision import resolve_dtype
+from ..utils.data import compute_statistics
+from ..utils.statistics import RunningStatistics
 import numpy as np
 
 class InputLayer(Layer):
-    def __init__(self, dataIn):
+    stateNames = ("meanX", "stdX")
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self, dataIn=None, dtype=None, mean=None, std=None, statistics=None):
+        """
+        Z-scores its input with per-feature statistics, either computed from
+        dataIn, given directly, or accumulated incrementally with update() and
+        merge() from a RunningStatistics, e.g. one per data shard or worker.
+
+        Args:
+            dataIn: Training data to compute the statistics from
+            dtype: Compute dtype; defaults to the global policy
+            mean: Precomputed per-feature mean, used instead of dataIn
+            std: Precomputed per-feature standard deviation (ddof=1)
+            statistics (RunningStatistics): Streaming statistics to start from
+                (possibly still empty); update() and merge() add to them
+        """
         super().__init__()
-        self.meanX = np.mean(dataIn, axis=0)
-        self.stdX = np.std(dataIn, axis=0, ddof = 1)
+        self.dtype = resolve_dtype(dtype)
+        self.statistics = None
+        if mean is None or std is None:
+            if dataIn is None and statistics is None:
+                raise ValueError("InputLayer needs dataIn, statistics, or both mean and std")
+            self.statistics = statistics if statistics is not None else compute_statistics(dataIn)
+            self.refresh()
+            return
+        # Statistics are accumulated in float64 and stored in the compute dtype
+        self.meanX = np.array(mean, dtype=self.dtype)
+        self.stdX = np.array(std, dtype=self.dtype)
         self.stdX[self.stdX == 0] = 1
-    
+
+    def update(self, batch):
+        """Fold a batch of training samples into the statistics and refresh meanX/stdX."""
+        if self.statistics is None:
+            self.statistics = RunningStatistics()
+        self.statistics.update(batch)
+        self.refresh()
+        return self
+
+    def merge(self, other):
+        """
+        Merge statistics gathered elsewhere, e.g. by the InputLayer of another
+        shard or worker (or its RunningStatistics), and refresh meanX/stdX.
+        """
+        stats = other.statistics if isinstance(other, InputLayer) else other
+        if stats is None:
+            raise ValueError("can only merge an InputLayer built from streaming statistics")
+        if self.statistics is None:
+            self.statistics = RunningStatistics()
+        self.statistics.merge(stats)
+        self.refresh()
+        return self
+
+    def refresh(self):
+        """Recompute meanX/stdX from the streaming statistics; the std is 1 until two samples are seen."""
+        stats = self.statistics
+        if stats.mean is None:
+            self.meanX = np.zeros((), dtype=self.dtype)
+            self.stdX = np.ones((), dtype=self.dtype)
+            return
+        self.meanX = np.array(stats.mean, dtype=self.dtype)
+        self.stdX = np.array(stats.std(), dtype=self.dtype) if stats.count > 1 \
+            else np.ones(stats.mean.shape, dtype=self.dtype)
+        self.stdX[self.stdX == 0] = 1
+
+    def getConfig(self):
+        return {"dtype": self.dtype.str}
+
+    @classmethod
+    def fromConfig(cls, config):
+        # Placeholder statistics; the checkpoint's meanX/stdX replace them
+        return cls(mean=0.0, std=1.0, **config)
+
     def forward(self,dataIn):
+        dataIn = self.castInput(dataIn)
         self.setPrevIn(dataIn)
-        zscored = (dataIn - self.meanX) / self.stdX
+        zscored = self.outputBuffer(dataIn.shape, np.result_type(dataIn, self.meanX), dataIn)
+        np.subtract(dataIn, self.meanX, out=zscored)
+        zscored /= self.stdX
         self.setPrevOut(zscored)
         return zscored
 
     def gradient(self):
         pass
 
+    def backward(self, gradIn):
+        return gradIn / self.stdX
+
 class LinearLayer(Layer):
     def __init__(self):
         super().__init__()
@@ -29,25 +106,33 @@ class LinearLayer(Layer):
         return dataIn
 
     def gradient(self):
-        return np.identity(self.getPrevIn().shape[1])
+        n, k = self.getPrevIn().shape
+        return np.broadcast_to(np.identity(k), (n, k, k))
 
     def backward(self, gradIn):
         return gradIn
 
 class FlattenLayer(Layer):
+    # Backward only reshapes, so only the input shape is kept
+    needsPrevIn = False
+    needsPrevOut = False
+
     def __init__(self):
         super().__init__()
+        self.inputShape = None
 
     def forward(self,dataIn):
-        self.setPrevIn(dataIn)
-        self.setPrevOut(self.flatten(dataIn))
-        return self.getPrevOut()
+        self.inputShape = np.shape(dataIn)
+        dataOut = self.flatten(dataIn)
+        self.setPrevOut(dataOut)
+        return dataOut
 
     def flatten(self, dataIn):
-        return np.array([dataIn[i].flatten() for i in range(len(dataIn))])
+        # A view whenever the input is contiguous; no per-sample copies
+        return dataIn.reshape(len(dataIn), -1)
     
     def gradient(self):
         pass
  
     def backward(self, gradIn):
-        return gradIn.reshape(self.getPrevIn().shape)
\ No newline at end of file
+        return gradIn.reshape(self.inputShape)
\ No newline at end of file
@@ -1,86 +1,105 @@
 # layers/dense.py
 
 from ..core.base import Layer
+from ..core.precision import resolve_dtype
 from ..utils.initializers import xavier_init, he_init, uniform_init
+from ..utils.optimizers import Adam
 import numpy as np
 
 class FullyConnectedLayer(Layer):
-    def __init__(self, size_in, size_out, init_type="xavier"):
+    parameterNames = ("weights", "biases")
+    needsPrevOut = False
+
+    def __init__(self, size_in, size_out, init_type="xavier", dtype=None, rng=None):
         """
         Initialize a fully connected layer.
         
         Args:
             size_in (int): Input size
             size_out (int): Output size
-            init_type (str): Type of initialization to use ("xavier", "he", or "uniform")
+            init_type (str): Type of initialization to use ("xavier", "he", or "uniform");
+                None leaves zeros, for layers whose weights are loaded afterwards
+            dtype: Parameter and compute dtype; defaults to the global policy
+            rng: Seed or np.random.Generator for the initial weights; NumPy's
+                global RNG if None
         """
         super().__init__()
+        self.dtype = resolve_dtype(dtype)
         
         # Initialize weights and biases based on initialization type
         if init_type == "xavier":
-            self.weights, self.biases = xavier_init(size_in, size_out)
+            self.weights, self.biases = xavier_init(size_in, size_out, dtype=self.dtype, rng=rng)
         elif init_type == "he":
-            self.weights, self.biases = he_init(size_in, size_out)
+            self.weights, self.biases = he_init(size_in, size_out, dtype=self.dtype, rng=rng)
+        elif init_type is None:
+            self.weights = np.zeros((size_in, size_out), dtype=self.dtype)
+            self.biases = np.zeros((1, size_out), dtype=self.dtype)
         else:
-            self.weights, self.biases = uniform_init(size_in, size_out)
+            self.weights, self.biases = uniform_init(size_in, size_out, dtype=self.dtype, rng=rng)
+
+        self.weightsGrad = np.zeros_like(self.weights)
+        self.biasesGrad = np.zeros_like(self.biases)
+
+        # Optimizer used by updateWeights; Sequential uses a shared one instead
+        self.optimizer = Adam(beta1=0.9, beta2=0.999, epsilon=10e-8)
 
-        # Adam optimizer accumulators
-        self.weights_s = 0
-        self.weights_r = 0
-        self.biases_s = 0
-        self.biases_r = 0
+    def getConfig(self):
+        size_in, size_out = self.weights.shape
+        return {"size_in": size_in, "size_out": size_out, "dtype": self.dtype.str}
 
-        # Adam hyperparameters
-        self.decay_1 = 0.9
-        self.decay_2 = 0.999
-        self.stability = 10e-8
+    @classmethod
+    def fromConfig(cls, config):
+        # Skip the random initialization; checkpoint weights replace it
+        return cls(init_type=None, **config)
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        size_in, size_out = self.weights.shape
+        matmul = 2 * len(dataIn) * size_in * size_out
+        return matmul if phase == "backward" else matmul + len(dataIn) * size_out
 
-    # Rest of the class implementation remains the same
     def getWeights(self):
         return self.weights
     
     def setWeights(self, weights):
-        self.weights = weights
+        self.assignParameter("weights", weights)
     
     def getBiases(self):
         return self.biases
     
     def setBiases(self, biases):
-        self.biases = biases
+        self.assignParameter("biases", biases)
 
     def forward(self, dataIn):
+        dataIn = self.castInput(dataIn)
         self.setPrevIn(dataIn)
-        self.setPrevOut(np.dot(dataIn, self.weights) + self.biases)
-        return self.getPrevOut()
+        out = self.outputBuffer((len(dataIn), self.weights.shape[1]),
+                                np.result_type(dataIn, self.weights), dataIn)
+        np.matmul(dataIn, self.weights, out=out)
+        out += self.biases
+        self.setPrevOut(out)
+        return out
 
     def gradient(self):
-        return np.array([self.weights.T for _ in range(len(self.getPrevIn()))])
+        # Read-only broadcast view; the transposed weights are not copied per sample
+        return np.broadcast_to(self.weights.T, (len(self.getPrevIn()),) + self.weights.T.shape)
+
+    def backward(self, gradIn):
+        gradOut = self.scratch("grad", (len(gradIn), self.weights.shape[0]),
+                               np.result_type(gradIn, self.weights))
+        return np.matmul(gradIn, self.weights.T, out=gradOut)
     
+    def computeGradients(self, gradIn):
+        """Batch-averaged weight and bias gradients, written into weightsGrad/biasesGrad."""
+        n = gradIn.shape[0]
+        weightsGrad = self.gradientBuffer("weights")
+        biasesGrad = self.gradientBuffer("biases")
+        np.matmul(self.getPrevIn().T, gradIn, out=weightsGrad)
+        weightsGrad /= n
+        np.sum(gradIn, axis=0, out=biasesGrad.reshape(gradIn.shape[1:]))
+        biasesGrad /= n
+
     def updateWeights(self, gradIn, epoch, learning_rate=0.0001):
-        # Calculate gradients for weights
-        dJdw = (self.getPrevIn().T @ gradIn) / gradIn.shape[0]
-        
-        # Update momentum and RMSprop accumulators for weights
-        self.weights_s = self.decay_1 * self.weights_s + (1 - self.decay_1) * dJdw
-        self.weights_r = self.decay_2 * self.weights_r + (1 - self.decay_2) * dJdw * dJdw
-        
-        # Bias correction
-        weights_update = (self.weights_s/(1-self.decay_1**(epoch+1))) / (
-            np.sqrt(self.weights_r/(1-self.decay_2**(epoch+1))) + self.stability
-        )
-        
-        # Calculate gradients for biases
-        dJdb = np.sum(gradIn, axis=0)/gradIn.shape[0]
-        
-        # Update momentum and RMSprop accumulators for biases
-        self.biases_s = self.decay_1 * self.biases_s + (1 - self.decay_1) * dJdb
-        self.biases_r = self.decay_2 * self.biases_r + (1 - self.decay_2) * dJdb * dJdb
-        
-        # Bias correction
-        biases_update = (self.biases_s/(1-self.decay_1**(epoch+1))) / (
-            np.sqrt(self.biases_r/(1-self.decay_2**(epoch+1))) + self.stability
-        )
-        
-        # Update weights and biases
-        self.setWeights(self.getWeights() - learning_rate * weights_update)
-        self.setBiases(self.getBiases() - learning_rate * biases_update)
\ No newline at end of file
+        """Adam step on this layer alone, with bias correction at step epoch + 1."""
+        self.computeGradients(gradIn)
+        self.optimizer.learning_rate = learning_rate
+        self.optimizer.step([self], t=epoch + 1)
@@ -0,0 +1,240 @@
+# layers/fused.py
+
+from abc import abstractmethod
+from ..core.base import Layer, is_caching
+from ..utils.checkpoint import layer_spec, build_layer
+from ..utils.pool_engine import max_pool_forward, max_pool_backward
+from .activations import ReluLayer, LogisticSigmoidLayer, TanhLayer, EPSILON
+from .dense import FullyConnectedLayer
+from .convolution import Conv2DLayer
+from .pooling import PoolingLayer
+import numpy as np
+
+# Fused blocks wrap the layers they replace and share their parameter arrays,
+# so optimizers, parameter buffers and checkpoints see the same weights. Each
+# block applies its activation in place on the pre-activation buffer and caches
+# only what its backward pass needs.
+
+ACTIVATIONS = {ReluLayer: "relu", LogisticSigmoidLayer: "sigmoid", TanhLayer: "tanh"}
+
+class FusedLayer(Layer):
+    def __init__(self, inner):
+        """
+        Base class for fused blocks.
+
+        Args:
+            inner (Layer): The parameterised layer whose weights the block uses
+        """
+        self.inner = inner
+        super().__init__()
+        self.dtype = inner.dtype
+        self.setTraining(inner.isTraining())
+        self.__gradFor = None
+        self.__grad = None
+
+    @property
+    def parameterNames(self):
+        return self.inner.parameterNames
+
+    def getParameters(self):
+        return self.inner.getParameters()
+
+    def getGradients(self):
+        return self.inner.getGradients()
+
+    def getTensors(self):
+        return self.inner.getTensors()
+
+    def setTensors(self, tensors):
+        self.inner.setTensors(tensors)
+
+    def bindParameter(self, name, value, grad, buffer):
+        self.inner.bindParameter(name, value, grad, buffer)
+        self.parameterBuffer = buffer
+
+    def setArena(self, arena):
+        super().setArena(arena)
+        self.inner.setArena(arena)
+
+    def clearCache(self):
+        super().clearCache()
+        self.inner.clearCache()
+
+    def cachedArrays(self):
+        return super().cachedArrays() + self.inner.cachedArrays()
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        return self.inner.estimateFlops(phase, dataIn, dataOut) + super().estimateFlops(phase, dataIn, dataOut)
+
+    def gradient(self):
+        pass
+
+    def forward(self, dataIn):
+        # A new pass invalidates the inner gradient of the last one, even when
+        # the next gradient arrives in the same (arena) buffer
+        self.__gradFor = self.__grad = None
+        return self.fusedForward(dataIn)
+
+    @abstractmethod
+    def fusedForward(self, dataIn):
+        pass
+
+    def innerGradient(self, gradIn):
+        """
+        Gradient w.r.t. the inner layer's output. computeGradients and backward
+        both need it, so it is computed once per forward pass and incoming
+        gradient.
+        """
+        if self.__gradFor is not gradIn:
+            self.__grad = self.computeInnerGradient(gradIn)
+            self.__gradFor = gradIn
+        return self.__grad
+
+    def computeGradients(self, gradIn):
+        self.inner.computeGradients(self.innerGradient(gradIn))
+
+    def backward(self, gradIn):
+        gradOut = self.inner.backward(self.innerGradient(gradIn))
+        self.__gradFor = self.__grad = None
+        return gradOut
+
+class FusedDenseLayer(FusedLayer):
+    def __init__(self, dense, activation="relu"):
+        """
+        FullyConnectedLayer + bias + activation in one pass. Caches the layer
+        input and the activated output (for ReLU only its bit-packed sign);
+        the pre-activation is overwritten.
+
+        Args:
+            dense (FullyConnectedLayer): Layer providing weights and biases
+            activation (str): "relu", "sigmoid" or "tanh"
+        """
+        if activation not in ("relu", "sigmoid", "tanh"):
+            raise ValueError(f"unsupported activation '{activation}'")
+        super().__init__(dense)
+        self.activation = activation
+
+    def getConfig(self):
+        return {"dense": layer_spec(self.inner), "activation": self.activation}
+
+    @classmethod
+    def fromConfig(cls, config):
+        return cls(build_layer(config["dense"]), config["activation"])
+
+    def fusedForward(self, dataIn):
+        out = self.inner.forward(dataIn)
+        if self.activation == "relu":
+            np.maximum(out, 0, out=out)
+        elif self.activation == "sigmoid":
+            np.negative(out, out=out)
+            np.exp(out, out=out)
+            out += 1
+            np.reciprocal(out, out=out)
+        else:
+            np.tanh(out, out=out)
+        if self.activation != "relu":
+            self.setPrevOut(out)
+        elif is_caching():
+            self.setMask(np.greater(out, 0, out=self.scratch("mask", out.shape, bool)))
+        return out
+
+    def computeInnerGradient(self, gradIn):
+        if self.activation == "relu":
+            return np.multiply(gradIn, self.getMask(), out=self.scratch("grad", gradIn.shape, gradIn.dtype))
+        out = self.getPrevOut()
+        grad = self.scratch("grad", gradIn.shape, np.result_type(gradIn, out))
+        if self.activation == "sigmoid":
+            np.subtract(1, out, out=grad)
+            grad *= out
+            grad += EPSILON
+            grad *= gradIn
+        else:
+            np.multiply(out, out, out=grad)
+            np.subtract(1, grad, out=grad)
+            grad += .000000000000001
+            grad *= gradIn
+        return grad
+
+class FusedConvPoolLayer(FusedLayer):
+    def __init__(self, conv, size, stride=1):
+        """
+        Conv2D/Conv3D + ReLU + max pooling in one pass. Only the conv input,
+        the pooling argmax and a bit mask of the positive pooled outputs are
+        cached; the full-size
+        convolution output is released as soon as it has been pooled.
+
+        Args:
+            conv (Conv2DLayer): Convolution providing the kernel
+            size (int): Pooling window size
+            stride (int): Pooling stride
+        """
+        super().__init__(conv)
+        self.size = size
+        self.stride = stride
+        self.argmax = None
+        self.convShape = None
+
+    def getConfig(self):
+        return {"conv": layer_spec(self.inner), "size": self.size, "stride": self.stride}
+
+    @classmethod
+    def fromConfig(cls, config):
+        return cls(build_layer(config["conv"]), config["size"], config["stride"])
+
+    def cachedArrays(self):
+        return super().cachedArrays() + ([self.argmax] if self.argmax is not None else [])
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        # The conv FLOPs scale with its full-size output, not the pooled one
+        conv = np.empty(0) if self.convShape is None else np.broadcast_to(0.0, self.convShape)
+        if phase == "forward":
+            return self.inner.estimateFlops(phase, dataIn, conv) + 2 * conv.size
+        return self.inner.estimateFlops(phase, conv, dataOut) + 2 * conv.size
+
+    def fusedForward(self, dataIn):
+        z = self.inner.forward(dataIn)
+        self.inner.setPrevOut([])
+        np.maximum(z, 0, out=z)
+        dataOut, argmax = max_pool_forward(z, self.size, self.stride, self.scratchAllocator())
+        self.argmax = argmax
+        self.convShape = z.shape
+        if is_caching():
+            self.setMask(np.greater(dataOut, 0, out=self.scratch("mask", dataOut.shape, bool)))
+        return dataOut
+
+    def computeInnerGradient(self, gradIn):
+        # A pooled value is positive exactly when ReLU passed the winning input
+        grad = np.multiply(gradIn, self.getMask(), out=self.scratch("grad", gradIn.shape, gradIn.dtype))
+        return max_pool_backward(grad, self.argmax, self.convShape, self.size, self.stride,
+                                 self.scratchAllocator())
+
+def fuse(layers):
+    """
+    Replace eligible runs of adjacent layers with fused blocks:
+    FullyConnectedLayer + ReLU/sigmoid/tanh becomes FusedDenseLayer and
+    Conv2D/Conv3D + ReLU + max PoolingLayer becomes FusedConvPoolLayer.
+    Parameters are shared with the original layers.
+
+    Returns:
+        A new list of layers
+    """
+    fused = []
+    i = 0
+    while i < len(layers):
+        layer = layers[i]
+        following = layers[i + 1:i + 3]
+        if isinstance(layer, Conv2DLayer) and len(following) == 2 \
+                and type(following[0]) is ReluLayer and type(following[1]) is PoolingLayer:
+            pool = following[1]
+            block = FusedConvPoolLayer(layer, pool.size, pool.stride)
+            i += 3
+        elif type(layer) is FullyConnectedLayer and following and type(following[0]) in ACTIVATIONS:
+            block = FusedDenseLayer(layer, ACTIVATIONS[type(following[0])])
+            i += 2
+        else:
+            fused.append(layer)
+            i += 1
+            continue
+        block.setArena(layer.arena)
+        fused.append(block)
+    return fused
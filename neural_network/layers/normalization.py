@@ -0,0 +1,282 @@
+# layers/normalization.py
+
+from ..core.base import Layer, is_caching, is_inference
+from ..core.precision import resolve_dtype
+from ..utils.statistics import RunningStatistics
+from .convolution import Conv2DLayer, Conv3DLayer, ConvLayer
+from .dense import FullyConnectedLayer
+import numpy as np
+
+class NormalizationLayer(Layer):
+    parameterNames = ("gamma", "beta")
+    # Backward reads the cached normalized input and inverse std instead
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self, shape, epsilon=1e-5, dtype=None):
+        """
+        Shared parts of BatchNormLayer and LayerNormLayer: the learned scale
+        gamma and shift beta of the given shape, and the normalized input and
+        inverse standard deviation kept for backward.
+        """
+        super().__init__()
+        self.dtype = resolve_dtype(dtype)
+        self.epsilon = epsilon
+        self.gamma = np.ones(shape, dtype=self.dtype)
+        self.beta = np.zeros(shape, dtype=self.dtype)
+        self.gammaGrad = np.zeros_like(self.gamma)
+        self.betaGrad = np.zeros_like(self.beta)
+        self.normalized = None
+        self.invStd = None
+
+    def clearCache(self):
+        super().clearCache()
+        self.normalized = None
+        self.invStd = None
+
+    def cachedArrays(self):
+        return super().cachedArrays() + ([self.normalized] if self.normalized is not None else [])
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        # Statistics, normalization and the affine map each touch every
+        # element a couple of times; backward about twice as much again
+        size = int(np.size(dataIn))
+        return {"forward": 6, "backward": 10, "gradients": 3}[phase] * size
+
+    def normalize(self, dataIn, mean, invStd, gamma, beta):
+        """
+        gamma * (dataIn - mean) * invStd + beta in one output buffer, caching
+        the normalized input for backward when activations are cached.
+        """
+        out = self.outputBuffer(dataIn.shape, dataIn.dtype, dataIn)
+        np.subtract(dataIn, mean, out=out)
+        out *= invStd
+        if is_caching():
+            self.normalized = self.scratch("normalized", out.shape, out.dtype)
+            np.copyto(self.normalized, out)
+            self.invStd = invStd
+        out *= gamma
+        out += beta
+        return out
+
+    def gradient(self):
+        pass
+
+class BatchNormLayer(NormalizationLayer):
+    stateNames = ("runningMean", "runningVar")
+
+    def __init__(self, num_features, momentum=0.1, epsilon=1e-5, dtype=None):
+        """
+        Batch normalization over axis 1 of (N, F) features or (N, F, H, W)
+        feature maps: each feature is normalized with its mean and variance
+        over the batch (and spatial positions), then scaled by gamma and
+        shifted by beta.
+
+        Training passes use the batch statistics and fold them into running
+        estimates. Evaluation (isTraining() False) and inference_mode() use
+        the running estimates, which makes the layer a fixed per-feature
+        affine map that fold() can merge into the preceding
+        FullyConnectedLayer or convolution for serving.
+
+        Running estimates are only updated by passes that cache activations
+        for backward, so segments recomputed by gradient checkpointing count
+        once and finite-difference probes not at all.
+
+        Args:
+            num_features (int): Size of axis 1
+            momentum (float): Weight of each new batch in the running estimates
+            epsilon (float): Added to the variance for numerical stability
+            dtype: Parameter and compute dtype; defaults to the global policy
+        """
+        super().__init__(num_features, epsilon, dtype)
+        self.momentum = momentum
+        self.runningMean = np.zeros(num_features, dtype=self.dtype)
+        self.runningVar = np.ones(num_features, dtype=self.dtype)
+        # Moments of the last training batch, merged across DataParallel replicas
+        self.batchStatistics = None
+        self.usedBatchStatistics = False
+
+    def getConfig(self):
+        return {"num_features": len(self.gamma), "momentum": self.momentum, "epsilon": self.epsilon,
+                "dtype": self.dtype.str}
+
+    def reduceAxes(self, dataIn):
+        """Every axis but the feature axis 1."""
+        return (0,) + tuple(range(2, np.ndim(dataIn)))
+
+    def perFeature(self, values, ndim):
+        """Per-feature values shaped to broadcast along axis 1 of an ndim-dimensional array."""
+        return np.reshape(values, (1, -1) + (1,) * (ndim - 2))
+
+    def updateRunningStatistics(self, stats):
+        """Move the running estimates toward a batch's RunningStatistics, using its unbiased variance."""
+        m = self.momentum
+        variance = stats.variance(ddof=1) if stats.count > 1 else stats.variance(ddof=0)
+        self.runningMean *= 1 - m
+        self.runningMean += m * stats.mean
+        self.runningVar *= 1 - m
+        self.runningVar += m * variance
+
+    def forward(self, dataIn):
+        dataIn = self.castInput(dataIn)
+        ndim = dataIn.ndim
+        training = self.isTraining() and not is_inference()
+        if training:
+            axes = self.reduceAxes(dataIn)
+            mean = dataIn.mean(axis=axes)
+            var = dataIn.var(axis=axes)
+            if is_caching():
+                count = dataIn.size // dataIn.shape[1]
+                self.batchStatistics = RunningStatistics().combine(count, mean.astype(np.float64),
+                                                                   var.astype(np.float64) * count)
+                self.updateRunningStatistics(self.batchStatistics)
+        else:
+            mean, var = self.runningMean, self.runningVar
+        if is_caching():
+            self.usedBatchStatistics = training
+        invStd = 1 / np.sqrt(var + self.epsilon)
+        return self.normalize(dataIn, self.perFeature(mean, ndim), self.perFeature(invStd, ndim),
+                              self.perFeature(self.gamma, ndim), self.perFeature(self.beta, ndim))
+
+    def projections(self, gradIn):
+        """Per-feature sums of gradIn and of gradIn * normalized input."""
+        axes = self.reduceAxes(gradIn)
+        product = np.multiply(gradIn, self.normalized, out=self.scratch("product", gradIn.shape, gradIn.dtype))
+        return gradIn.sum(axis=axes), product.sum(axis=axes)
+
+    def backward(self, gradIn):
+        ndim = gradIn.ndim
+        scale = self.perFeature(self.gamma, ndim) * self.invStd
+        if not self.usedBatchStatistics:
+            return gradIn * scale
+        # The batch mean and variance depend on every input, which adds the
+        # two projection terms to the plain rescaling
+        count = gradIn.size // gradIn.shape[1]
+        sumGrad, sumGradX = self.projections(gradIn)
+        gradOut = self.scratch("grad", gradIn.shape, gradIn.dtype)
+        np.multiply(self.normalized, self.perFeature(sumGradX / count, ndim), out=gradOut)
+        gradOut += self.perFeature(sumGrad / count, ndim)
+        np.subtract(gradIn, gradOut, out=gradOut)
+        gradOut *= scale
+        return gradOut
+
+    def computeGradients(self, gradIn):
+        """Batch-averaged gamma and beta gradients, written into gammaGrad/betaGrad."""
+        n = len(gradIn)
+        sumGrad, sumGradX = self.projections(gradIn)
+        np.divide(sumGradX, n, out=self.gradientBuffer("gamma"))
+        np.divide(sumGrad, n, out=self.gradientBuffer("beta"))
+
+class LayerNormLayer(NormalizationLayer):
+    def __init__(self, normalized_shape, epsilon=1e-5, dtype=None):
+        """
+        Layer normalization: every sample is normalized over its trailing
+        normalized_shape axes with its own mean and variance, then scaled by
+        gamma and shifted by beta (both of normalized_shape). No statistic
+        depends on the rest of the batch, so training and inference compute
+        the same thing and no running estimates are kept. For the same reason
+        the layer cannot be folded into the weights before it.
+
+        Args:
+            normalized_shape (int or tuple): Trailing axes to normalize over
+            epsilon (float): Added to the variance for numerical stability
+            dtype: Parameter and compute dtype; defaults to the global policy
+        """
+        self.normalized_shape = (normalized_shape,) if np.isscalar(normalized_shape) else tuple(normalized_shape)
+        super().__init__(self.normalized_shape, epsilon, dtype)
+
+    def getConfig(self):
+        return {"normalized_shape": list(self.normalized_shape), "epsilon": self.epsilon, "dtype": self.dtype.str}
+
+    def reduceAxes(self, dataIn):
+        """The trailing normalized axes."""
+        return tuple(range(np.ndim(dataIn) - len(self.normalized_shape), np.ndim(dataIn)))
+
+    def forward(self, dataIn):
+        dataIn = self.castInput(dataIn)
+        axes = self.reduceAxes(dataIn)
+        mean = dataIn.mean(axis=axes, keepdims=True)
+        invStd = 1 / np.sqrt(dataIn.var(axis=axes, keepdims=True) + self.epsilon)
+        return self.normalize(dataIn, mean, invStd, self.gamma, self.beta)
+
+    def backward(self, gradIn):
+        axes = self.reduceAxes(gradIn)
+        count = int(np.prod(self.normalized_shape))
+        scaled = np.multiply(gradIn, self.gamma, out=self.scratch("scaled", gradIn.shape, gradIn.dtype))
+        product = np.multiply(scaled, self.normalized, out=self.scratch("product", gradIn.shape, gradIn.dtype))
+        sumGrad = scaled.sum(axis=axes, keepdims=True)
+        sumGradX = product.sum(axis=axes, keepdims=True)
+        gradOut = self.scratch("grad", gradIn.shape, gradIn.dtype)
+        np.multiply(self.normalized, sumGradX / count, out=gradOut)
+        gradOut += sumGrad / count
+        np.subtract(scaled, gradOut, out=gradOut)
+        gradOut *= self.invStd
+        return gradOut
+
+    def computeGradients(self, gradIn):
+        """Batch-averaged gamma and beta gradients, written into gammaGrad/betaGrad."""
+        n = len(gradIn)
+        batchAxes = tuple(range(gradIn.ndim - len(self.normalized_shape)))
+        product = np.multiply(gradIn, self.normalized, out=self.scratch("product", gradIn.shape, gradIn.dtype))
+        np.divide(product.sum(axis=batchAxes), n, out=self.gradientBuffer("gamma"))
+        np.divide(gradIn.sum(axis=batchAxes), n, out=self.gradientBuffer("beta"))
+
+def fold_batch_norm(layer, norm):
+    """
+    A copy of `layer` whose weights absorb the BatchNormLayer `norm` that
+    follows it. With running statistics, norm computes s * z + t per output
+    feature (s = gamma / sqrt(runningVar + epsilon), t = beta - s *
+    runningMean), so scaling the weights of feature f by s[f] and setting its
+    bias to s[f] * b[f] + t[f] gives the same output in evaluation mode with
+    no normalization work at all.
+
+    Args:
+        layer: FullyConnectedLayer, Conv2DLayer or ConvLayer producing norm's input
+        norm (BatchNormLayer): The normalization to fold
+
+    Returns:
+        The folded layer; `layer` and `norm` are left unchanged
+    """
+    scale = norm.gamma / np.sqrt(norm.runningVar + norm.epsilon)
+    shift = norm.beta - scale * norm.runningMean
+    if isinstance(layer, FullyConnectedLayer):
+        weights, biases = layer.weights, layer.biases
+        folded = type(layer).fromConfig(layer.getConfig())
+    elif isinstance(layer, (Conv2DLayer, ConvLayer)) and not isinstance(layer, Conv3DLayer):
+        weights = np.moveaxis(layer.kernel, 0, -1)
+        biases = layer.biases if "biases" in layer.parameterNames else np.zeros(len(scale))
+        folded = type(layer).fromConfig({**layer.getConfig(), "bias": True})
+    else:
+        # Conv3DLayer applies each filter to every input channel, and the
+        # channels it produces get different BatchNorm scales
+        raise ValueError(f"cannot fold BatchNormLayer into {type(layer).__name__}")
+    if weights.shape[-1] != len(scale):
+        raise ValueError(f"{type(layer).__name__} produces {weights.shape[-1]} features, "
+                         f"BatchNormLayer normalizes {len(scale)}")
+
+    folded.setArena(layer.arena)
+    if isinstance(layer, FullyConnectedLayer):
+        folded.assignParameter("weights", weights * scale)
+    else:
+        folded.assignParameter("kernel", np.moveaxis(weights * scale, -1, 0))
+    folded.assignParameter("biases", np.reshape(biases * scale + shift, np.shape(folded.biases)))
+    return folded
+
+def fold(layers):
+    """
+    Replace every FullyConnectedLayer, Conv2DLayer or ConvLayer directly
+    followed by a BatchNormLayer with one folded layer (see fold_batch_norm),
+    for export and serving. LayerNormLayer normalizes with per-sample
+    statistics and is left in place.
+
+    Returns:
+        A new list of layers
+    """
+    folded = []
+    for layer in layers:
+        if type(layer) is BatchNormLayer and folded and type(folded[-1]) in (FullyConnectedLayer, Conv2DLayer,
+                                                                             ConvLayer):
+            folded[-1] = fold_batch_norm(folded[-1], layer)
+        else:
+            folded.append(layer)
+    return folded
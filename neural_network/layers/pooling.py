@@ -1,12 +1,17 @@
 # layers/pooling.py
 
-from ..core.base import Layer
+from ..core.base import Layer, is_inference
+from ..utils.pool_engine import max_pool_forward, max_pool_backward, avg_pool_forward, avg_pool_backward
 import numpy as np
 
 class PoolingLayer(Layer):
+    # Backward only needs the input shape and the cached argmax
+    needsPrevIn = False
+    needsPrevOut = False
+
     def __init__(self, size, stride=1):
         """
-        Initialize a pooling layer.
+        Initialize a max pooling layer.
         
         Args:
             size (int): The size of the pooling window
@@ -15,14 +20,30 @@ class PoolingLayer(Layer):
         super().__init__()
         self.size = size
         self.stride = stride
+        self.argmax = None
+        self.inputShape = None
+
+    def getConfig(self):
+        return {"size": self.size, "stride": self.stride}
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        if phase == "forward":
+            return int(np.size(dataOut)) * self.size * self.size
+        return super().estimateFlops(phase, dataIn, dataOut)
+
+    def cachedArrays(self):
+        return super().cachedArrays() + ([self.argmax] if self.argmax is not None else [])
 
     def forward(self, dataIn):
-        self.setPrevIn(dataIn)
-        self.setPrevOut(self.pool(dataIn))
-        return self.getPrevOut()
+        self.inputShape = dataIn.shape
+        dataOut, argmax = max_pool_forward(dataIn, self.size, self.stride, self.scratchAllocator())
+        if not is_inference():
+            self.argmax = argmax
+        self.setPrevOut(dataOut)
+        return dataOut
 
     def pool(self, dataIn):
-        """Apply pooling across all samples in the batch."""
+        """Reference per-sample pooling across all samples in the batch."""
         return np.array([self.pool3D(dataIn[i]) for i in range(len(dataIn))])
 
     def pool3D(self, dataIn):
@@ -49,9 +70,14 @@ class PoolingLayer(Layer):
         pass
 
     def backward(self, gradIn):
-        """Compute gradient for the pooling layer."""
+        """Scatter gradients to the positions cached by the forward argmax."""
+        return max_pool_backward(gradIn, self.argmax, self.inputShape, self.size, self.stride,
+                                 self.scratchAllocator())
+
+    def referenceBackward(self, gradIn, dataIn):
+        """Reference per-sample, per-channel backward pass for the input dataIn."""
         return np.array([self.backward3D(grad_i, data) 
-                        for data, grad_i in zip(self.getPrevIn(), gradIn)])
+                        for data, grad_i in zip(dataIn, gradIn)])
  
     def backward3D(self, gradIn, prevIn):
         """Compute gradient for each channel in 3D input."""
@@ -64,11 +90,110 @@ class PoolingLayer(Layer):
         dataWidth = data.shape[1]
         output = np.zeros((dataHeight, dataWidth))
 
-        for y in range(gradIn.shape[1]):
-            for x in range(gradIn.shape[0]):
+        for y in range(gradIn.shape[0]):
+            for x in range(gradIn.shape[1]):
                 grid = data[y*self.stride:y*self.stride+self.size, 
                           x*self.stride:x*self.stride+self.size]
                 maxLoc = np.unravel_index(np.argmax(grid), (self.size, self.size))
-                output[y*self.stride+maxLoc[0], x*self.stride+maxLoc[1]] = gradIn[y, x]
+                # Overlapping windows can share a maximum, so gradients add up
+                output[y*self.stride+maxLoc[0], x*self.stride+maxLoc[1]] += gradIn[y, x]
+
+        return output
+
+class AveragePoolingLayer(PoolingLayer):
+    def __init__(self, size, stride=1):
+        """
+        Initialize an average pooling layer.
+
+        Args:
+            size (int): The size of the pooling window
+            stride (int): The stride of the pooling operation
+        """
+        super().__init__(size, stride)
+
+    def forward(self, dataIn):
+        self.inputShape = dataIn.shape
+        dataOut = avg_pool_forward(dataIn, self.size, self.stride)
+        self.setPrevOut(dataOut)
+        return dataOut
+
+    def pool2D(self, dataIn):
+        """Apply average pooling to a single channel."""
+        dataHeight, dataWidth = dataIn.shape
+        outputWidth = int(((dataWidth - self.size) / self.stride) + 1)
+        outputHeight = int(((dataHeight - self.size) / self.stride) + 1)
+        output = np.zeros((outputHeight, outputWidth))
+
+        for y in range(outputHeight):
+            for x in range(outputWidth):
+                output[y, x] = np.mean(
+                    dataIn[y*self.stride:y*self.stride+self.size,
+                          x*self.stride:x*self.stride+self.size]
+                )
+
+        return output
+
+    def backward(self, gradIn):
+        return avg_pool_backward(gradIn, self.inputShape, self.size, self.stride)
+
+    def backwardRow(self, data, gradIn):
+        """Compute gradient for a single channel."""
+        output = np.zeros(data.shape)
+
+        for y in range(gradIn.shape[0]):
+            for x in range(gradIn.shape[1]):
+                output[y*self.stride:y*self.stride+self.size,
+                       x*self.stride:x*self.stride+self.size] += gradIn[y, x] / (self.size * self.size)
+
+        return output
+
+class GlobalMaxPoolingLayer(Layer):
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self):
+        """Max over all spatial positions, mapping (N, C, H, W) to (N, C)."""
+        super().__init__()
+        self.argmax = None
+        self.inputShape = None
+
+    def forward(self, dataIn):
+        self.inputShape = dataIn.shape
+        dataOut, argmax = max_pool_forward(dataIn, dataIn.shape[2:])
+        if not is_inference():
+            self.argmax = argmax
+        dataOut = dataOut.reshape(dataOut.shape[:2])
+        self.setPrevOut(dataOut)
+        return dataOut
+
+    def cachedArrays(self):
+        return super().cachedArrays() + ([self.argmax] if self.argmax is not None else [])
 
-        return output
\ No newline at end of file
+    def gradient(self):
+        pass
+
+    def backward(self, gradIn):
+        shape = self.inputShape
+        return max_pool_backward(gradIn[:, :, np.newaxis, np.newaxis], self.argmax, shape, shape[2:])
+
+class GlobalAveragePoolingLayer(Layer):
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self):
+        """Mean over all spatial positions, mapping (N, C, H, W) to (N, C)."""
+        super().__init__()
+        self.inputShape = None
+
+    def forward(self, dataIn):
+        self.inputShape = dataIn.shape
+        dataOut = dataIn.mean(axis=(2, 3))
+        self.setPrevOut(dataOut)
+        return dataOut
+
+    def gradient(self):
+        pass
+
+    def backward(self, gradIn):
+        N, C, H, W = self.inputShape
+        return np.broadcast_to((gradIn / (H * W))[:, :, np.newaxis, np.newaxis], (N, C, H, W)).copy()
@@ -0,0 +1,204 @@
+# layers/quantized.py
+
+import copy
+import numpy as np
+
+from ..core.base import Layer, inference_mode
+from ..core.model import Sequential
+from ..core.precision import resolve_dtype
+from ..utils.quantization import RangeObserver, int8_matmul, quantize_activations, quantize_weights
+from ..utils.windows import pad2D, window_view
+from .convolution import Conv2DLayer, Conv3DLayer
+from .dense import FullyConnectedLayer
+from .normalization import fold
+
+class QuantizedDenseLayer(Layer):
+    # Checkpointed but not trainable: quantized layers are inference-only
+    stateNames = ("qweights", "weightScales", "biases", "inputScale")
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self, size_in, size_out, dtype=None):
+        """
+        Inference-only FullyConnectedLayer with int8 weights (one scale per
+        output unit) and int8 inputs (one scale calibrated by quantize()).
+        Products are accumulated in int32 and dequantized into the layer's
+        dtype before the float bias is added. Build it with fromLayer or
+        quantize() rather than directly.
+
+        Args:
+            size_in (int): Input size
+            size_out (int): Output size
+            dtype: Output dtype, normally that of the float layer
+        """
+        super().__init__()
+        self.dtype = resolve_dtype(dtype)
+        self.qweights = np.zeros((size_in, size_out), dtype=np.int8)
+        self.weightScales = np.ones(size_out, dtype=np.float32)
+        self.biases = np.zeros((1, size_out), dtype=self.dtype)
+        self.inputScale = np.ones((), dtype=np.float64)
+
+    @classmethod
+    def fromLayer(cls, layer, inputScale):
+        """Quantize a FullyConnectedLayer whose inputs were calibrated to inputScale."""
+        quantized = cls(*layer.weights.shape, dtype=layer.dtype)
+        quantized.qweights, quantized.weightScales = quantize_weights(layer.weights, axis=1)
+        quantized.biases = np.array(layer.biases, dtype=layer.dtype)
+        quantized.inputScale = np.array(inputScale, dtype=np.float64)
+        quantized.setArena(layer.arena)
+        return quantized
+
+    def getConfig(self):
+        size_in, size_out = self.qweights.shape
+        return {"size_in": size_in, "size_out": size_out, "dtype": self.dtype.str}
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        size_in, size_out = self.qweights.shape
+        return 2 * len(dataIn) * size_in * size_out + len(dataIn) * size_out
+
+    def forward(self, dataIn):
+        scale = self.inputScale.item()
+        q = quantize_activations(dataIn, scale, out=self.scratch("q", np.shape(dataIn), np.float32))
+        acc = int8_matmul(q, self.qweights, self.scratchAllocator())
+        out = self.outputBuffer(acc.shape, self.dtype, dataIn)
+        np.multiply(acc, scale * self.weightScales, out=out, casting="same_kind")
+        out += self.biases
+        return out
+
+    def gradient(self):
+        pass
+
+    def backward(self, gradIn):
+        raise RuntimeError(f"{type(self).__name__} is inference-only; train the float model instead")
+
+class QuantizedConv2DLayer(Layer):
+    stateNames = ("qkernel", "kernelScales", "biases", "inputScale")
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self, filters, kernel_size, stride=1, padding=0, bias=False, dtype=None):
+        """
+        Inference-only Conv2DLayer with an int8 kernel (one scale per filter)
+        and int8 inputs; see QuantizedDenseLayer. The im2col GEMM runs on the
+        quantized windows with int32 accumulation.
+
+        Args:
+            filters, kernel_size, stride, padding, bias: As for Conv2DLayer
+            dtype: Output dtype, normally that of the float layer
+        """
+        super().__init__()
+        self.dtype = resolve_dtype(dtype)
+        self.filters = filters
+        self.kernel_size = kernel_size
+        self.stride = stride
+        self.padding = padding
+        self.qkernel = np.zeros((filters,) + tuple(kernel_size), dtype=np.int8)
+        self.kernelScales = np.ones(filters, dtype=np.float32)
+        self.biases = np.zeros(filters if bias else 0, dtype=self.dtype)
+        self.inputScale = np.ones((), dtype=np.float64)
+
+    @classmethod
+    def fromLayer(cls, layer, inputScale):
+        """Quantize a Conv2DLayer (or, for the Conv3D variant, Conv3DLayer) calibrated to inputScale."""
+        bias = "biases" in layer.parameterNames
+        quantized = cls(layer.filters, layer.kernel_size, layer.stride, layer.padding, bias, layer.dtype)
+        quantized.qkernel, quantized.kernelScales = quantize_weights(layer.kernel, axis=0)
+        if bias:
+            quantized.biases = np.array(layer.biases, dtype=layer.dtype)
+        quantized.inputScale = np.array(inputScale, dtype=np.float64)
+        quantized.setArena(layer.arena)
+        return quantized
+
+    def getConfig(self):
+        return {"filters": self.filters, "kernel_size": list(self.kernel_size), "stride": self.stride,
+                "padding": self.padding, "bias": len(self.biases) > 0, "dtype": self.dtype.str}
+
+    def estimateFlops(self, phase, dataIn, dataOut):
+        return 2 * int(np.size(dataOut)) * int(np.prod(self.qkernel.shape[-2:]))
+
+    def toChannels(self, dataIn):
+        """View a (N, H, W) batch as single-channel (N, 1, H, W) input, as Conv2DLayer does."""
+        return dataIn[:, np.newaxis]
+
+    def forward(self, dataIn):
+        scratch = self.scratchAllocator()
+        scale = self.inputScale.item()
+        channels = self.toChannels(dataIn)
+        N, C = channels.shape[:2]
+        F, kh, kw = self.qkernel.shape
+
+        q = quantize_activations(channels, scale, out=self.scratch("q", channels.shape, np.float32))
+        windows = window_view(pad2D(q, self.padding, scratch), kh, kw, self.stride)
+        oh, ow = windows.shape[2:4]
+        cols = self.scratch("cols", windows.shape, np.float32)
+        np.copyto(cols, windows)
+        acc = int8_matmul(cols.reshape(-1, kh * kw), self.qkernel.reshape(F, kh * kw).T, scratch)
+
+        out = self.outputBuffer((N, C * F, oh, ow), self.dtype, dataIn)
+        np.multiply(acc.reshape(N, C, oh, ow, F).transpose(0, 1, 4, 2, 3),
+                    (scale * self.kernelScales)[:, np.newaxis, np.newaxis],
+                    out=out.reshape(N, C, F, oh, ow), casting="same_kind")
+        if len(self.biases):
+            out += np.tile(self.biases, C)[:, np.newaxis, np.newaxis]
+        return out
+
+    def gradient(self):
+        pass
+
+    def backward(self, gradIn):
+        raise RuntimeError(f"{type(self).__name__} is inference-only; train the float model instead")
+
+class QuantizedConv3DLayer(QuantizedConv2DLayer):
+    def toChannels(self, dataIn):
+        return dataIn
+
+# Float layer type -> its quantized counterpart
+QUANTIZED = {
+    FullyConnectedLayer: QuantizedDenseLayer,
+    Conv2DLayer: QuantizedConv2DLayer,
+    Conv3DLayer: QuantizedConv3DLayer,
+}
+
+def calibrate(layers, X, batch_size=256, percentile=100.0):
+    """
+    Run float layers over a calibration sample in inference mode and observe
+    the input range of every layer quantize() would replace.
+
+    Returns:
+        Dict of layer index -> RangeObserver
+    """
+    observers = {i: RangeObserver(percentile) for i, layer in enumerate(layers) if type(layer) in QUANTIZED}
+    with inference_mode():
+        for start in range(0, len(X), batch_size):
+            out = X[start:start + batch_size]
+            for i, layer in enumerate(layers):
+                if i in observers:
+                    observers[i].update(layer.castInput(out))
+                out = layer.forward(out)
+    return observers
+
+def quantize(model, X, batch_size=256, percentile=100.0):
+    """
+    Post-training int8 quantization of a trained model for inference.
+    BatchNorm layers are folded into their dense/conv layers first, input
+    scales are calibrated on the sample X, and every FullyConnectedLayer,
+    Conv2DLayer and Conv3DLayer becomes its Quantized counterpart with
+    per-channel int8 weights. Other layers are copied unchanged (fused blocks
+    and ConvLayer stay in floating point). The float model is not modified;
+    compare the two with utils.quantization.quantization_report.
+
+    Args:
+        model (Sequential): Trained float model
+        X: Calibration sample, representative of serving inputs
+        batch_size (int): Calibration batch size
+        percentile (float): Percentile of |x| per batch that sets the input
+            range; below 100 clips rare outliers for finer resolution
+
+    Returns:
+        A new Sequential for predict(); it cannot be trained
+    """
+    layers = fold(model.layers)
+    observers = calibrate(layers, X, batch_size, percentile)
+    quantized = [QUANTIZED[type(layer)].fromLayer(layer, observers[i].scale()) if i in observers
+                 else copy.deepcopy(layer) for i, layer in enumerate(layers)]
+    return Sequential(quantized)
@@ -1,56 +1,92 @@
 # layers/regularization.py
 
-from ..core.base import Layer
+from ..core.base import Layer, is_inference
+from ..core.precision import float_dtype
+from ..utils.masks import PackedMask
+from ..utils.rng import RandomStream, packed_bernoulli
 import numpy as np
 
 class DropoutLayer(Layer):
-    def __init__(self, keep_prob):
+    # Backward only needs which elements were kept, cached as a bit mask
+    needsPrevIn = False
+    needsPrevOut = False
+
+    def __init__(self, keep_prob, seed=None, stream=0, step=0):
         """
         Initialize a dropout layer.
         
+        Masks come from the layer's own counter-based RandomStream, so the
+        mask drawn at a step depends only on (seed, stream, step) and never on
+        or disturbs NumPy's global RNG. Sequential.seed() assigns every layer
+        its own stream.
+
         Args:
             keep_prob (float): Probability of keeping a neuron active (between 0 and 1)
+            seed (int): Stream seed; drawn from the global RNG if None
+            stream (int): Stream id, normally the layer's index in its model
+            step (int): Step the stream starts at, so a checkpointed layer
+                resumes its mask sequence where it stopped
         """
         super().__init__()
         self.keep_prob = keep_prob
-        self.dropOutKey = None
+        self.rng = RandomStream(seed, stream)
+        self.rng.step = step
+        self.inputShape = None
+
+    def getConfig(self):
+        return {"keep_prob": self.keep_prob, "seed": self.rng.seed, "stream": self.rng.stream,
+                "step": self.rng.step}
 
-    def forward(self, dataIn, test=False, epoch=1):
+    @property
+    def dropOutKey(self):
+        """The last training mask as a bool array, or None after a test-mode pass."""
+        return self.getMask()
+
+    def forward(self, dataIn, test=None, epoch=None):
         """
         Forward pass for dropout layer.
         
         Args:
             dataIn: Input data
-            test (bool): Whether in test mode (no dropout) or training mode
-            epoch (int): Current epoch number for reproducibility
+            test (bool): Whether in test mode (no dropout) or training mode;
+                defaults to the layer's training flag. Dropout is always a
+                no-op inside inference_mode()
+            epoch (int): Step whose mask to draw; if None the layer's own
+                step counter is used and advanced
             
         Returns:
             Output data with dropout applied (or not, if in test mode)
         """
-        self.setPrevIn(dataIn)
+        if is_inference():
+            return dataIn
+        self.inputShape = np.shape(dataIn)
+        if test is None:
+            test = not self.isTraining()
         
         if test:
-            self.setPrevOut(dataIn)
+            self.clearCache()
             return dataIn
         else:
-            # Set random seed for reproducibility
-            np.random.seed(epoch)
-            
-            # Generate dropout mask
-            self.dropOutKey = np.random.rand(*dataIn.shape) < self.keep_prob
-            
+            # The mask is drawn packed and only unpacked transiently here and
+            # in backward, so the layer keeps one bit per element
+            generator = self.rng.next() if epoch is None else self.rng.generator(epoch)
+            mask = PackedMask(packed_bernoulli(generator, self.keep_prob, dataIn.shape), dataIn.shape)
+            self.setMask(mask)
+
             # Apply dropout and scale
-            dataOut = np.multiply(dataIn, self.dropOutKey)
-            dataOut = dataOut / self.keep_prob
-            
-            self.setPrevOut(dataOut)
+            dataOut = np.multiply(dataIn, mask.unpack(),
+                                  out=self.outputBuffer(dataIn.shape, float_dtype(dataIn), dataIn))
+            dataOut /= self.keep_prob
             return dataOut
 
     def gradient(self):
         """
         Compute the gradient for the dropout layer.
         """
-        tensor = np.ones_like(self.dropOutKey) / self.keep_prob
+        mask = self.getMask()
+        if mask is None:
+            return np.ones(self.inputShape)
+        tensor = mask / self.keep_prob
         return tensor
 
     def backward(self, gradIn):
@@ -63,5 +99,9 @@ class DropoutLayer(Layer):
         Returns:
             Gradient for the layer
         """
-        gradOut = gradIn * self.gradient()
-        return gradOut
\ No newline at end of file
+        mask = self.getMask()
+        if mask is None:
+            return gradIn
+        gradOut = np.multiply(gradIn, mask, out=self.scratch("grad", gradIn.shape, gradIn.dtype))
+        gradOut /= self.keep_prob
+        return gradOut
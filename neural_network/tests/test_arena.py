@@ -0,0 +1,78 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.arena import BufferArena
+from neural_network.core.base import inference_mode
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer, SoftmaxLayer, LogisticSigmoidLayer, TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+from neural_network.layers.pooling import PoolingLayer
+from neural_network.utils.optimizers import Adam
+
+def make_cnn(X, seed=0):
+    np.random.seed(seed)
+    return Sequential([InputLayer(X), Conv2DLayer(3, (3, 3), padding=1), ReluLayer(),
+                       PoolingLayer(2, 2), FlattenLayer(), FullyConnectedLayer(3 * 4 * 4, 8),
+                       TanhLayer(), FullyConnectedLayer(8, 8), LogisticSigmoidLayer(),
+                       FullyConnectedLayer(8, 3), SoftmaxLayer()])
+
+def test_request_reuses_by_key_shape_and_dtype():
+    arena = BufferArena()
+    a = arena.request("x", (4, 3), np.float64)
+    assert arena.request("x", (4, 3), np.float64) is a
+    assert arena.request("x", (4, 3), np.float32) is not a
+    assert arena.request("y", (4, 3), np.float64) is not a
+
+    stats = arena.stats()
+    assert stats["allocations"] == 3
+    assert stats["allocations_avoided"] == 1
+    assert stats["bytes_reused"] == a.nbytes
+
+def test_shared_buffers_never_alias_the_input():
+    arena = BufferArena()
+    a = arena.requestShared((2, 2), np.float64)
+    b = arena.requestShared((2, 2), np.float64, avoid=a)
+    assert a is not b
+    assert arena.requestShared((2, 2), np.float64, avoid=b) is a
+
+def test_arena_training_matches_plain_training_and_stops_allocating():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((32, 8, 8))
+    Y = np.eye(3)[rng.integers(0, 3, 32)]
+
+    reference = make_cnn(X)
+    reference.fit(X, Y, SquaredError(), epochs=2, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    model = make_cnn(X)
+    arena = model.useArena()
+    optimizer = Adam(0.01)
+    model.fit(X, Y, SquaredError(), epochs=2, batch_size=16, optimizer=optimizer, shuffle=False)
+    assert arena.allocations > 0
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=1e-10, atol=1e-12)
+
+    # With stable batch shapes every later step is served from the arena
+    arena.resetCounters()
+    model.fit(X, Y, SquaredError(), epochs=1, batch_size=16, optimizer=optimizer, shuffle=False)
+    assert arena.allocations == 0
+    assert arena.stats()["allocations_avoided"] > 0
+    assert arena.stats()["bytes_reused"] > 0
+
+def test_inference_mode_counts_shared_buffers():
+    X = np.random.default_rng(1).standard_normal((8, 8, 8))
+    model = make_cnn(X)
+    arena = BufferArena()
+    with inference_mode(arena):
+        model.forward(X)
+        model.forward(X)
+    assert arena.stats()["allocations_avoided"] >= arena.allocations
+
+if __name__ == "__main__":
+    pytest.main([__file__])
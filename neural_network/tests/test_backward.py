@@ -0,0 +1,58 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.layers.basic import InputLayer, LinearLayer
+from neural_network.layers.activations import ReluLayer, SoftmaxLayer, LogisticSigmoidLayer, TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.regularization import DropoutLayer
+
+def make_layers(X):
+    return [
+        InputLayer(X),
+        LinearLayer(),
+        ReluLayer(),
+        LogisticSigmoidLayer(),
+        SoftmaxLayer(),
+        TanhLayer(),
+        FullyConnectedLayer(X.shape[1], 4),
+        DropoutLayer(0.5),
+    ]
+
+@pytest.mark.parametrize("index", range(8))
+def test_backward_matches_jacobian_path(index):
+    rng = np.random.default_rng(index)
+    X = rng.standard_normal((6, 5))
+    layer = make_layers(X)[index]
+    out = layer.forward(X)
+    G = rng.standard_normal(out.shape)
+
+    if isinstance(layer, InputLayer):
+        # The input layer has no Jacobian; its VJP is the z-score derivative
+        np.testing.assert_allclose(layer.backward(G), G / layer.stdX)
+        return
+
+    np.testing.assert_allclose(layer.backward(G), layer.jacobianBackward(G), rtol=1e-12, atol=1e-12)
+
+def test_softmax_jacobian_is_vectorized():
+    rng = np.random.default_rng(0)
+    layer = SoftmaxLayer()
+    out = layer.forward(rng.standard_normal((3, 4)))
+
+    expected = np.array([np.diag(row) - np.outer(row, row) for row in out])
+    np.testing.assert_allclose(layer.gradient(), expected, rtol=1e-12, atol=1e-15)
+
+def test_dropout_backward_uses_mask():
+    layer = DropoutLayer(0.5)
+    out = layer.forward(np.ones((4, 10)), epoch=3)
+    grad = layer.backward(np.ones((4, 10)))
+
+    np.testing.assert_allclose(grad, out)
+    np.testing.assert_allclose(layer.backward(np.ones((4, 10))) == 0, ~layer.dropOutKey)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,38 @@
+import numpy as np
+import sys
+import os
+import json
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.benchmarks import suite
+
+def test_run_filters_and_reports_timings():
+    results = suite.run("quick", pattern="Conv3DLayer/forward[batch=8", min_time=0.001, repeat=2)
+    assert [r["key"] for r in results] == ["Conv3DLayer/forward[batch=8,channels=3,size=16]"]
+    assert results[0]["median_s"] > 0 and results[0]["loops"] >= 1
+    json.dumps(results)
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"key": "a", "median_s": 1.0}, {"key": "b", "median_s": 1.0},
+                            {"key": "c", "median_s": 1.0}, {"key": "gone", "median_s": 1.0}]}
+    results = [{"key": "a", "median_s": 1.05}, {"key": "b", "median_s": 1.5},
+               {"key": "c", "median_s": 0.5}, {"key": "added", "median_s": 1.0}]
+    status = {row["key"]: row["status"] for row in suite.compare(results, baseline, threshold=0.1)}
+    assert status == {"a": "ok", "b": "regression", "c": "improvement", "added": "new", "gone": "missing"}
+
+def test_main_exit_code(tmp_path):
+    out = tmp_path / "results.json"
+    args = ["--filter", "FlattenLayer/forward[batch=8", "--min-time", "0.001", "--repeat", "2"]
+    assert suite.main(args + ["--output", str(out)]) == 0
+    saved = json.loads(out.read_text())
+    assert saved["environment"]["numpy"] == np.__version__
+
+    saved["results"][0]["median_s"] /= 1000
+    out.write_text(json.dumps(saved))
+    assert suite.main(args + ["--baseline", str(out)]) == 1
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,124 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer, TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+from neural_network.layers.pooling import PoolingLayer
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.utils.checkpoint import save_checkpoint, load_checkpoint
+from neural_network.utils.optimizers import Adam
+
+def make_model(X, seed=0):
+    np.random.seed(seed)
+    return Sequential([InputLayer(X), Conv2DLayer(2, (3, 3), padding=1), ReluLayer(), PoolingLayer(2, 2),
+                       FlattenLayer(), FullyConnectedLayer(32, 8), TanhLayer(), DropoutLayer(1.0),
+                       FullyConnectedLayer(8, 1)])
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((16, 8, 8)), rng.standard_normal((16, 1))
+
+def test_serving_load_is_zero_copy(tmp_path, data):
+    X, Y = data
+    model = make_model(X)
+    model.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=Adam(0.01))
+    path = tmp_path / "model.ckpt"
+    save_checkpoint(path, model)
+
+    loaded, optimizer = load_checkpoint(path)
+    assert optimizer is None
+    assert [type(layer) for layer in loaded.layers] == [type(layer) for layer in model.layers]
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    assert loaded.step == model.step and loaded.history[0]["loss"] == model.history[0]["loss"]
+
+    kernel = loaded.layers[1].kernel
+    assert isinstance(kernel.base, np.memmap) or isinstance(kernel, np.memmap)
+    assert not kernel.flags.writeable
+    assert kernel.ctypes.data % 64 == 0
+
+def test_resume_matches_uninterrupted_training(tmp_path, data):
+    X, Y = data
+    reference = make_model(X)
+    optimizer = Adam(0.01)
+    reference.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=optimizer, shuffle=False)
+    path = tmp_path / "model.ckpt"
+    save_checkpoint(path, reference, optimizer)
+    reference.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=optimizer, shuffle=False)
+
+    resumed, resumed_optimizer = load_checkpoint(path, mode="c")
+    assert type(resumed_optimizer) is Adam and resumed_optimizer.t == 2
+    resumed.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=resumed_optimizer, shuffle=False)
+    np.testing.assert_allclose(resumed.predict(X), reference.predict(X), rtol=1e-12)
+
+    # Copy-on-write: the file still holds the saved weights
+    again, _ = load_checkpoint(path)
+    assert not np.array_equal(again.layers[-1].weights, resumed.layers[-1].weights)
+
+def test_resume_with_dropout_matches_uninterrupted_training(tmp_path, data):
+    X, Y = data
+
+    def make():
+        np.random.seed(0)
+        return Sequential([FlattenLayer(), FullyConnectedLayer(64, 16), TanhLayer(), DropoutLayer(0.5),
+                           FullyConnectedLayer(16, 1)]).seed(7)
+
+    reference = make()
+    optimizer = Adam(0.01)
+    reference.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=optimizer, shuffle=False)
+    path = tmp_path / "model.ckpt"
+    save_checkpoint(path, reference, optimizer)
+    reference.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=optimizer, shuffle=False)
+
+    resumed, resumed_optimizer = load_checkpoint(path, mode="c")
+    assert resumed.layers[3].rng.step == 2
+    resumed.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=resumed_optimizer, shuffle=False)
+    assert resumed.layers[3].rng.step == reference.layers[3].rng.step
+    np.testing.assert_allclose(resumed.predict(X), reference.predict(X), rtol=1e-12)
+
+def test_flat_and_fused_models_round_trip(tmp_path, data):
+    X, Y = data
+    model = make_model(X).fuse()
+    model.flattenParameters()
+    optimizer = Adam(0.01, master_weights=True)
+    model.fit(X, Y, SquaredError(), epochs=1, batch_size=8, optimizer=optimizer)
+    path = tmp_path / "model.ckpt"
+    save_checkpoint(path, model, optimizer)
+
+    loaded, loaded_optimizer = load_checkpoint(path, mode="c")
+    assert loaded.parameterBuffer is not None
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+    (key, state), = loaded_optimizer.state.items()
+    assert key == (id(loaded.parameterBuffer), "flat")
+    np.testing.assert_array_equal(state["m"], next(iter(optimizer.state.values()))["m"])
+
+def test_float32_model_round_trip(tmp_path):
+    rng = np.random.default_rng(1)
+    X, Y = rng.standard_normal((16, 5)).astype(np.float32), rng.standard_normal((16, 2)).astype(np.float32)
+    model = Sequential([FullyConnectedLayer(5, 2, dtype=np.float32)])
+    model.fit(X, Y, SquaredError(), epochs=1, batch_size=8, validation_data=(X, Y))
+    path = tmp_path / "model.ckpt"
+    save_checkpoint(path, model)
+
+    loaded, _ = load_checkpoint(path)
+    assert loaded.layers[0].weights.dtype == np.float32
+    assert loaded.history == model.history
+    np.testing.assert_array_equal(loaded.predict(X), model.predict(X))
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "weights.npy"
+    np.save(path, np.zeros(3))
+    with pytest.raises(ValueError):
+        load_checkpoint(path)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,98 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SoftmaxCrossEntropyWithLogits
+from neural_network.core.profiler import peak_memory
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer, TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.pooling import (PoolingLayer, AveragePoolingLayer, GlobalMaxPoolingLayer,
+                                           GlobalAveragePoolingLayer)
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.benchmarks.checkpoint_benchmark import deep_cnn
+
+def make_model(X, depth=6):
+    np.random.seed(0)
+    layers = [InputLayer(X)]
+    for _ in range(depth):
+        layers += [FullyConnectedLayer(16, 16), TanhLayer(), DropoutLayer(0.8)]
+    return Sequential(layers + [FullyConnectedLayer(16, 4)])
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((32, 16)), np.eye(4)[rng.integers(0, 4, 32)]
+
+def test_layers_cache_only_what_backward_needs(data):
+    X, _ = data
+    dense, relu = FullyConnectedLayer(16, 16), ReluLayer()
+    relu.forward(dense.forward(X))
+    assert dense.getPrevIn() is X and len(dense.getPrevOut()) == 0
+    assert len(relu.getPrevIn()) == 0 and len(relu.getPrevOut()) == 0
+    assert relu.getMask().shape == (32, 16)
+
+@pytest.mark.parametrize("pool", [PoolingLayer(2, 2), AveragePoolingLayer(2, 2), GlobalMaxPoolingLayer(),
+                                  GlobalAveragePoolingLayer()])
+def test_pool_and_flatten_after_relu_cache_only_shapes(pool):
+    # conv -> ReLU -> pool -> flatten: the float ReLU output is not kept alive
+    X = np.random.default_rng(1).standard_normal((8, 4, 16, 16))
+    relu, flatten = ReluLayer(), FlattenLayer()
+    out = flatten.forward(pool.forward(relu.forward(X)))
+    for layer in (relu, pool, flatten):
+        assert len(layer.getPrevIn()) == 0 and len(layer.getPrevOut()) == 0
+    cached = sum(a.nbytes for layer in (relu, pool, flatten) for a in layer.cachedArrays())
+    # ReLU's packed mask plus, for max pooling, the argmax of each pooled output
+    argmax = pool.argmax.nbytes if getattr(pool, "argmax", None) is not None else 0
+    assert cached == sum(a.nbytes for a in relu.cachedArrays()) + argmax
+    assert cached < X.nbytes / 4
+    grad = pool.backward(flatten.backward(np.ones_like(out)))
+    assert grad.shape == X.shape
+
+@pytest.mark.parametrize("segments", [2, 4, [1, 5, 11]])
+def test_checkpointed_gradients_match(data, segments):
+    X, Y = data
+    objective = SoftmaxCrossEntropyWithLogits()
+
+    reference = make_model(X)
+    np.random.seed(1)
+    expected_loss = reference.computeGradients(X, Y, objective)
+    expected_state = np.random.get_state()[1].copy()
+
+    model = make_model(X).setCheckpointing(segments)
+    np.random.seed(1)
+    loss = model.computeGradients(X, Y, objective)
+
+    assert loss == expected_loss
+    # Dropout masks were replayed and the random stream continues where it would have
+    np.testing.assert_array_equal(np.random.get_state()[1], expected_state)
+    for layer, ref in zip(model.layers, reference.layers):
+        for name, grad in layer.getGradients().items():
+            np.testing.assert_array_equal(grad, ref.getGradients()[name])
+
+def test_segment_bounds(data):
+    X, _ = data
+    model = make_model(X, depth=3)
+    assert model.setCheckpointing(3).segmentBounds() == [(0, 4), (4, 7), (7, 11)]
+    assert model.setCheckpointing([4, 8]).segmentBounds() == [(0, 4), (4, 8), (8, 11)]
+
+def test_checkpointing_lowers_peak_memory():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((16, 4, 16, 16))
+    Y = np.eye(10)[rng.integers(0, 10, 16)]
+    objective = SoftmaxCrossEntropyWithLogits()
+
+    peaks = []
+    for segments in (None, 4):
+        model = deep_cnn(16, 4, 16).setCheckpointing(segments)
+        _, peak = peak_memory(lambda: model.computeGradients(X, Y, objective))
+        peaks.append(peak)
+    assert peaks[1] < 0.8 * peaks[0]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,117 @@
+import numpy as np
+import sys
+import os
+import json
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer
+from neural_network.utils.conv_algorithms import (CONV_ALGORITHMS, ConvAutotuner, applicable_algorithms,
+                                                  get_autotuner, set_autotuner)
+from neural_network.utils.conv_engine import conv_forward
+
+rng = np.random.default_rng(0)
+
+@pytest.mark.parametrize("kernel, stride, padding", [(3, 1, 0), (3, 1, 1), (5, 2, 2), (2, 3, 1), (7, 1, 3)])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_algorithms_match_direct(kernel, stride, padding, dtype):
+    X = rng.standard_normal((2, 3, 11, 9)).astype(dtype)
+    K = rng.standard_normal((4, kernel, kernel)).astype(dtype)
+    expected = conv_forward(X, K, stride, padding)
+    tolerance = 1e-10 if dtype == np.float64 else 1e-4
+    for name in applicable_algorithms(K.shape, stride):
+        out = CONV_ALGORITHMS[name](X, K, stride, padding)
+        assert out.dtype == expected.dtype
+        np.testing.assert_allclose(out, expected, rtol=tolerance, atol=tolerance * np.abs(expected).max())
+
+@pytest.mark.parametrize("cls, shape", [(Conv2DLayer, (3, 10, 10)), (Conv3DLayer, (3, 2, 10, 10))])
+@pytest.mark.parametrize("algorithm", ["fft", "winograd"])
+def test_layer_algorithm_matches_reference_and_backward(cls, shape, algorithm):
+    np.random.seed(1)
+    direct = cls(2, (3, 3), padding=1)
+    layer = cls(2, (3, 3), padding=1, algorithm=algorithm)
+    layer.setKernel(direct.kernel)
+    X = rng.standard_normal(shape)
+    G = rng.standard_normal(direct.forward(X).shape)
+
+    np.testing.assert_allclose(layer.forward(X), layer.convolve(X, layer.kernel, 1, 1), rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(layer.backward(G), direct.backward(G), rtol=1e-12)
+    np.testing.assert_allclose(layer.kernelGradient(G), direct.kernelGradient(G), rtol=1e-12)
+
+def test_winograd_requires_3x3_stride_1():
+    with pytest.raises(ValueError):
+        Conv2DLayer(2, (5, 5), algorithm="winograd")
+    with pytest.raises(ValueError):
+        Conv2DLayer(2, (3, 3), stride=2, algorithm="winograd")
+    with pytest.raises(ValueError):
+        Conv2DLayer(2, (3, 3), algorithm="gemm")
+
+def test_autotuner_caches_winner_on_disk(tmp_path):
+    path = str(tmp_path / "tune" / "conv.json")
+    X, K = rng.standard_normal((2, 1, 12, 12)), rng.standard_normal((3, 3, 3))
+    tuner = ConvAutotuner(path, repeat=1)
+    choice = tuner.select(X, K, 1, 1)
+    assert choice in ("direct", "fft", "winograd")
+
+    with open(path) as f:
+        entries = json.load(f)["entries"]
+    assert len(entries) == 1
+    assert set(next(iter(entries.values()))["times"]) == {"direct", "fft", "winograd"}
+
+    # A fresh tuner (e.g. the next process) picks the cached winner without timing
+    fresh = ConvAutotuner(path)
+    fresh.benchmark = lambda *args: pytest.fail("cached problem was re-timed")
+    assert fresh.select(X, K, 1, 1) == choice
+
+    # A new stride, padding or shape is a separate problem
+    other = ConvAutotuner(path, repeat=1)
+    other.select(X, K, 2, 0)
+    assert len(ConvAutotuner(path).entries) == 2
+
+def test_autotuner_ignores_corrupt_cache(tmp_path):
+    path = tmp_path / "conv.json"
+    path.write_text("{not json")
+    tuner = ConvAutotuner(str(path), repeat=1)
+    assert tuner.entries == {}
+    tuner.select(rng.standard_normal((1, 1, 6, 6)), rng.standard_normal((1, 3, 3)))
+    assert len(json.loads(path.read_text())["entries"]) == 1
+
+def test_unwritable_cache_keeps_entries_in_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    # The cache directory would have to be created under a regular file
+    tuner = ConvAutotuner(str(blocker / "conv.json"), repeat=1)
+    previous = get_autotuner()
+    set_autotuner(tuner)
+    try:
+        layer = Conv2DLayer(2, (3, 3), padding=1, algorithm="auto")
+        X = rng.standard_normal((2, 6, 6))
+        np.testing.assert_allclose(layer.forward(X), layer.convolve(X, layer.kernel, 1, 1), rtol=1e-10, atol=1e-12)
+    finally:
+        set_autotuner(previous)
+    assert len(tuner.entries) == 1
+    assert os.listdir(tmp_path) == ["file"]
+
+    # The temp file is written but cannot replace a directory, and is removed
+    directory = tmp_path / "dir"
+    directory.mkdir()
+    ConvAutotuner(str(directory), repeat=1).select(rng.standard_normal((1, 1, 6, 6)), rng.standard_normal((1, 3, 3)))
+    assert sorted(os.listdir(tmp_path)) == ["dir", "file"]
+
+def test_auto_layer_uses_process_autotuner(tmp_path):
+    previous = get_autotuner()
+    tuner = ConvAutotuner(str(tmp_path / "conv.json"), repeat=1)
+    set_autotuner(tuner)
+    try:
+        layer = Conv3DLayer(2, (3, 3), padding=1, algorithm="auto")
+        X = rng.standard_normal((2, 2, 8, 8))
+        np.testing.assert_allclose(layer.forward(X), layer.convolve(X, layer.kernel, 1, 1), rtol=1e-10, atol=1e-12)
+        assert len(tuner.entries) == 1
+        assert Conv3DLayer.fromConfig(layer.getConfig()).algorithm == "auto"
+    finally:
+        set_autotuner(previous)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,110 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer, ConvLayer, depthwise_separable
+from neural_network.utils.gradcheck import gradcheck, differential
+
+def numerical_gradient(f, x, eps=1e-6):
+    """Central-difference gradient of the scalar function f at x."""
+    grad = np.zeros_like(x)
+    for idx in np.ndindex(x.shape):
+        orig = x[idx]
+        x[idx] = orig + eps
+        plus = f()
+        x[idx] = orig - eps
+        minus = f()
+        x[idx] = orig
+        grad[idx] = (plus - minus) / (2 * eps)
+    return grad
+
+@pytest.mark.parametrize("stride, padding", [(1, 0), (2, 0), (1, 1), (2, 2)])
+def test_conv2d_forward_matches_reference(stride, padding):
+    rng = np.random.default_rng(0)
+    layer = Conv2DLayer(4, (3, 3), stride=stride, padding=padding)
+    X = rng.standard_normal((5, 9, 8))
+
+    expected = layer.convolve(X, layer.kernel, padding, stride)
+    np.testing.assert_allclose(layer.forward(X), expected, rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("stride, padding", [(1, 0), (2, 1)])
+def test_conv3d_forward_matches_reference(stride, padding):
+    rng = np.random.default_rng(1)
+    layer = Conv3DLayer(3, (2, 2), stride=stride, padding=padding)
+    X = rng.standard_normal((4, 2, 7, 7))
+
+    expected = layer.convolve(X, layer.kernel, padding, stride)
+    np.testing.assert_allclose(layer.forward(X), expected, rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("cls, shape", [(Conv2DLayer, (2, 6, 5)), (Conv3DLayer, (2, 2, 6, 5))])
+@pytest.mark.parametrize("stride, padding", [(1, 0), (2, 1)])
+def test_conv_backward_matches_numerical_gradient(cls, shape, stride, padding):
+    rng = np.random.default_rng(2)
+    layer = cls(2, (3, 3), stride=stride, padding=padding)
+    X = rng.standard_normal(shape)
+    G = rng.standard_normal(layer.forward(X).shape)
+
+    loss = lambda: np.sum(layer.forward(X) * G)
+    expected_dx = numerical_gradient(loss, X)
+    expected_dk = numerical_gradient(loss, layer.kernel) / shape[0]
+
+    layer.forward(X)
+    np.testing.assert_allclose(layer.backward(G), expected_dx, rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(layer.kernelGradient(G), expected_dk, rtol=1e-6, atol=1e-8)
+
+def test_conv3d_update_kernel():
+    rng = np.random.default_rng(3)
+    layer = Conv3DLayer(2, (3, 3))
+    X = rng.standard_normal((3, 2, 6, 6))
+    out = layer.forward(X)
+    before = layer.getKernel().copy()
+
+    layer.updateKernel(np.ones_like(out), epoch=0, learning_rate=0.01)
+
+    assert layer.getKernel().shape == before.shape
+    assert not np.allclose(layer.getKernel(), before)
+
+@pytest.mark.parametrize("channels, filters, kernel, options", [
+    (4, 6, 3, {"stride": 2, "padding": 1}),
+    (4, 6, (3, 2), {"padding": (1, 0), "dilation": (2, 1), "groups": 2}),
+    (3, 6, 3, {"dilation": 2, "groups": 3}),
+    (3, 3, 3, {"stride": (2, 1), "padding": 2, "groups": 3, "bias": False}),
+    (4, 8, 1, {}),
+])
+def test_grouped_conv_matches_reference_and_gradients(channels, filters, kernel, options):
+    rng = np.random.default_rng(0)
+    np.random.seed(0)
+    layer = ConvLayer(channels, filters, kernel, **options)
+    if "biases" in layer.parameterNames:
+        layer.biases = rng.standard_normal(filters)
+    X = rng.standard_normal((2, channels, 9, 10))
+
+    assert differential(layer, X)["passed"]
+    result = gradcheck(layer, X)
+    assert result["passed"], result
+    assert set(result) == {"input", "passed"} | set(layer.parameterNames)
+
+def test_conv_layer_validates_groups():
+    with pytest.raises(ValueError):
+        ConvLayer(4, 6, 3, groups=3)
+
+def test_depthwise_separable_costs_fewer_flops():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((2, 32, 16, 16))
+    dense = ConvLayer(32, 64, 3, padding=1)
+    depthwise, pointwise = depthwise_separable(32, 64, 3, padding=1, rng=0)
+
+    out = dense.forward(X)
+    mid = depthwise.forward(X)
+    assert pointwise.forward(mid).shape == out.shape == (2, 64, 16, 16)
+    ratio = dense.estimateFlops("forward", X, out) / (
+        depthwise.estimateFlops("forward", X, mid) + pointwise.estimateFlops("forward", mid, out))
+    assert 7.5 < ratio < 9
+    assert depthwise.kernel.shape == (32, 1, 3, 3) and pointwise.kernel.shape == (64, 32, 1, 1)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
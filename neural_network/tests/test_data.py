@@ -0,0 +1,125 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.utils.data import ShardedDataset, DataLoader, compute_statistics
+from neural_network.utils.optimizers import SGD
+from neural_network.utils.statistics import RunningStatistics
+
+@pytest.fixture
+def shards(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((50, 3)) * [1.0, 10.0, 1e-3] + [5.0, -2.0, 1e4]
+    np.save(tmp_path / "x0.npy", X[:20])
+    X[20:35].tofile(tmp_path / "x1.bin")
+    np.save(tmp_path / "x2.npy", X[35:])
+    paths = [str(tmp_path / name) for name in ("x0.npy", "x1.bin", "x2.npy")]
+    return X, ShardedDataset(paths, dtype=np.float64, shape=(3,))
+
+def test_sharded_dataset_indexing(shards):
+    X, dataset = shards
+    assert len(dataset) == 50 and dataset.shape == (50, 3)
+    np.testing.assert_array_equal(dataset[18:40], X[18:40])
+    index = np.array([49, 0, 21, 20, 36, 3])
+    np.testing.assert_array_equal(dataset[index], X[index])
+    np.testing.assert_array_equal(dataset[25], X[25])
+    np.testing.assert_array_equal(dataset[-1], X[-1])
+    np.testing.assert_array_equal(dataset[np.array([-50, -16, 2])], X[[-50, -16, 2]])
+    np.testing.assert_array_equal(dataset[-20:-5], X[-20:-5])
+    for bad in (50, -51, np.array([0, 50])):
+        with pytest.raises(IndexError):
+            dataset[bad]
+
+def test_streaming_statistics_match_numpy(shards):
+    X, dataset = shards
+    stats = compute_statistics(dataset, chunk_size=7)
+    assert stats.count == 50
+    np.testing.assert_allclose(stats.mean, X.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(stats.std(), X.std(axis=0, ddof=1), rtol=1e-9)
+
+    layer = InputLayer(mean=stats.mean, std=stats.std())
+    np.testing.assert_allclose(layer.forward(X), InputLayer(X).forward(X), rtol=1e-6, atol=1e-6)
+    with pytest.raises(ValueError):
+        InputLayer()
+    with pytest.raises(ValueError):
+        RunningStatistics().update(X[:1]).std()
+
+def test_merged_shard_statistics_match_single_pass(shards):
+    X, dataset = shards
+    parts = [compute_statistics(shard, chunk_size=4) for shard in dataset.shards]
+    merged = RunningStatistics.merged(parts)
+    assert merged.count == 50 and [part.count for part in parts] == [20, 15, 15]
+    np.testing.assert_allclose(merged.mean, X.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(merged.std(), X.std(axis=0, ddof=1), rtol=1e-9)
+    assert RunningStatistics().merge(RunningStatistics()).count == 0
+
+def test_input_layer_built_incrementally_and_merged(shards):
+    X, _ = shards
+    layer = InputLayer(statistics=RunningStatistics())
+    for start in range(0, 30, 8):
+        layer.update(X[start:min(start + 8, 30)])
+    # Another worker's statistics of the remaining rows
+    layer.merge(InputLayer(X[30:]))
+    np.testing.assert_allclose(layer.meanX, X.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(layer.stdX, X.std(axis=0, ddof=1), rtol=1e-9)
+    np.testing.assert_allclose(layer.forward(X), InputLayer(X).forward(X), rtol=1e-6, atol=1e-6)
+    with pytest.raises(ValueError):
+        layer.merge(InputLayer(mean=0.0, std=1.0))
+
+def test_loader_covers_every_sample_once(shards):
+    X, dataset = shards
+    Y = np.arange(50)
+    loader = DataLoader(dataset, Y, batch_size=8, shuffle=True, seed=0, prefetch=2)
+    assert len(loader) == 7
+    for _ in range(2):
+        batches = list(loader)
+        assert [len(yb) for _, yb in batches] == [8] * 6 + [2]
+        seen = np.concatenate([yb for _, yb in batches])
+        np.testing.assert_array_equal(np.sort(seen), Y)
+        for xb, yb in batches:
+            np.testing.assert_array_equal(xb, X[yb])
+
+    assert len(list(DataLoader(dataset, batch_size=8, drop_last=True))) == 6
+
+def test_loader_stops_cleanly_and_reports_errors(shards):
+    _, dataset = shards
+    loader = DataLoader(dataset, batch_size=4, prefetch=1)
+    for i, _ in enumerate(loader):
+        if i == 1:
+            break
+
+    class Broken:
+        def __len__(self):
+            return 8
+        def __getitem__(self, index):
+            raise IOError("disk gone")
+
+    with pytest.raises(IOError, match="disk gone"):
+        list(DataLoader(Broken(), batch_size=4))
+
+def test_fit_from_loader_matches_arrays():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((40, 3))
+    Y = rng.standard_normal((40, 1))
+
+    def make():
+        np.random.seed(0)
+        return Sequential([InputLayer(X), FullyConnectedLayer(3, 1)])
+
+    reference = make()
+    expected = reference.fit(X, Y, SquaredError(), epochs=2, batch_size=8, optimizer=SGD(0.1), shuffle=False)
+    model = make()
+    history = model.fit(DataLoader(X, Y, batch_size=8, shuffle=False), objective=SquaredError(), epochs=2,
+                        optimizer=SGD(0.1))
+    np.testing.assert_allclose([h["loss"] for h in history], [h["loss"] for h in expected], rtol=1e-12)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
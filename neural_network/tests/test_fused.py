@@ -0,0 +1,118 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer, LogisticSigmoidLayer, TanhLayer, SoftmaxLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer
+from neural_network.layers.pooling import PoolingLayer
+from neural_network.layers.fused import FusedDenseLayer, FusedConvPoolLayer, fuse
+from neural_network.utils.optimizers import Adam, SGD
+
+def run_layers(layers, X, G):
+    out = X
+    for layer in layers:
+        out = layer.forward(out)
+    out = out.copy()
+    grad = G
+    for layer in reversed(layers):
+        layer.computeGradients(grad)
+        grad = layer.backward(grad)
+    return out, grad
+
+@pytest.mark.parametrize("activation_cls", [ReluLayer, LogisticSigmoidLayer, TanhLayer])
+def test_fused_dense_matches_unfused(activation_cls):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((8, 5))
+    G = rng.standard_normal((8, 4))
+    dense = FullyConnectedLayer(5, 4)
+
+    out, grad = run_layers([dense, activation_cls()], X, G)
+    expected_grads = {k: v.copy() for k, v in dense.getGradients().items()}
+
+    fused = fuse([dense, activation_cls()])
+    assert len(fused) == 1 and isinstance(fused[0], FusedDenseLayer)
+    fused_out, fused_grad = run_layers(fused, X, G)
+
+    np.testing.assert_allclose(fused_out, out, rtol=1e-12)
+    np.testing.assert_allclose(fused_grad, grad, rtol=1e-12)
+    for name, value in fused[0].getGradients().items():
+        np.testing.assert_allclose(value, expected_grads[name], rtol=1e-12)
+
+@pytest.mark.parametrize("conv_cls, shape", [(Conv2DLayer, (4, 8, 8)), (Conv3DLayer, (4, 2, 8, 8))])
+def test_fused_conv_pool_matches_unfused(conv_cls, shape):
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal(shape)
+    conv = conv_cls(3, (3, 3), padding=1)
+    layers = [conv, ReluLayer(), PoolingLayer(2, 2)]
+
+    out = X
+    for layer in layers:
+        out = layer.forward(out)
+    G = rng.standard_normal(out.shape)
+    out, grad = run_layers(layers, X, G)
+    expected_kernel_grad = conv.kernelGrad.copy()
+
+    fused = fuse(layers)
+    assert len(fused) == 1 and isinstance(fused[0], FusedConvPoolLayer)
+    fused_out, fused_grad = run_layers(fused, X, G)
+
+    np.testing.assert_allclose(fused_out, out, rtol=1e-12)
+    np.testing.assert_allclose(fused_grad, grad, rtol=1e-12, atol=1e-14)
+    np.testing.assert_allclose(fused[0].getGradients()["kernel"], expected_kernel_grad, rtol=1e-12)
+    # The full-size conv output is not kept alive
+    assert len(conv.getPrevOut()) == 0
+
+def test_sequential_fuse_trains_identically():
+    rng = np.random.default_rng(2)
+    X = rng.standard_normal((32, 8, 8))
+    Y = np.eye(3)[rng.integers(0, 3, 32)]
+
+    def make():
+        np.random.seed(0)
+        return Sequential([InputLayer(X), Conv2DLayer(2, (3, 3)), ReluLayer(), PoolingLayer(2, 2),
+                           FlattenLayer(), FullyConnectedLayer(18, 8), TanhLayer(),
+                           FullyConnectedLayer(8, 3), SoftmaxLayer()])
+
+    reference = make()
+    reference.fit(X, Y, SquaredError(), epochs=2, batch_size=8, optimizer=Adam(0.01), shuffle=False)
+
+    model = make().fuse()
+    assert [type(layer).__name__ for layer in model.layers] == [
+        "InputLayer", "FusedConvPoolLayer", "FlattenLayer", "FusedDenseLayer",
+        "FullyConnectedLayer", "SoftmaxLayer"]
+    model.fit(X, Y, SquaredError(), epochs=2, batch_size=8, optimizer=Adam(0.01), shuffle=False)
+
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=1e-10)
+
+@pytest.mark.parametrize("arena", [False, True])
+def test_fused_first_layer_trains_identically(arena):
+    # Without an InputLayer the fused block is layer 0, whose backward never
+    # runs; with an arena its incoming gradient reuses one buffer every step
+    rng = np.random.default_rng(3)
+    X = rng.standard_normal((24, 5))
+    Y = rng.standard_normal((24, 2))
+
+    def make():
+        np.random.seed(0)
+        return Sequential([FullyConnectedLayer(5, 4), TanhLayer(), FullyConnectedLayer(4, 2)])
+
+    reference = make()
+    model = make().fuse()
+    assert type(model.layers[0]) is FusedDenseLayer
+    for m in (reference, model):
+        if arena:
+            m.useArena()
+        m.fit(X, Y, SquaredError(), epochs=3, batch_size=8, optimizer=SGD(0.1), shuffle=False)
+
+    np.testing.assert_allclose(model.layers[0].inner.weights, reference.layers[0].weights, rtol=1e-12)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
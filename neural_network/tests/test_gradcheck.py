@@ -0,0 +1,170 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.base import Layer
+from neural_network.core.objective import (SquaredError, LogLoss, CrossEntropy, NegativeLikelihood,
+                                           SoftmaxCrossEntropyWithLogits, SigmoidCrossEntropyWithLogits)
+from neural_network.layers.activations import ReluLayer, LogisticSigmoidLayer, SoftmaxLayer, TanhLayer
+from neural_network.layers.basic import InputLayer, LinearLayer, FlattenLayer
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer, ConvLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.fused import FusedLayer, FusedDenseLayer, FusedConvPoolLayer
+from neural_network.layers.pooling import (PoolingLayer, AveragePoolingLayer, GlobalMaxPoolingLayer,
+                                           GlobalAveragePoolingLayer)
+from neural_network.layers.normalization import NormalizationLayer, BatchNormLayer, LayerNormLayer
+from neural_network.layers.quantized import QuantizedDenseLayer, QuantizedConv2DLayer, QuantizedConv3DLayer
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.utils.conv_algorithms import applicable_algorithms
+from neural_network.utils.gradcheck import gradcheck, objective_gradcheck, differential, compare
+
+rng = np.random.default_rng(0)
+FEATURES = rng.standard_normal((5, 6))
+IMAGES = rng.standard_normal((3, 7, 9))
+VOLUMES = rng.standard_normal((2, 3, 6, 8))
+
+def seeded(factory):
+    np.random.seed(0)
+    return factory()
+
+# name -> (layer factory, input, gradcheck options)
+CASES = {
+    "FullyConnectedLayer": (lambda: FullyConnectedLayer(6, 4), FEATURES, {}),
+    "ReluLayer": (ReluLayer, FEATURES, {}),
+    "LogisticSigmoidLayer": (LogisticSigmoidLayer, FEATURES, {}),
+    "SoftmaxLayer": (SoftmaxLayer, FEATURES, {}),
+    "TanhLayer": (TanhLayer, FEATURES, {}),
+    "LinearLayer": (LinearLayer, FEATURES, {}),
+    "InputLayer": (lambda: InputLayer(FEATURES * 3 + 1), FEATURES, {}),
+    "FlattenLayer": (FlattenLayer, VOLUMES, {}),
+    "Conv2DLayer": (lambda: Conv2DLayer(3, (3, 2), stride=2, padding=1), IMAGES, {}),
+    "Conv3DLayer": (lambda: Conv3DLayer(2, (3, 3), padding=1), VOLUMES, {}),
+    "ConvLayer": (lambda: ConvLayer(3, 4, 3, stride=(1, 2), padding=1, dilation=2), VOLUMES, {}),
+    "PoolingLayer": (lambda: PoolingLayer(2, 1), VOLUMES, {}),
+    "AveragePoolingLayer": (lambda: AveragePoolingLayer(3, 2), VOLUMES, {}),
+    "GlobalMaxPoolingLayer": (GlobalMaxPoolingLayer, VOLUMES, {}),
+    "GlobalAveragePoolingLayer": (GlobalAveragePoolingLayer, VOLUMES, {}),
+    "DropoutLayer": (lambda: DropoutLayer(0.7, seed=0), FEATURES, {"batched": False}),
+    "FusedDenseLayer": (lambda: FusedDenseLayer(FullyConnectedLayer(6, 4), "tanh"), FEATURES, {}),
+    "FusedConvPoolLayer": (lambda: FusedConvPoolLayer(Conv2DLayer(2, (3, 3), padding=1), 2, 2), IMAGES, {}),
+    "BatchNormLayer": (lambda: BatchNormLayer(3), VOLUMES, {"batched": False}),
+    "LayerNormLayer": (lambda: LayerNormLayer((6, 8)), VOLUMES, {}),
+}
+
+def all_subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from all_subclasses(sub)
+
+# Base classes, and quantized layers, which are inference-only and have no backward
+UNCHECKED = (FusedLayer, NormalizationLayer, QuantizedDenseLayer, QuantizedConv2DLayer, QuantizedConv3DLayer)
+
+def test_every_layer_has_a_gradcheck_case():
+    layers = {cls.__name__ for cls in all_subclasses(Layer)
+              if cls.__module__.startswith("neural_network.layers") and cls not in UNCHECKED}
+    assert layers <= set(CASES), f"missing gradcheck cases: {sorted(layers - set(CASES))}"
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_layer_gradients(name):
+    factory, X, options = CASES[name]
+    layer = seeded(factory)
+    if isinstance(layer, DropoutLayer):
+        options = dict(options, forward=lambda x: layer.forward(x, epoch=0))
+    result = gradcheck(layer, X, **options)
+    assert result["passed"], result
+
+@pytest.mark.parametrize("activation", ["relu", "sigmoid"])
+def test_fused_dense_activations(activation):
+    layer = seeded(lambda: FusedDenseLayer(FullyConnectedLayer(6, 4), activation))
+    result = gradcheck(layer, FEATURES)
+    assert result["passed"], result
+
+def test_float32_gradients_use_dtype_tolerances():
+    layer = seeded(lambda: Conv2DLayer(2, (3, 3), padding=1, dtype=np.float32))
+    result = gradcheck(layer, IMAGES.astype(np.float32))
+    assert result["passed"], result
+
+def test_gradcheck_catches_a_wrong_backward():
+    class Broken(TanhLayer):
+        def backward(self, gradIn):
+            return super().backward(gradIn) * 1.01
+
+    assert not gradcheck(Broken(), FEATURES)["passed"]
+    assert not gradcheck(seeded(lambda: Conv2DLayer(2, (3, 3))), IMAGES, eps=1e-6, rtol=1e-12)["passed"]
+
+@pytest.mark.parametrize("objective, mean_over, logits", [
+    (SquaredError(), "elements", False),
+    (LogLoss(), "elements", False),
+    (CrossEntropy(), "samples", False),
+    (NegativeLikelihood(), "elements", False),
+    (SoftmaxCrossEntropyWithLogits(), "samples", True),
+    (SigmoidCrossEntropyWithLogits(), "elements", True),
+])
+def test_objective_gradients(objective, mean_over, logits):
+    Y = np.eye(4)[rng.integers(0, 4, 6)]
+    Yhat = rng.standard_normal((6, 4)) if logits else rng.uniform(0.1, 0.9, (6, 4))
+    result = objective_gradcheck(objective, Y, Yhat, mean_over)
+    assert result["passed"], result
+
+def test_integer_label_objective_gradient():
+    labels = rng.integers(0, 4, 6)
+    assert objective_gradcheck(SoftmaxCrossEntropyWithLogits(), labels, rng.standard_normal((6, 4)))["passed"]
+
+def random_case(seed, dtype):
+    """A random layer kind and input shape for the differential checks."""
+    r = np.random.default_rng(seed)
+    np.random.seed(seed)
+    h, w = r.integers(6, 13, 2)
+    kind = ("conv2d", "conv3d", "maxpool", "avgpool", "dense", "activation", "grouped")[seed % 7]
+    if kind == "conv2d":
+        kernel, stride = tuple(r.integers(1, 5, 2)), int(r.integers(1, 4))
+        layer = Conv2DLayer(int(r.integers(1, 5)), kernel, stride=stride, padding=int(r.integers(0, 3)), dtype=dtype,
+                            algorithm=str(r.choice(applicable_algorithms(kernel, stride))))
+        shape = (int(r.integers(1, 4)), h, w)
+    elif kind == "conv3d":
+        kernel, stride = tuple(r.integers(1, 4, 2)), int(r.integers(1, 3))
+        layer = Conv3DLayer(int(r.integers(1, 4)), kernel, stride=stride, padding=int(r.integers(0, 2)), dtype=dtype,
+                            algorithm=str(r.choice(applicable_algorithms(kernel, stride))))
+        shape = (int(r.integers(1, 4)), int(r.integers(1, 4)), h, w)
+    elif kind == "grouped":
+        groups = int(r.integers(1, 4))
+        layer = ConvLayer(groups * int(r.integers(1, 3)), groups * int(r.integers(1, 3)), tuple(r.integers(1, 4, 2)),
+                          stride=tuple(r.integers(1, 3, 2)), padding=tuple(r.integers(0, 2, 2)),
+                          dilation=tuple(r.integers(1, 3, 2)), groups=groups, dtype=dtype)
+        shape = (int(r.integers(1, 4)), layer.kernel.shape[1] * groups, h, w)
+    elif kind in ("maxpool", "avgpool"):
+        cls = PoolingLayer if kind == "maxpool" else AveragePoolingLayer
+        layer = cls(int(r.integers(2, 4)), int(r.integers(1, 4)))
+        shape = (int(r.integers(1, 4)), int(r.integers(1, 4)), h, w)
+    elif kind == "dense":
+        layer = FullyConnectedLayer(int(h), int(w), dtype=dtype)
+        shape = (int(r.integers(1, 6)), int(h))
+    else:
+        layer = (ReluLayer, LogisticSigmoidLayer, SoftmaxLayer, TanhLayer, LinearLayer)[seed % 5]()
+        shape = (int(r.integers(1, 6)), int(w))
+    return layer, r.standard_normal(shape).astype(dtype)
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("seed", range(28))
+def test_fast_kernels_match_references(seed, dtype):
+    layer, X = random_case(seed, dtype)
+    result = differential(layer, X, seed=seed)
+    assert len(result) > 1 and result["passed"], (type(layer).__name__, X.shape, result)
+
+def test_dropout_backward_matches_jacobian():
+    layer = DropoutLayer(0.6, seed=3)
+    result = differential(layer, FEATURES)
+    assert "backward" in result and result["passed"], result
+
+def test_compare_uses_dtype_tolerances():
+    ref = np.linspace(-1, 1, 50)
+    assert compare(ref + 1e-6, ref)["passed"] is False
+    assert compare((ref + 1e-6).astype(np.float32), ref)["passed"] is True
+    assert compare(ref[:10], ref)["passed"] is False
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,106 @@
+import numpy as np
+import sys
+import os
+import tracemalloc
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.base import inference_mode, is_inference
+from neural_network.core.model import Sequential
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.activations import ReluLayer, SoftmaxLayer, LogisticSigmoidLayer, TanhLayer
+from neural_network.layers.basic import FlattenLayer
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.pooling import (PoolingLayer, AveragePoolingLayer, GlobalMaxPoolingLayer,
+                                           GlobalAveragePoolingLayer)
+from neural_network.layers.regularization import DropoutLayer
+
+def make_model(X, width=32):
+    np.random.seed(0)
+    return Sequential([InputLayer(X), FullyConnectedLayer(X.shape[1], width), ReluLayer(),
+                       DropoutLayer(0.5), FullyConnectedLayer(width, width), TanhLayer(),
+                       FullyConnectedLayer(width, width), LogisticSigmoidLayer(),
+                       FullyConnectedLayer(width, 5), SoftmaxLayer()])
+
+def test_inference_matches_eval_forward_without_caching():
+    X = np.random.default_rng(0).standard_normal((16, 8))
+    model = make_model(X)
+    model.eval()
+    expected = model.forward(X)
+
+    fresh = make_model(X)
+    with inference_mode():
+        assert is_inference()
+        out = fresh.forward(X)
+    assert not is_inference()
+
+    np.testing.assert_allclose(out, expected, rtol=1e-12)
+    for layer in fresh.layers:
+        assert len(layer.getPrevIn()) == 0 and len(layer.getPrevOut()) == 0
+
+@pytest.mark.parametrize("layers, shape", [
+    (lambda: [Conv2DLayer(2, (3, 3)), ReluLayer(), PoolingLayer(2, 2), FlattenLayer(),
+              FullyConnectedLayer(18, 3)], (6, 8, 8)),
+    (lambda: [Conv3DLayer(2, (3, 3), padding=1), AveragePoolingLayer(2, 2), FlattenLayer()], (6, 2, 6, 6)),
+    (lambda: [Conv2DLayer(3, (3, 3)), GlobalMaxPoolingLayer()], (6, 7, 7)),
+    (lambda: [Conv3DLayer(2, (2, 2)), GlobalAveragePoolingLayer()], (6, 2, 5, 5)),
+])
+def test_conv_and_pooling_predict_follows_inputs(layers, shape):
+    rng = np.random.default_rng(3)
+    X, X2 = rng.standard_normal(shape), rng.standard_normal(shape)
+    np.random.seed(0)
+    model = Sequential(layers())
+
+    # A fresh model has never cached anything
+    first = model.predict(X)
+    model.eval()
+    np.testing.assert_allclose(first, model.forward(X), rtol=1e-12)
+    # After a training-style forward, predict still follows its own input
+    np.testing.assert_allclose(model.predict(X2), model.forward(X2), rtol=1e-12)
+    np.testing.assert_allclose(model.predict(X), first, rtol=1e-12)
+
+def test_dropout_is_noop_in_inference_mode():
+    X = np.ones((4, 6))
+    layer = DropoutLayer(0.5)
+    with inference_mode():
+        assert layer.forward(X, test=False) is X
+
+def test_buffers_are_reused_and_predict_returns_copies():
+    X = np.random.default_rng(1).standard_normal((16, 8))
+    model = make_model(X)
+
+    with inference_mode():
+        first = model.forward(X)
+        second = model.forward(X)
+    assert first is second
+
+    a = model.predict(X)
+    b = model.predict(2 * X)
+    assert not np.shares_memory(a, b)
+    assert not np.allclose(a, b)
+    np.testing.assert_allclose(model.predict(X, batch_size=5), a, rtol=1e-12)
+
+def test_inference_lowers_peak_memory():
+    X = np.random.default_rng(2).standard_normal((2048, 64))
+    model = make_model(X, width=256)
+    model.predict(X)
+
+    def peak(fn):
+        tracemalloc.start()
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak_bytes
+
+    def training_forward():
+        model.eval()
+        model.forward(X)
+        model.clearCaches()
+
+    assert peak(lambda: model.predict(X)) < 0.5 * peak(training_forward)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -7,7 +7,9 @@ import pytest
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 # Import the objective functions.
-from neural_network.core.objective import SquaredError, NegativeLikelihood, CrossEntropy
+from neural_network.core.objective import SquaredError, NegativeLikelihood, CrossEntropy, LogLoss, \
+    SoftmaxCrossEntropyWithLogits, SigmoidCrossEntropyWithLogits
+from neural_network.layers.activations import SoftmaxLayer, LogisticSigmoidLayer
 
 def test_squared_error_loss():
     # Instantiate the squared error loss function
@@ -71,5 +73,48 @@ def test_cross_entropy_loss():
     grad = L3.gradient(Y, Yhat)
     np.testing.assert_allclose(grad, expected_grad, rtol=1e-5, atol=1e-5)
 
+def test_softmax_cross_entropy_with_logits():
+    rng = np.random.default_rng(0)
+    logits = rng.standard_normal((6, 4))
+    labels = rng.integers(0, 4, 6)
+    Y = np.eye(4)[labels]
+    L = SoftmaxCrossEntropyWithLogits()
+
+    # Same loss and logits gradient as SoftmaxLayer followed by CrossEntropy
+    softmax = SoftmaxLayer()
+    Yhat = softmax.forward(logits)
+    expected_grad = softmax.backward(CrossEntropy().gradient(Y, Yhat))
+    np.testing.assert_allclose(L.eval(Y, logits), CrossEntropy().eval(Y, Yhat), rtol=1e-5)
+    np.testing.assert_allclose(L.gradient(Y, logits), expected_grad, rtol=1e-5, atol=1e-6)
+    np.testing.assert_allclose(L.gradient(Y, logits), Yhat - Y, rtol=1e-12, atol=1e-15)
+
+    # Integer class labels give the same result as one-hot targets
+    np.testing.assert_allclose(L.eval(labels, logits), L.eval(Y, logits), rtol=1e-12)
+    np.testing.assert_allclose(L.gradient(labels, logits), L.gradient(Y, logits), rtol=1e-12)
+
+def test_softmax_cross_entropy_with_logits_is_stable():
+    L = SoftmaxCrossEntropyWithLogits()
+    logits = np.array([[1000.0, 0.0, -1000.0]])
+    Y = np.array([[0, 1, 0]])
+    np.testing.assert_allclose(L.eval(Y, logits), 1000.0)
+    np.testing.assert_allclose(L.gradient(Y, logits), [[1.0, -1.0, 0.0]], atol=1e-12)
+
+def test_sigmoid_cross_entropy_with_logits():
+    logits = np.array([[-2.0], [0.5], [800.0], [-800.0]])
+    Y = np.array([[0], [1], [1], [0]])
+    L = SigmoidCrossEntropyWithLogits()
+
+    p = 1 / (1 + np.exp(-logits[:2]))
+    expected_loss = np.mean(-(Y[:2] * np.log(p) + (1 - Y[:2]) * np.log(1 - p)))
+    np.testing.assert_allclose(L.eval(Y[:2], logits[:2]), expected_loss, rtol=1e-12)
+    np.testing.assert_allclose(L.eval(Y[2:], logits[2:]), 0.0, atol=1e-12)
+    np.testing.assert_allclose(L.gradient(Y, logits), L.activation(logits) - Y, rtol=1e-12)
+
+    # Matches LogisticSigmoidLayer followed by LogLoss up to their EPSILON terms
+    sigmoid = LogisticSigmoidLayer()
+    Yhat = sigmoid.forward(logits[:2])
+    expected_grad = sigmoid.backward(LogLoss().gradient(Y[:2], Yhat))
+    np.testing.assert_allclose(L.gradient(Y[:2], logits[:2]), expected_grad, rtol=1e-5)
+
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
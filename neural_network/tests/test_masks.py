@@ -0,0 +1,68 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.base import no_activation_cache
+from neural_network.layers.activations import ReluLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.fused import FusedDenseLayer
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.utils.masks import PackedMask
+
+def cached_bytes(layer):
+    return sum(a.nbytes for a in layer.cachedArrays())
+
+def test_packed_mask_round_trip():
+    mask = np.random.default_rng(0).random((7, 13)) < 0.3
+    packed = PackedMask.pack(mask)
+    assert packed.nbytes == -(-mask.size // 8)
+    np.testing.assert_array_equal(packed.unpack(), mask)
+
+def test_relu_caches_one_bit_per_element():
+    X = np.random.default_rng(0).standard_normal((64, 100))
+    G = np.random.default_rng(1).standard_normal((64, 100))
+    relu = ReluLayer()
+    relu.forward(X)
+    assert cached_bytes(relu) == 64 * 100 // 8
+    np.testing.assert_array_equal(relu.backward(G), G * (X > 0))
+
+    relu.clearCache()
+    assert relu.getMask() is None
+    with no_activation_cache():
+        relu.forward(X)
+    assert cached_bytes(relu) == 0
+
+def test_dropout_caches_one_bit_per_element():
+    X = np.random.default_rng(0).standard_normal((64, 100))
+    G = np.random.default_rng(1).standard_normal((64, 100))
+    layer = DropoutLayer(0.8, seed=0)
+    out = layer.forward(X)
+    assert cached_bytes(layer) == 64 * 100 // 8
+    mask = layer.dropOutKey
+    assert abs(mask.mean() - 0.8) < 0.02
+    np.testing.assert_allclose(out, X * mask / 0.8)
+    np.testing.assert_allclose(layer.backward(G), G * mask / 0.8)
+
+    layer.forward(X, test=True)
+    assert layer.dropOutKey is None and cached_bytes(layer) == 0
+    assert layer.backward(G) is G
+    np.testing.assert_array_equal(layer.gradient(), np.ones(X.shape))
+
+def test_fused_relu_caches_mask():
+    X = np.random.default_rng(0).standard_normal((32, 16))
+    G = np.random.default_rng(1).standard_normal((32, 8))
+    np.random.seed(0)
+    dense, relu = FullyConnectedLayer(16, 8), ReluLayer()
+    relu.forward(dense.forward(X))
+    expected = dense.backward(relu.backward(G))
+    fused = FusedDenseLayer(dense, "relu")
+    fused.forward(X)
+    assert len(fused.getPrevOut()) == 0 and fused.getMask().shape == (32, 8)
+    np.testing.assert_allclose(fused.backward(G), expected)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,82 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential, Callback
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.activations import TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.regularization import DropoutLayer
+
+def make_data(n=256, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n, 4))
+    Y = (X @ np.array([[1.0], [-2.0], [0.5], [0.0]])) * 0.3
+    return X, Y
+
+def make_model(X, dropout=None):
+    np.random.seed(0)
+    layers = [InputLayer(X), FullyConnectedLayer(4, 16), TanhLayer()]
+    if dropout is not None:
+        layers.append(DropoutLayer(dropout))
+    layers.append(FullyConnectedLayer(16, 1))
+    return Sequential(layers)
+
+def test_fit_reduces_loss_and_reports_throughput():
+    X, Y = make_data()
+    model = make_model(X)
+    before = model.evaluate(X, Y, SquaredError())
+
+    history = model.fit(X, Y, SquaredError(), epochs=5, batch_size=32, learning_rate=0.01, seed=0)
+
+    assert len(history) == 5
+    assert all(logs["samples_per_sec"] > 0 for logs in history)
+    assert model.step == 5 * 8
+    assert model.evaluate(X, Y, SquaredError()) < before / 2
+
+def test_predict_disables_dropout():
+    X, Y = make_data(64)
+    model = make_model(X, dropout=0.5)
+
+    first = model.predict(X)
+    np.testing.assert_allclose(model.predict(X), first)
+    np.testing.assert_allclose(model.predict(X, batch_size=10), first)
+    assert model.isTraining()
+
+    model.eval()
+    np.testing.assert_allclose(model.forward(X), first)
+
+def test_callbacks_and_early_stop():
+    X, Y = make_data(64)
+    model = make_model(X)
+
+    class Recorder(Callback):
+        def __init__(self):
+            self.events = []
+
+        def onEpochBegin(self, model, epoch):
+            self.events.append(("begin", epoch))
+
+        def onStepEnd(self, model, step, logs):
+            self.events.append(("step", step))
+            if step == 3:
+                model.stopTraining = True
+
+        def onEpochEnd(self, model, epoch, logs):
+            self.events.append(("end", epoch))
+
+    recorder = Recorder()
+    history = model.fit(X, Y, SquaredError(), epochs=10, batch_size=16, callbacks=[recorder],
+                        validation_data=(X, Y))
+
+    assert recorder.events == [("begin", 0), ("step", 1), ("step", 2), ("step", 3), ("end", 0)]
+    assert len(history) == 1
+    assert "val_loss" in history[0]
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,119 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.base import no_activation_cache
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.activations import ReluLayer
+from neural_network.layers.basic import FlattenLayer
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer, ConvLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.normalization import BatchNormLayer, LayerNormLayer, fold_batch_norm
+from neural_network.utils.checkpoint import save_checkpoint, load_checkpoint
+from neural_network.utils.gradcheck import gradcheck
+from neural_network.utils.optimizers import SGD
+
+rng = np.random.default_rng(0)
+
+def randomized(layer):
+    """Give a normalization layer non-trivial gamma and beta."""
+    layer.gamma[...] = rng.uniform(0.5, 2.0, layer.gamma.shape)
+    layer.beta[...] = rng.standard_normal(layer.beta.shape)
+    return layer
+
+@pytest.mark.parametrize("shape", [(8, 5), (4, 5, 3, 6)])
+def test_batch_norm_normalizes_each_feature_and_tracks_running_statistics(shape):
+    layer = BatchNormLayer(5, momentum=0.2)
+    X = rng.standard_normal(shape) * 4 + 3
+    axes = (0,) + tuple(range(2, len(shape)))
+    out = layer.forward(X)
+    np.testing.assert_allclose(out.mean(axis=axes), 0, atol=1e-10)
+    np.testing.assert_allclose(out.var(axis=axes), 1, rtol=1e-4)
+    np.testing.assert_allclose(layer.runningMean, 0.2 * X.mean(axis=axes), rtol=1e-12)
+    count = X.size // 5
+    np.testing.assert_allclose(layer.runningVar, 0.8 + 0.2 * X.var(axis=axes) * count / (count - 1), rtol=1e-12)
+
+    # Probes without an activation cache and inference passes leave the estimates alone
+    running = layer.runningMean.copy()
+    with no_activation_cache():
+        layer.forward(X)
+    layer.setTraining(False)
+    expected = (X - layer.perFeature(running, X.ndim)) / np.sqrt(layer.perFeature(layer.runningVar, X.ndim) + 1e-5)
+    np.testing.assert_allclose(layer.forward(X), expected, rtol=1e-12)
+    np.testing.assert_array_equal(layer.runningMean, running)
+
+@pytest.mark.parametrize("factory, shape", [
+    (lambda: BatchNormLayer(5), (6, 5)),
+    (lambda: BatchNormLayer(3), (3, 3, 4, 5)),
+    (lambda: LayerNormLayer(5), (6, 5)),
+    (lambda: LayerNormLayer((4, 5)), (3, 3, 4, 5)),
+])
+@pytest.mark.parametrize("training", [True, False])
+def test_normalization_gradients(factory, shape, training):
+    layer = randomized(factory())
+    layer.setTraining(training)
+    if not training and isinstance(layer, BatchNormLayer):
+        layer.runningMean[...] = rng.standard_normal(layer.runningMean.shape)
+        layer.runningVar[...] = rng.uniform(0.5, 2.0, layer.runningVar.shape)
+    result = gradcheck(layer, rng.standard_normal(shape), batched=not isinstance(layer, BatchNormLayer))
+    assert result["passed"], result
+
+def test_layer_norm_normalizes_each_sample():
+    X = rng.standard_normal((4, 2, 6)) * np.arange(1, 5)[:, None, None]
+    out = LayerNormLayer((2, 6)).forward(X)
+    np.testing.assert_allclose(out.mean(axis=(1, 2)), 0, atol=1e-12)
+    np.testing.assert_allclose(out.var(axis=(1, 2)), 1, rtol=1e-4)
+    # A sample's output does not depend on the rest of the batch
+    np.testing.assert_allclose(LayerNormLayer((2, 6)).forward(X[:1]), out[:1], rtol=1e-12)
+
+@pytest.mark.parametrize("layer, X, features", [
+    (FullyConnectedLayer(5, 6), rng.standard_normal((4, 5)), 6),
+    (Conv2DLayer(3, (3, 3), padding=1), rng.standard_normal((2, 7, 7)), 3),
+    (Conv2DLayer(3, (3, 3), bias=True, algorithm="fft"), rng.standard_normal((2, 7, 7)), 3),
+    (ConvLayer(2, 4, 3, padding=1, groups=2), rng.standard_normal((2, 2, 6, 6)), 4),
+    (ConvLayer(2, 4, 1, bias=False), rng.standard_normal((2, 2, 6, 6)), 4),
+])
+def test_fold_batch_norm_matches_evaluation(layer, X, features):
+    if "biases" in layer.parameterNames:
+        layer.biases[...] = rng.standard_normal(layer.biases.shape)
+    norm = randomized(BatchNormLayer(features))
+    for scale in (1.0, 2.0, 3.0):
+        norm.forward(layer.forward(X * scale))
+    norm.setTraining(False)
+
+    folded = fold_batch_norm(layer, norm)
+    np.testing.assert_allclose(folded.forward(X), norm.forward(layer.forward(X)), rtol=1e-10, atol=1e-12)
+    assert "biases" in folded.parameterNames
+
+def test_fold_rejects_unfoldable_layers():
+    with pytest.raises(ValueError):
+        fold_batch_norm(Conv3DLayer(2, (3, 3)), BatchNormLayer(2))
+    with pytest.raises(ValueError):
+        fold_batch_norm(FullyConnectedLayer(3, 4), BatchNormLayer(5))
+
+def test_trained_model_folds_and_checkpoints(tmp_path):
+    np.random.seed(0)
+    X = rng.standard_normal((32, 6, 6))
+    Y = rng.standard_normal((32, 3))
+    model = Sequential([Conv2DLayer(2, (3, 3), padding=1), BatchNormLayer(2), ReluLayer(), FlattenLayer(),
+                        FullyConnectedLayer(72, 3), BatchNormLayer(3), LayerNormLayer(3)])
+    model.fit(X, Y, SquaredError(), epochs=2, batch_size=8, optimizer=SGD(0.05))
+    model.eval()
+    expected = model.predict(X)
+
+    model.fold()
+    assert [type(layer).__name__ for layer in model.layers] == \
+        ["Conv2DLayer", "ReluLayer", "FlattenLayer", "FullyConnectedLayer", "LayerNormLayer"]
+    np.testing.assert_allclose(model.predict(X), expected, rtol=1e-9, atol=1e-12)
+
+    path = str(tmp_path / "folded.ckpt")
+    save_checkpoint(path, model)
+    np.testing.assert_allclose(load_checkpoint(path)[0].predict(X), expected, rtol=1e-9, atol=1e-12)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
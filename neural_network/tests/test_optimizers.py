@@ -0,0 +1,104 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.utils.optimizers import SGD, Momentum, RMSprop, Adam, AdamW
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+
+def reference_steps(name, w, grads, lr):
+    """Textbook update rules applied out of place."""
+    w = w.copy()
+    m = np.zeros_like(w)
+    v = np.zeros_like(w)
+    for t, g in enumerate(grads, start=1):
+        if name == "sgd":
+            w = w - lr * g
+        elif name == "momentum":
+            m = 0.9 * m + g
+            w = w - lr * m
+        elif name == "rmsprop":
+            v = 0.9 * v + 0.1 * g * g
+            w = w - lr * g / (np.sqrt(v) + 1e-8)
+        else:
+            if name == "adamw":
+                w = w * (1 - lr * 0.01)
+            m = 0.9 * m + 0.1 * g
+            v = 0.999 * v + 0.001 * g * g
+            w = w - lr * (m / (1 - 0.9 ** t)) / (np.sqrt(v / (1 - 0.999 ** t)) + 1e-8)
+    return w
+
+class Holder:
+    parameterNames = ("w",)
+
+    def __init__(self, w):
+        self.w = w
+        self.wGrad = np.zeros_like(w)
+
+    def getParameters(self):
+        return {"w": self.w}
+
+    def getGradients(self):
+        return {"w": self.wGrad}
+
+@pytest.mark.parametrize("name, optimizer", [
+    ("sgd", SGD(0.1)),
+    ("momentum", Momentum(0.1)),
+    ("rmsprop", RMSprop(0.01)),
+    ("adam", Adam(0.01)),
+    ("adamw", AdamW(0.01)),
+])
+def test_in_place_updates_match_reference(name, optimizer):
+    rng = np.random.default_rng(0)
+    w0 = rng.standard_normal((3, 4))
+    grads = [rng.standard_normal((3, 4)) for _ in range(5)]
+
+    holder = Holder(w0.copy())
+    param = holder.w
+    for g in grads:
+        holder.wGrad[...] = g
+        optimizer.step([holder])
+
+    assert holder.w is param
+    np.testing.assert_allclose(holder.w, reference_steps(name, w0, grads, optimizer.learning_rate), rtol=1e-12)
+
+def test_functional_update_does_not_modify_inputs():
+    w = np.ones(3)
+    g = np.full(3, 0.5)
+    np.testing.assert_allclose(SGD(0.1).update(w, g), [0.95, 0.95, 0.95])
+    np.testing.assert_allclose(w, 1.0)
+
+def test_update_weights_matches_legacy_adam():
+    rng = np.random.default_rng(1)
+    layer = FullyConnectedLayer(4, 3)
+    X = rng.standard_normal((8, 4))
+    G = rng.standard_normal((8, 3))
+    W, b = layer.getWeights().copy(), layer.getBiases().copy()
+
+    layer.forward(X)
+    layer.updateWeights(G, epoch=2, learning_rate=0.01)
+
+    def legacy(w, dJdw):
+        s = 0.1 * dJdw
+        r = 0.001 * dJdw * dJdw
+        return w - 0.01 * (s / (1 - 0.9**3)) / (np.sqrt(r / (1 - 0.999**3)) + 10e-8)
+
+    np.testing.assert_allclose(layer.getWeights(), legacy(W, X.T @ G / 8))
+    np.testing.assert_allclose(layer.getBiases(), legacy(b, G.sum(axis=0) / 8))
+
+def test_layers_expose_parameters_and_gradients():
+    rng = np.random.default_rng(2)
+    conv = Conv2DLayer(2, (3, 3))
+    X = rng.standard_normal((4, 6, 6))
+    G = rng.standard_normal(conv.forward(X).shape)
+
+    conv.computeGradients(G)
+    assert conv.getParameters()["kernel"] is conv.kernel
+    np.testing.assert_allclose(conv.getGradients()["kernel"], conv.kernelGradient(G))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,90 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.core.parallel import DataParallel
+from neural_network.layers.activations import TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.normalization import BatchNormLayer
+from neural_network.utils.optimizers import SGD, Adam
+
+def make_model(seed=0):
+    np.random.seed(seed)
+    return Sequential([FullyConnectedLayer(4, 8), TanhLayer(), FullyConnectedLayer(8, 2)])
+
+def test_parallel_steps_match_single_process():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((10, 4))
+    Y = rng.standard_normal((10, 2))
+    objective = SquaredError()
+
+    reference = make_model()
+    optimizer = SGD(0.1)
+    expected = [reference.trainStep(X[:n], Y[:n], objective, optimizer) for n in (10, 7, 2)]
+
+    model = make_model()
+    optimizer = SGD(0.1)
+    # Uneven shards (10 -> 4/3/3) and a batch smaller than the worker count
+    with DataParallel(model, workers=3) as parallel:
+        losses = [parallel.trainStep(X[:n], Y[:n], objective, optimizer) for n in (10, 7, 2)]
+        assert model.step == 3
+
+    np.testing.assert_allclose(losses, expected, rtol=1e-12)
+    for layer, ref in zip(model.layers, reference.layers):
+        for name, value in layer.getParameters().items():
+            np.testing.assert_allclose(value, ref.getParameters()[name], rtol=1e-12, atol=1e-15)
+
+    # After close() the parameters live in private memory again
+    assert model.parameterBuffer.data.flags.owndata
+    assert parallel.params is None
+
+def test_parallel_fit_matches_sequential_fit():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((64, 4))
+    Y = rng.standard_normal((64, 2))
+
+    reference = make_model()
+    expected = reference.fit(X, Y, SquaredError(), epochs=2, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    model = make_model()
+    history = DataParallel(model, workers=2).fit(X, Y, SquaredError(), epochs=2, batch_size=16,
+                                                 optimizer=Adam(0.01), shuffle=False)
+
+    np.testing.assert_allclose([h["loss"] for h in history], [h["loss"] for h in expected], rtol=1e-10)
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=1e-10)
+
+def test_parallel_fused_model_matches_unfused_fit():
+    rng = np.random.default_rng(2)
+    X = rng.standard_normal((32, 4))
+    Y = rng.standard_normal((32, 2))
+
+    reference = make_model()
+    reference.fit(X, Y, SquaredError(), epochs=2, batch_size=8, optimizer=SGD(0.1), shuffle=False)
+
+    model = make_model().fuse()
+    DataParallel(model, workers=2).fit(X, Y, SquaredError(), epochs=2, batch_size=8,
+                                       optimizer=SGD(0.1), shuffle=False)
+
+    np.testing.assert_allclose(model.predict(X), reference.predict(X), rtol=1e-10)
+
+def test_parallel_batch_norm_running_statistics_cover_whole_batch():
+    rng = np.random.default_rng(2)
+    X = rng.standard_normal((9, 4)) * 3 + 1
+    Y = rng.standard_normal((9, 2))
+    np.random.seed(0)
+    model = Sequential([BatchNormLayer(4), FullyConnectedLayer(4, 2)])
+    with DataParallel(model, workers=2) as parallel:
+        parallel.trainStep(X, Y, SquaredError(), SGD(0.1))
+
+    norm = model.layers[0]
+    np.testing.assert_allclose(norm.runningMean, 0.1 * X.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(norm.runningVar, 0.9 + 0.1 * X.var(axis=0, ddof=1), rtol=1e-12)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,93 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.activations import TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.utils.optimizers import Adam
+from neural_network.utils.parameters import ParameterBuffer
+
+def make_model(X, seed=0):
+    np.random.seed(seed)
+    return Sequential([InputLayer(X), FullyConnectedLayer(4, 8), TanhLayer(),
+                       FullyConnectedLayer(8, 8), TanhLayer(), FullyConnectedLayer(8, 1)])
+
+def test_layers_become_views_into_one_buffer():
+    X = np.random.default_rng(0).standard_normal((16, 4))
+    model = make_model(X)
+    before = model.predict(X)
+    weights = [layer.getWeights().copy() for layer in model.layers if layer.parameterNames]
+
+    buffer = model.flattenParameters()
+
+    assert len(buffer) == 4*8 + 8 + 8*8 + 8 + 8 + 1
+    for layer, W in zip(buffer.layers, weights):
+        assert np.shares_memory(layer.weights, buffer.data)
+        assert np.shares_memory(layer.weightsGrad, buffer.grad)
+        np.testing.assert_array_equal(layer.weights, W)
+    np.testing.assert_array_equal(model.predict(X), before)
+
+def test_flat_training_matches_per_array_training():
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((64, 4))
+    Y = np.sin(X[:, :1])
+
+    reference = make_model(X)
+    reference.fit(X, Y, SquaredError(), epochs=3, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    flat = make_model(X)
+    flat.flattenParameters()
+    flat.fit(X, Y, SquaredError(), epochs=3, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    np.testing.assert_allclose(flat.predict(X), reference.predict(X), rtol=1e-12)
+
+def test_fused_flat_training_matches_unfused_training():
+    rng = np.random.default_rng(4)
+    X = rng.standard_normal((64, 4))
+    Y = np.sin(X[:, :1])
+
+    reference = make_model(X)
+    reference.fit(X, Y, SquaredError(), epochs=3, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    fused = make_model(X).fuse()
+    buffer = fused.flattenParameters()
+    for layer in buffer.layers:
+        inner = getattr(layer, "inner", layer)
+        assert np.shares_memory(inner.weights, buffer.data)
+        assert np.shares_memory(inner.weightsGrad, buffer.grad)
+    fused.fit(X, Y, SquaredError(), epochs=3, batch_size=16, optimizer=Adam(0.01), shuffle=False)
+
+    np.testing.assert_allclose(fused.predict(X), reference.predict(X), rtol=1e-12)
+
+def test_set_weights_writes_into_buffer():
+    layer = FullyConnectedLayer(3, 2)
+    buffer = ParameterBuffer([layer])
+    layer.setWeights(np.arange(6).reshape(3, 2))
+    layer.setBiases(np.array([-1, 2]))
+
+    np.testing.assert_array_equal(buffer.data, [0, 1, 2, 3, 4, 5, -1, 2])
+    with pytest.raises(ValueError):
+        layer.setWeights(np.zeros((2, 2)))
+
+def test_clipping_and_state_round_trip():
+    layers = [FullyConnectedLayer(3, 2), FullyConnectedLayer(2, 2)]
+    buffer = ParameterBuffer(layers)
+    buffer.grad[:] = 1.0
+
+    assert buffer.clipGradNorm(1.0) == pytest.approx(np.sqrt(len(buffer)))
+    assert buffer.globalNorm() == pytest.approx(1.0)
+
+    state = buffer.saveState()
+    layers[1].weights += 1
+    buffer.loadState(state)
+    np.testing.assert_array_equal(buffer.data, state)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
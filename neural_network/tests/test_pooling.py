@@ -0,0 +1,79 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.layers.pooling import (PoolingLayer, AveragePoolingLayer,
+                                           GlobalMaxPoolingLayer, GlobalAveragePoolingLayer)
+
+@pytest.mark.parametrize("size, stride", [(2, 2), (3, 1), (2, 1), (3, 2)])
+def test_max_pooling_matches_reference(size, stride):
+    rng = np.random.default_rng(0)
+    layer = PoolingLayer(size, stride)
+    X = rng.standard_normal((3, 4, 8, 8))
+
+    out = layer.forward(X)
+    np.testing.assert_allclose(out, layer.pool(X))
+
+    G = rng.standard_normal(out.shape)
+    grad = layer.backward(G)
+    if stride >= size:
+        np.testing.assert_allclose(grad, layer.referenceBackward(G, X))
+    # Overlapping windows accumulate every route into the same input
+    assert grad.shape == X.shape
+    np.testing.assert_allclose(grad.sum(), G.sum())
+
+def test_max_pooling_caches_argmax():
+    X = np.array([[[[1., 5., 2., 0.],
+                    [3., 4., 8., 1.],
+                    [0., 0., 1., 1.],
+                    [9., 0., 1., 2.]]]])
+    layer = PoolingLayer(2, 2)
+
+    np.testing.assert_allclose(layer.forward(X), [[[[5., 8.], [9., 2.]]]])
+    np.testing.assert_array_equal(layer.argmax, [[[[1, 2], [2, 3]]]])
+
+    grad = layer.backward(np.array([[[[1., 2.], [3., 4.]]]]))
+    expected = np.array([[[[0., 1., 0., 0.],
+                           [0., 0., 2., 0.],
+                           [0., 0., 0., 0.],
+                           [3., 0., 0., 4.]]]])
+    np.testing.assert_allclose(grad, expected)
+
+@pytest.mark.parametrize("size, stride", [(2, 2), (3, 1)])
+def test_average_pooling(size, stride):
+    rng = np.random.default_rng(1)
+    layer = AveragePoolingLayer(size, stride)
+    X = rng.standard_normal((2, 3, 7, 7))
+
+    out = layer.forward(X)
+    oh = (7 - size) // stride + 1
+    expected = np.array([[[[X[n, c, y*stride:y*stride+size, x*stride:x*stride+size].mean()
+                            for x in range(oh)] for y in range(oh)]
+                          for c in range(3)] for n in range(2)])
+    np.testing.assert_allclose(out, expected)
+
+    # The layer is linear, so <backward(G), X> == <G, forward(X)>
+    G = rng.standard_normal(out.shape)
+    np.testing.assert_allclose(np.sum(layer.backward(G) * X), np.sum(G * out))
+
+def test_global_pooling():
+    rng = np.random.default_rng(2)
+    X = rng.standard_normal((2, 3, 4, 5))
+    G = rng.standard_normal((2, 3))
+
+    gmax = GlobalMaxPoolingLayer()
+    np.testing.assert_allclose(gmax.forward(X), X.max(axis=(2, 3)))
+    grad = gmax.backward(G)
+    np.testing.assert_allclose(grad.sum(axis=(2, 3)), G)
+    np.testing.assert_allclose(grad[X == X.max(axis=(2, 3), keepdims=True)], G.ravel())
+
+    gavg = GlobalAveragePoolingLayer()
+    np.testing.assert_allclose(gavg.forward(X), X.mean(axis=(2, 3)))
+    np.testing.assert_allclose(gavg.backward(G), np.broadcast_to(G[:, :, None, None] / 20, X.shape))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
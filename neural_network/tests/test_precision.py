@@ -0,0 +1,91 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SquaredError, CrossEntropy, LogLoss, NegativeLikelihood
+from neural_network.core.precision import default_dtype, get_default_dtype
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer, SoftmaxLayer, TanhLayer, LogisticSigmoidLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+from neural_network.layers.pooling import PoolingLayer
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.utils.optimizers import Adam
+
+def make_model(X, dtype):
+    np.random.seed(0)
+    with default_dtype(dtype):
+        return Sequential([InputLayer(X), FullyConnectedLayer(X.shape[1], 32), ReluLayer(),
+                           FullyConnectedLayer(32, 16), TanhLayer(), FullyConnectedLayer(16, 1)])
+
+def test_default_dtype_context_restores_policy():
+    assert get_default_dtype() == np.float64
+    with default_dtype(np.float32):
+        assert FullyConnectedLayer(3, 2).getWeights().dtype == np.float32
+    assert get_default_dtype() == np.float64
+    assert FullyConnectedLayer(3, 2, dtype="float32").getBiases().dtype == np.float32
+
+def test_float32_stays_float32_through_every_layer():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((4, 8, 8))
+    with default_dtype(np.float32):
+        layers = [InputLayer(X), Conv2DLayer(2, (3, 3)), ReluLayer(), PoolingLayer(2, 2),
+                  FlattenLayer(), FullyConnectedLayer(18, 5), LogisticSigmoidLayer(),
+                  DropoutLayer(0.8), SoftmaxLayer()]
+
+    H = X
+    for layer in layers:
+        H = layer.forward(H)
+        assert H.dtype == np.float32, type(layer).__name__
+
+    Y = np.eye(5)[rng.integers(0, 5, 4)]
+    grad = CrossEntropy().gradient(Y, H)
+    assert CrossEntropy().eval(Y, H).dtype == np.float32
+    for layer in reversed(layers[1:]):
+        grad = layer.backward(grad)
+        assert grad.dtype == np.float32, type(layer).__name__
+
+@pytest.mark.parametrize("objective", [SquaredError(), LogLoss(), NegativeLikelihood()])
+def test_objectives_keep_prediction_dtype(objective):
+    Y = np.array([[0], [1]])
+    Yhat = np.array([[0.2], [0.3]], dtype=np.float32)
+    assert objective.eval(Y, Yhat).dtype == np.float32
+    assert objective.gradient(Y, Yhat).dtype == np.float32
+
+@pytest.mark.parametrize("master_weights", [False, True])
+def test_float32_training_tracks_float64(master_weights):
+    rng = np.random.default_rng(1)
+    X = rng.standard_normal((128, 6))
+    Y = np.sin(X[:, :1]) + 0.5 * X[:, 1:2]
+
+    reference = make_model(X, np.float64)
+    reference.fit(X, Y, SquaredError(), epochs=5, batch_size=32, optimizer=Adam(0.005), shuffle=False)
+
+    model = make_model(X, np.float32)
+    model.fit(X, Y, SquaredError(), epochs=5, batch_size=32,
+              optimizer=Adam(0.005, master_weights=master_weights), shuffle=False)
+
+    prediction = model.predict(X)
+    assert prediction.dtype == np.float32
+    assert all(layer.getWeights().dtype == np.float32 for layer in model.layers if layer.parameterNames)
+    np.testing.assert_allclose(prediction, reference.predict(X), rtol=1e-3, atol=1e-3)
+
+def test_master_weights_are_float64():
+    layer = FullyConnectedLayer(3, 2, dtype=np.float32)
+    layer.forward(np.ones((4, 3), dtype=np.float32))
+    layer.computeGradients(np.ones((4, 2), dtype=np.float32))
+    optimizer = Adam(0.1, master_weights=True)
+    optimizer.step([layer])
+
+    state = optimizer.state[(id(layer), "weights")]
+    assert state["master"].dtype == np.float64
+    assert state["m"].dtype == np.float64
+    np.testing.assert_array_equal(layer.getWeights(), state["master"].astype(np.float32))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
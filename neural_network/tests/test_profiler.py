@@ -0,0 +1,70 @@
+import numpy as np
+import sys
+import os
+import json
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SoftmaxCrossEntropyWithLogits
+from neural_network.layers.basic import InputLayer, FlattenLayer
+from neural_network.layers.activations import ReluLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+from neural_network.layers.pooling import PoolingLayer
+from neural_network.utils.optimizers import Adam
+
+def make_model(X):
+    np.random.seed(0)
+    return Sequential([InputLayer(X), Conv2DLayer(4, (3, 3)), ReluLayer(), PoolingLayer(2, 2),
+                       FlattenLayer(), FullyConnectedLayer(36, 3)])
+
+def test_profile_training_step(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((8, 8, 8))
+    Y = np.eye(3)[rng.integers(0, 3, 8)]
+    model = make_model(X)
+    optimizer = Adam(0.01)
+    reference = make_model(X)
+    reference_optimizer = Adam(0.01)
+
+    with model.profile(optimizer) as prof:
+        for _ in range(2):
+            model.trainStep(X, Y, SoftmaxCrossEntropyWithLogits(), optimizer)
+    for _ in range(2):
+        reference.trainStep(X, Y, SoftmaxCrossEntropyWithLogits(), reference_optimizer)
+
+    # Per-layer optimizer steps give the same result as one step over all layers
+    np.testing.assert_allclose(model.layers[-1].weights, reference.layers[-1].weights, rtol=1e-12)
+
+    rows = {row["layer"]: row for row in prof.summary()}
+    assert list(rows) == ["0:InputLayer", "1:Conv2DLayer", "2:ReluLayer", "3:PoolingLayer",
+                          "4:FlattenLayer", "5:FullyConnectedLayer"]
+    assert all(row["calls"] == 2 for row in rows.values())
+    matmul = 2 * 8 * 36 * 3
+    assert rows["5:FullyConnectedLayer"]["flops"] == 2 * (3 * matmul + 2 * 8 * 3)
+    assert rows["1:Conv2DLayer"]["output_bytes"] == 8 * 4 * 6 * 6 * 8
+    assert rows["1:Conv2DLayer"]["update_s"] > 0 and rows["2:ReluLayer"]["update_s"] == 0
+    # Max pooling keeps only its argmax, not the input it pooled
+    assert 0 < rows["3:PoolingLayer"]["cached_bytes"] < rows["3:PoolingLayer"]["output_bytes"]
+    assert "Conv2DLayer" in prof.table()
+
+    path = tmp_path / "trace.json"
+    prof.exportChromeTrace(path)
+    events = json.loads(path.read_text())["traceEvents"]
+    assert {event["cat"] for event in events} == {"forward", "backward", "gradients", "update"}
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+def test_hooks_removed_after_profiling():
+    X = np.random.default_rng(0).standard_normal((4, 8, 8))
+    model = make_model(X)
+    optimizer = Adam()
+    with model.profile(optimizer):
+        assert "forward" in vars(model.layers[1])
+    assert all("forward" not in vars(layer) and "backward" not in vars(layer) for layer in model.layers)
+    assert "step" not in vars(optimizer)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+import numpy as np
+import sys
+import os
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.core.objective import SoftmaxCrossEntropyWithLogits
+from neural_network.layers.activations import ReluLayer
+from neural_network.layers.basic import FlattenLayer
+from neural_network.layers.convolution import Conv2DLayer, Conv3DLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.normalization import BatchNormLayer
+from neural_network.layers.quantized import (QuantizedDenseLayer, QuantizedConv2DLayer, QuantizedConv3DLayer,
+                                             calibrate, quantize)
+from neural_network.utils.checkpoint import save_checkpoint, load_checkpoint
+from neural_network.utils.quantization import (EXACT_BLOCK, RangeObserver, int8_matmul, quantization_report,
+                                               quantize_weights)
+
+rng = np.random.default_rng(0)
+
+def test_per_channel_weights_round_within_half_a_step():
+    W = rng.standard_normal((6, 4)) * [1.0, 100.0, 1e-3, 0.0]
+    q, scales = quantize_weights(W, axis=1)
+    assert q.dtype == np.int8 and scales.shape == (4,)
+    assert np.abs(q).max() <= 127 and scales[3] == 1 and not q[:, 3].any()
+    assert np.all(np.abs(q * scales - W) <= scales / 2 + 1e-12)
+
+def test_int8_matmul_is_exact_int32_accumulation():
+    K = 2 * EXACT_BLOCK + 17
+    a = rng.integers(-127, 128, (5, K)).astype(np.float32)
+    b = rng.integers(-127, 128, (K, 3)).astype(np.int8)
+    out = int8_matmul(a, b)
+    assert out.dtype == np.int32
+    np.testing.assert_array_equal(out, a.astype(np.int64) @ b.astype(np.int64))
+    # Worst case: every product at the int8 limit
+    full = np.full((2, K), 127, dtype=np.float32)
+    np.testing.assert_array_equal(int8_matmul(full, np.full((K, 1), -127, dtype=np.int8)), -(127 ** 2) * K)
+
+@pytest.mark.parametrize("layer, X", [
+    (FullyConnectedLayer(12, 5), rng.standard_normal((7, 12))),
+    (Conv2DLayer(3, (3, 3), stride=2, padding=1, bias=True), rng.standard_normal((4, 9, 8))),
+    (Conv3DLayer(2, (2, 3), padding=1), rng.standard_normal((3, 2, 7, 7))),
+])
+def test_quantized_layers_track_float_layers(layer, X):
+    if "biases" in layer.parameterNames:
+        layer.biases[...] = rng.standard_normal(layer.biases.shape)
+    cls = {FullyConnectedLayer: QuantizedDenseLayer, Conv2DLayer: QuantizedConv2DLayer,
+           Conv3DLayer: QuantizedConv3DLayer}[type(layer)]
+    quantized = cls.fromLayer(layer, RangeObserver().update(X).scale())
+    expected = layer.forward(X)
+    out = quantized.forward(X)
+    assert out.shape == expected.shape and out.dtype == expected.dtype
+    assert np.abs(out - expected).max() <= 0.03 * np.abs(expected).max()
+    weights = quantized.getTensors()["qweights" if cls is QuantizedDenseLayer else "qkernel"]
+    assert weights.dtype == np.int8
+    with pytest.raises(RuntimeError):
+        quantized.backward(out)
+
+def test_percentile_calibration_clips_outliers():
+    X = rng.standard_normal((500, 4))
+    X[0, 0] = 1e3
+    layers = [FullyConnectedLayer(4, 2)]
+    assert calibrate(layers, X, batch_size=100)[0].peak == 1e3
+    assert calibrate(layers, X, batch_size=100, percentile=99.0)[0].peak < 10
+
+def classifier(X):
+    np.random.seed(0)
+    return Sequential([Conv2DLayer(4, (3, 3), padding=1), BatchNormLayer(4), ReluLayer(), FlattenLayer(),
+                       FullyConnectedLayer(X.shape[1] * X.shape[2] * 4, 32), ReluLayer(),
+                       FullyConnectedLayer(32, 3)])
+
+def test_quantized_model_report_and_checkpoint(tmp_path):
+    X = rng.standard_normal((240, 6, 6))
+    labels = (X[:, :3].mean(axis=(1, 2)) > 0).astype(int) + (X[:, :, :3].mean(axis=(1, 2)) > 0)
+    Y = np.eye(3)[labels]
+    model = classifier(X)
+    model.fit(X[:160], Y[:160], SoftmaxCrossEntropyWithLogits(), epochs=3, batch_size=16)
+    model.eval()
+    before = model.predict(X[160:])
+
+    quantized = quantize(model, X[:80])
+    assert [type(layer).__name__ for layer in quantized.layers] == \
+        ["QuantizedConv2DLayer", "ReluLayer", "FlattenLayer", "QuantizedDenseLayer", "ReluLayer",
+         "QuantizedDenseLayer"]
+    # The float model is untouched
+    assert type(model.layers[1]) is BatchNormLayer
+    np.testing.assert_array_equal(model.predict(X[160:]), before)
+
+    report = quantization_report(model, quantized, X[160:], Y[160:], SoftmaxCrossEntropyWithLogits())
+    assert report["compression"] > 7
+    assert report["relative_error"] < 0.05
+    assert abs(report["accuracy_delta"]) <= 0.05 and abs(report["loss_delta"]) < 0.05
+
+    path = str(tmp_path / "int8.ckpt")
+    save_checkpoint(path, quantized)
+    loaded, _ = load_checkpoint(path)
+    assert loaded.layers[3].qweights.dtype == np.int8
+    np.testing.assert_array_equal(loaded.predict(X[160:]), quantized.predict(X[160:]))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
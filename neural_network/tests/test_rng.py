@@ -0,0 +1,100 @@
+import numpy as np
+import sys
+import os
+import threading
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.activations import TanhLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.layers.convolution import Conv2DLayer
+from neural_network.layers.regularization import DropoutLayer
+from neural_network.utils.rng import RandomStream, bernoulli, packed_bernoulli
+
+def test_stream_depends_only_on_seed_stream_and_step():
+    a, b = RandomStream(7, stream=1), RandomStream(7, stream=1)
+    first = a.next().random(5)
+    a.next().random(100)
+    np.testing.assert_array_equal(a.generator(0).random(5), first)
+    np.testing.assert_array_equal(b.generator(2).random(5), a.next().random(5))
+    assert not np.array_equal(RandomStream(7, stream=2).generator(0).random(5), first)
+    assert not np.array_equal(a.fork(1).generator(0).random(5), first)
+    assert a.fork(1).step == a.step
+
+def test_bernoulli_writes_into_buffers():
+    generator = RandomStream(0).generator()
+    out, scratch = np.empty((200, 50), dtype=bool), np.empty((200, 50), dtype=np.float32)
+    mask = bernoulli(generator, 0.3, out=out, scratch=scratch)
+    assert mask is out
+    assert abs(mask.mean() - 0.3) < 0.02
+
+@pytest.mark.parametrize("p", [0.5, 0.8])
+def test_packed_bernoulli(p):
+    packed = packed_bernoulli(RandomStream(0).generator(), p, (100, 37))
+    assert packed.dtype == np.uint8 and packed.size == -(-3700 // 8)
+    mask = np.unpackbits(packed, count=3700)
+    assert abs(mask.mean() - p) < 0.03
+
+def test_streams_are_thread_safe():
+    stream = RandomStream(3)
+    expected = [stream.generator(step).random(1000) for step in range(8)]
+    results = [None] * 8
+
+    def draw(step):
+        results[step] = stream.generator(step).random(1000)
+
+    threads = [threading.Thread(target=draw, args=(step,)) for step in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for got, want in zip(results, expected):
+        np.testing.assert_array_equal(got, want)
+
+def make_model(X):
+    np.random.seed(0)
+    return Sequential([InputLayer(X), FullyConnectedLayer(8, 32), TanhLayer(), DropoutLayer(0.5),
+                       FullyConnectedLayer(32, 32), TanhLayer(), DropoutLayer(0.5)])
+
+def test_dropout_leaves_global_rng_alone_and_layers_differ():
+    X = np.random.default_rng(0).standard_normal((16, 8))
+    model = make_model(X).seed(42)
+    state = np.random.get_state()[1].copy()
+    model.forward(X)
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+    first, second = model.layers[3], model.layers[6]
+    assert not np.array_equal(first.dropOutKey, second.dropOutKey)
+    mask = first.dropOutKey.copy()
+    model.forward(X)
+    assert not np.array_equal(first.dropOutKey, mask)
+
+    # Same (seed, layer, step), same mask
+    other = make_model(X).seed(42)
+    other.forward(X)
+    np.testing.assert_array_equal(other.layers[3].dropOutKey, mask)
+
+def test_dropout_epoch_selects_step():
+    layer = DropoutLayer(0.5, seed=1)
+    layer.forward(np.ones((4, 10)), epoch=3)
+    mask = layer.dropOutKey.copy()
+    assert layer.rng.step == 0
+    layer.forward(np.ones((4, 10)), epoch=3)
+    np.testing.assert_array_equal(layer.dropOutKey, mask)
+    assert DropoutLayer.fromConfig(layer.getConfig()).rng.seed == 1
+
+def test_initializers_accept_generators():
+    state = np.random.get_state()[1].copy()
+    a = FullyConnectedLayer(6, 4, rng=5)
+    b = FullyConnectedLayer(6, 4, rng=np.random.default_rng(5))
+    conv = Conv2DLayer(2, (3, 3), rng=RandomStream(5, stream=2).generator())
+    np.testing.assert_array_equal(a.weights, b.weights)
+    np.testing.assert_array_equal(conv.kernel, Conv2DLayer(2, (3, 3), rng=RandomStream(5, stream=2).generator()).kernel)
+    np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,104 @@
+import numpy as np
+import sys
+import os
+import asyncio
+import pytest
+
+# Ensure that the project root is on the PYTHONPATH
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from neural_network.core.model import Sequential
+from neural_network.layers.basic import InputLayer
+from neural_network.layers.activations import ReluLayer
+from neural_network.layers.dense import FullyConnectedLayer
+from neural_network.utils.serving import BatchingServer, synthetic_load
+
+def make_model(X):
+    np.random.seed(0)
+    return Sequential([InputLayer(X), FullyConnectedLayer(X.shape[1], 16), ReluLayer(),
+                       FullyConnectedLayer(16, 3)])
+
+def test_concurrent_requests_are_batched():
+    X = np.random.default_rng(0).standard_normal((40, 8))
+    model = make_model(X)
+
+    async def main():
+        async with BatchingServer(model, max_batch_size=16, max_delay=0.05) as server:
+            outputs = await asyncio.gather(*(server.predict(x) for x in X))
+            return outputs, server.stats()
+
+    outputs, stats = asyncio.run(main())
+    np.testing.assert_allclose(np.stack(outputs), model.predict(X), atol=1e-12)
+    assert stats["requests"] == 40
+    assert stats["batches"] == 3
+    assert stats["mean_batch_size"] == pytest.approx(40 / 3)
+
+def test_deadline_flushes_partial_batch():
+    X = np.random.default_rng(1).standard_normal((10, 8))
+    model = make_model(X)
+
+    async def main():
+        async with BatchingServer(model, max_batch_size=64, max_delay=0.001) as server:
+            first = await server.predict(X[0])
+            second = await server.predict(X[1])
+            return first, second, server.stats()
+
+    first, second, stats = asyncio.run(main())
+    np.testing.assert_allclose(np.stack([first, second]), model.predict(X[:2]), atol=1e-12)
+    assert stats["batches"] == 2
+
+def test_errors_reach_every_caller_and_server_keeps_running():
+    X = np.random.default_rng(2).standard_normal((10, 8))
+    model = make_model(X)
+
+    async def main():
+        async with BatchingServer(model, max_batch_size=4, max_delay=0.01) as server:
+            bad = await asyncio.gather(server.predict(np.zeros(5)), server.predict(np.zeros(5)),
+                                       return_exceptions=True)
+            good = await server.predict(X[0])
+            return bad, good
+
+    bad, good = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in bad)
+    np.testing.assert_allclose(good, model.predict(X[:1])[0], atol=1e-12)
+
+def test_malformed_request_does_not_fail_its_batch():
+    X = np.random.default_rng(4).standard_normal((10, 8))
+    model = make_model(X)
+
+    async def main():
+        async with BatchingServer(model, max_batch_size=8, max_delay=0.05) as server:
+            results = await asyncio.gather(server.predict(X[0]), server.predict(np.zeros(5)),
+                                           server.predict(X[1]), return_exceptions=True)
+            return results, server.stats()
+
+    (first, bad, second), stats = asyncio.run(main())
+    assert isinstance(bad, ValueError)
+    expected = model.predict(X[:2])
+    np.testing.assert_allclose(first, expected[0], atol=1e-12)
+    np.testing.assert_allclose(second, expected[1], atol=1e-12)
+    assert stats["requests"] == 2 and stats["batches"] == 1
+
+def test_synthetic_load_reports_latency_and_throughput():
+    X = np.random.default_rng(3).standard_normal((50, 8))
+    model = make_model(X)
+
+    async def main(**load):
+        async with BatchingServer(model, max_batch_size=8, max_delay=0.002) as server:
+            await synthetic_load(server, X, requests=100, **load)
+            return server.stats()
+
+    for load in ({"concurrency": 16}, {"rate": 20000.0}):
+        stats = asyncio.run(main(**load))
+        assert stats["requests"] == 100
+        assert stats["throughput_rps"] > 0
+        latency = stats["latency_ms"]
+        assert 0 < latency["p50"] <= latency["p90"] <= latency["p99"] <= latency["max"]
+
+def test_predict_requires_running_server():
+    server = BatchingServer(make_model(np.ones((4, 2))))
+    with pytest.raises(RuntimeError):
+        asyncio.run(server.predict(np.ones(2)))
+
+if __name__ == "__main__":
+    pytest.main([__file__])
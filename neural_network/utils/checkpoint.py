@@ -0,0 +1,201 @@
+# utils/checkpoint.py
+
+import importlib
+import json
+import os
+import struct
+import numpy as np
+
+# File layout:
+#   MAGIC | uint64 manifest length | JSON manifest | padding | tensor blobs
+# Blobs start on ALIGNMENT-byte boundaries and their offsets in the manifest
+# are relative to the first blob, so every tensor can be mapped in place as a
+# view into one np.memmap of the file.
+MAGIC = b"NNCKPT01"
+ALIGNMENT = 64
+
+def aligned(nbytes):
+    return (nbytes + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def class_path(obj):
+    cls = type(obj)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+def import_class(path):
+    module, _, name = path.rpartition(".")
+    return getattr(importlib.import_module(module), name)
+
+def layer_spec(layer):
+    """Class and constructor config of a layer, without its tensors."""
+    return {"class": class_path(layer), "config": layer.getConfig()}
+
+def build_layer(spec):
+    return import_class(spec["class"]).fromConfig(spec["config"])
+
+class TensorWriter:
+    """Collects arrays for the blob section and records where each will live."""
+    def __init__(self):
+        self.arrays = []
+        self.size = 0
+
+    def add(self, array):
+        array = np.ascontiguousarray(array)
+        entry = {"offset": self.size, "shape": list(array.shape), "dtype": array.dtype.str}
+        self.arrays.append((self.size, array))
+        self.size = aligned(self.size + array.nbytes)
+        return entry
+
+    def addAll(self, arrays):
+        return {name: self.add(value) for name, value in arrays.items()}
+
+    def write(self, f):
+        start = f.tell()
+        for offset, array in self.arrays:
+            f.write(b"\0" * (start + offset - f.tell()))
+            array.tofile(f)
+        f.write(b"\0" * (start + self.size - f.tell()))
+
+def tensor_view(data, entry):
+    """Zero-copy view of one blob in the mapped file."""
+    dtype = np.dtype(entry["dtype"])
+    shape = tuple(entry["shape"])
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    return data[entry["offset"]:entry["offset"] + nbytes].view(dtype).reshape(shape)
+
+def optimizer_spec(optimizer, owners, writer):
+    """
+    Manifest entry for an optimizer: its class, hyperparameters, step count
+    and state arrays. `owners` maps id() of each object the optimizer has
+    stepped to a stable key (a layer index, or "flat" for a ParameterBuffer).
+    Scratch buffers are not saved; they are recreated on load.
+    """
+    config = {name: value for name, value in vars(optimizer).items()
+              if name not in ("state", "t") and isinstance(value, (bool, int, float, str))}
+    state = []
+    for key, entry in optimizer.state.items():
+        if not isinstance(key, tuple) or key[0] not in owners:
+            continue
+        arrays = {name: value for name, value in entry.items()
+                  if isinstance(value, np.ndarray) and name not in ("scratch", "masterGrad")}
+        state.append({"owner": owners[key[0]], "name": key[1], "tensors": writer.addAll(arrays)})
+    return {"class": class_path(optimizer), "config": config, "t": optimizer.t, "state": state}
+
+def build_optimizer(spec, owners, data):
+    """Rebuild an optimizer from its manifest entry; `owners` maps stable keys back to objects."""
+    optimizer = import_class(spec["class"])(**spec["config"])
+    optimizer.t = spec["t"]
+    for entry in spec["state"]:
+        owner = owners.get(entry["owner"])
+        if owner is None:
+            continue
+        param = owner.getParameters()[entry["name"]]
+        state = {"shape": param.shape, "dtype": param.dtype}
+        state.update({name: tensor_view(data, tensor) for name, tensor in entry["tensors"].items()})
+        target = state.get("master", param)
+        if "master" in state:
+            state["masterGrad"] = np.empty_like(target)
+        state["scratch"] = np.empty_like(target)
+        optimizer.state[(id(owner), entry["name"])] = state
+    return optimizer
+
+def save_checkpoint(path, model, optimizer=None):
+    """
+    Write a model, and optionally the optimizer training it, to one file.
+
+    The manifest records every layer's class and config, the model's step
+    count and history, and the optimizer's hyperparameters; parameters,
+    layer state (e.g. InputLayer statistics) and optimizer moments are raw
+    aligned blobs. Layers' own updateWeights/updateKernel optimizers are
+    saved with their layer.
+
+    Args:
+        path (str): Destination file
+        model (Sequential): Model to save
+        optimizer: Optimizer whose state should be resumed with the model
+    """
+    writer = TensorWriter()
+    owners = {id(layer): i for i, layer in enumerate(model.layers)}
+    if model.parameterBuffer is not None:
+        owners[id(model.parameterBuffer)] = "flat"
+
+    layers = []
+    for i, layer in enumerate(model.layers):
+        spec = layer_spec(layer)
+        spec["tensors"] = writer.addAll(layer.getTensors())
+        own = getattr(layer, "optimizer", None)
+        if own is not None and own.state:
+            spec["optimizer"] = optimizer_spec(own, {id(layer): i}, writer)
+        layers.append(spec)
+
+    manifest = {
+        "format": 1,
+        "layers": layers,
+        "step": model.step,
+        "history": model.history,
+        "flat": None if model.parameterBuffer is None else model.parameterBuffer.dtype.str,
+        "optimizer": None if optimizer is None else optimizer_spec(optimizer, owners, writer),
+    }
+    header = json.dumps(manifest, separators=(",", ":")).encode()
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * (aligned(f.tell()) - f.tell()))
+        writer.write(f)
+
+def read_manifest(path):
+    """The manifest and the byte offset of the first tensor blob."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        manifest = json.loads(f.read(length))
+    return manifest, aligned(len(MAGIC) + 8 + length)
+
+def load_checkpoint(path, mode="r"):
+    """
+    Load a checkpoint by memory-mapping it; no tensor is read or copied up
+    front, and processes mapping the same file share its pages.
+
+    Args:
+        path (str): Checkpoint file
+        mode (str): "r" maps the tensors read-only, for serving. "c" maps them
+            copy-on-write so training can resume: pages are copied privately
+            only when written, and the file itself is never modified.
+
+    Returns:
+        (model, optimizer); optimizer is None if none was saved
+    """
+    # core.model imports the fused layers, which import this module
+    from ..core.model import Sequential
+
+    if mode not in ("r", "c"):
+        raise ValueError(f"mode must be 'r' or 'c', got '{mode}'")
+    manifest, start = read_manifest(path)
+    if os.path.getsize(path) > start:
+        data = np.memmap(path, dtype=np.uint8, mode=mode, offset=start)
+    else:
+        data = np.empty(0, dtype=np.uint8)
+
+    layers = []
+    for spec in manifest["layers"]:
+        layer = build_layer(spec)
+        layer.setTensors({name: tensor_view(data, entry) for name, entry in spec["tensors"].items()})
+        if "optimizer" in spec:
+            layer.optimizer = build_optimizer(spec["optimizer"], {len(layers): layer}, data)
+        layers.append(layer)
+
+    model = Sequential(layers)
+    model.step = manifest["step"]
+    model.history = manifest["history"]
+    owners = dict(enumerate(layers))
+    # A flat buffer needs writable, contiguous storage, so it is only rebuilt
+    # when resuming; it copies the parameters out of the mapping
+    if manifest["flat"] is not None and mode == "c":
+        owners["flat"] = model.flattenParameters(manifest["flat"])
+
+    optimizer = None
+    if manifest["optimizer"] is not None:
+        optimizer = build_optimizer(manifest["optimizer"], owners, data)
+    return model, optimizer
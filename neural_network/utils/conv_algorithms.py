@@ -0,0 +1,231 @@
+# utils/conv_algorithms.py
+
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from .conv_engine import conv_forward
+from .windows import allocate, pad2D
+
+# Alternative forward algorithms for the conv_forward layout: (N, C, H, W)
+# input, (F, kh, kw) filters, (N, C*F, oh, ow) output with channel c*F + f
+# holding channel c correlated with filter f. They trade the im2col GEMM for
+# fewer multiplications, which only pays off for some shapes:
+#
+#   fft       O(H W log(H W)) per channel and filter whatever the kernel size,
+#             so it wins for large kernels; strides are applied by subsampling
+#             the stride-1 result.
+#   winograd  F(2x2, 3x3): each 2x2 output tile takes 16 multiplications
+#             instead of 36. Only 3x3 kernels with stride 1.
+#
+# ConvAutotuner times every applicable algorithm the first time it sees a
+# problem and remembers the fastest, in memory and in a JSON file on disk.
+
+def fft_size(n):
+    """Smallest 2-, 3- and 5-smooth length >= n, which pocketfft transforms fastest."""
+    while True:
+        m = n
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return n
+        n += 1
+
+def fft_conv_forward(dataIn, kernel, stride=1, padding=0, scratch=None):
+    """
+    conv_forward through the correlation theorem: the inverse FFT of
+    FFT(input) * conj(FFT(kernel)) is the circular cross-correlation, which
+    matches the linear one wherever the window does not wrap around.
+
+    Args and Returns as for conv_forward
+    """
+    scratch = scratch or allocate
+    N, C = dataIn.shape[:2]
+    F, kh, kw = kernel.shape
+    dtype = np.result_type(dataIn, kernel)
+    padded = pad2D(dataIn, padding, scratch)
+    H, W = padded.shape[-2:]
+    oh, ow = (H - kh) // stride + 1, (W - kw) // stride + 1
+    size = (fft_size(H), fft_size(W))
+
+    spectrum = np.fft.rfft2(padded, s=size)
+    filters = np.conj(np.fft.rfft2(kernel, s=size))
+    product = spectrum[:, :, np.newaxis] * filters
+    correlation = np.fft.irfft2(product, s=size)
+
+    out = scratch("out", (N, C * F, oh, ow), dtype)
+    np.copyto(out.reshape(N, C, F, oh, ow),
+              correlation[..., :stride * (oh - 1) + 1:stride, :stride * (ow - 1) + 1:stride], casting="unsafe")
+    return out
+
+def winograd_input_transform(d):
+    """B^T d over the first axis of length 4 (additions only)."""
+    return np.stack([d[0] - d[2], d[1] + d[2], d[2] - d[1], d[1] - d[3]])
+
+def winograd_output_transform(m):
+    """A^T m over the first axis of length 4 (additions only)."""
+    return np.stack([m[0] + m[1] + m[2], m[1] - m[2] - m[3]])
+
+def winograd_kernel_transform(kernel):
+    """G g G^T for (F, 3, 3) filters, giving (F, 4, 4)."""
+    G = np.array([[1, 0, 0], [0.5, 0.5, 0.5], [0.5, -0.5, 0.5], [0, 0, 1]], dtype=kernel.dtype)
+    return G @ kernel @ G.T
+
+def winograd_conv_forward(dataIn, kernel, stride=1, padding=0, scratch=None):
+    """
+    conv_forward with Winograd F(2x2, 3x3). The output is cut into 2x2 tiles,
+    each computed from a 4x4 input tile: transform the tile and the filter,
+    multiply element-wise (16 products) and transform back. Tile positions
+    lead every intermediate array, so each transform step combines
+    contiguous blocks holding that position for all tiles at once.
+
+    Args and Returns as for conv_forward; kernel must be (F, 3, 3) and stride 1
+    """
+    if kernel.shape[1:] != (3, 3) or stride != 1:
+        raise ValueError(f"winograd F(2x2, 3x3) needs 3x3 kernels and stride 1, "
+                         f"got {kernel.shape[1:]} and stride {stride}")
+    scratch = scratch or allocate
+    N, C = dataIn.shape[:2]
+    F = kernel.shape[0]
+    dtype = np.result_type(dataIn, kernel)
+    padded = pad2D(dataIn, padding, scratch)
+    H, W = padded.shape[-2:]
+    oh, ow = H - 2, W - 2
+    th, tw = -(-oh // 2), -(-ow // 2)
+
+    # Extend the input so the last tiles are whole; the extra outputs are cut off
+    source = np.zeros((N, C, 2 * th + 2, 2 * tw + 2), dtype=dtype)
+    source[:, :, :H, :W] = padded
+    # tiles[i, j] holds input tap (i, j) of every tile: shape (4, 4, N, C, th, tw)
+    tiles = np.array([[source[:, :, i:i + 2 * th:2, j:j + 2 * tw:2] for j in range(4)] for i in range(4)])
+
+    V = winograd_input_transform(winograd_input_transform(tiles).swapaxes(0, 1)).swapaxes(0, 1)
+    U = winograd_kernel_transform(kernel.astype(dtype, copy=False)).transpose(1, 2, 0)
+    M = V[:, :, :, :, np.newaxis] * U[:, :, np.newaxis, np.newaxis, :, np.newaxis, np.newaxis]
+    Y = winograd_output_transform(winograd_output_transform(M).swapaxes(0, 1))
+
+    # Y[q, p] is output position (p, q) of every tile: (2, 2, N, C, F, th, tw)
+    full = scratch("wfull", (N, C, F, 2 * th, 2 * tw), dtype)
+    for p in range(2):
+        for q in range(2):
+            full[..., p::2, q::2] = Y[q, p]
+    out = scratch("out", (N, C * F, oh, ow), dtype)
+    np.copyto(out.reshape(N, C, F, oh, ow), full[..., :oh, :ow])
+    return out
+
+CONV_ALGORITHMS = {
+    "direct": conv_forward,
+    "fft": fft_conv_forward,
+    "winograd": winograd_conv_forward,
+}
+
+def applicable_algorithms(kernelShape, stride=1):
+    """Names of the algorithms that can run a convolution with these filters and stride."""
+    names = ["direct", "fft"]
+    if tuple(kernelShape[-2:]) == (3, 3) and stride == 1:
+        names.append("winograd")
+    return names
+
+def default_cache_path():
+    """$NEURAL_NETWORK_AUTOTUNE_CACHE, or ~/.cache/neural_network/conv_autotune.json."""
+    return os.environ.get("NEURAL_NETWORK_AUTOTUNE_CACHE",
+                          os.path.join(os.path.expanduser("~"), ".cache", "neural_network", "conv_autotune.json"))
+
+class ConvAutotuner:
+    def __init__(self, path=None, repeat=3):
+        """
+        Picks the fastest convolution algorithm per problem. A problem is the
+        input shape, filter shape, stride, padding and dtype; the first
+        select() for it times every applicable algorithm, and the winner is
+        kept in memory and, if a path is given, in a JSON file that later
+        processes read instead of re-timing.
+
+        Args:
+            path (str): JSON cache file; None keeps results in memory only
+            repeat (int): Timed calls per algorithm; the best one counts
+        """
+        self.path = path
+        self.repeat = repeat
+        self.entries = self.load()
+
+    @staticmethod
+    def key(shape, kernelShape, stride, padding, dtype):
+        return (f"{'x'.join(map(str, shape))}|{'x'.join(map(str, kernelShape))}"
+                f"|s{stride}|p{padding}|{np.dtype(dtype).str}")
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f).get("entries", {})
+        except (OSError, ValueError):
+            # A corrupt or unreadable cache only costs a re-tune
+            return {}
+
+    def save(self):
+        """
+        Merge this tuner's entries into the cache file, replacing it
+        atomically. Like load, this is best-effort: if the file cannot be
+        written the entries stay in memory only.
+        """
+        if self.path is None:
+            return
+        # Keep entries other processes wrote since this tuner loaded the file
+        entries = {**self.load(), **self.entries}
+        temp = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp, "w") as f:
+                json.dump({"entries": entries}, f, indent=1)
+            os.replace(temp, self.path)
+        except OSError:
+            try:
+                os.remove(temp)
+            except OSError:
+                pass
+            return
+        self.entries = entries
+
+    def benchmark(self, dataIn, kernel, stride=1, padding=0):
+        """Best wall time in seconds of each applicable algorithm on this problem."""
+        times = {}
+        for name in applicable_algorithms(kernel.shape, stride):
+            algorithm = CONV_ALGORITHMS[name]
+            best = float("inf")
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                algorithm(dataIn, kernel, stride, padding)
+                best = min(best, time.perf_counter() - start)
+            times[name] = best
+        return times
+
+    def select(self, dataIn, kernel, stride=1, padding=0):
+        """Name of the fastest algorithm for this problem, timing the candidates on a cache miss."""
+        key = self.key(dataIn.shape, kernel.shape, stride, padding, np.result_type(dataIn, kernel))
+        entry = self.entries.get(key)
+        if entry is None:
+            times = self.benchmark(dataIn, kernel, stride, padding)
+            entry = {"algorithm": min(times, key=times.get), "times": times}
+            self.entries[key] = entry
+            self.save()
+        return entry["algorithm"]
+
+_autotuner = None
+
+def get_autotuner():
+    """The process-wide ConvAutotuner used by layers with algorithm="auto"."""
+    global _autotuner
+    if _autotuner is None:
+        _autotuner = ConvAutotuner(default_cache_path())
+    return _autotuner
+
+def set_autotuner(tuner):
+    """Replace the process-wide ConvAutotuner, e.g. with one using another cache file."""
+    global _autotuner
+    _autotuner = tuner
@@ -0,0 +1,241 @@
+# utils/conv_engine.py
+
+from .windows import allocate, pair, pad2D, window_view, window_scatter_add
+import numpy as np
+
+# Batched convolution engine. Every channel of an (N, C, H, W) batch is
+# cross-correlated with every (kh, kw) filter; output channel c*F + f holds
+# channel c convolved with filter f, which is the layout Conv2DLayer (C == 1)
+# and Conv3DLayer both use.
+#
+# Intermediate and output arrays come from `scratch(tag, shape, dtype)`, which
+# defaults to plain allocation; layers pass their arena-backed allocator so the
+# im2col matrix, GEMM result and output are reused across steps.
+
+def conv_forward(dataIn, kernel, stride=1, padding=0, scratch=None):
+    """
+    Convolve a whole batch against all filters with a single GEMM.
+
+    Args:
+        dataIn: Input of shape (N, C, H, W)
+        kernel: Filters of shape (F, kh, kw)
+        stride (int): Convolution stride
+        padding (int): Zero padding added to each spatial side
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Output of shape (N, C*F, oh, ow)
+    """
+    scratch = scratch or allocate
+    N, C = dataIn.shape[:2]
+    F, kh, kw = kernel.shape
+    dtype = np.result_type(dataIn, kernel)
+    windows = window_view(pad2D(dataIn, padding, scratch), kh, kw, stride)
+    oh, ow = windows.shape[2:4]
+
+    cols = scratch("cols", windows.shape, dtype)
+    np.copyto(cols, windows)
+    gemm = scratch("gemm", (N * C * oh * ow, F), dtype)
+    np.matmul(cols.reshape(-1, kh * kw), kernel.reshape(F, kh * kw).T, out=gemm)
+
+    out = scratch("out", (N, C * F, oh, ow), dtype)
+    np.copyto(out.reshape(N, C, F, oh, ow), gemm.reshape(N, C, oh, ow, F).transpose(0, 1, 4, 2, 3))
+    return out
+
+def conv_backward_input(gradIn, kernel, inputShape, stride=1, padding=0, scratch=None):
+    """
+    Gradient of the loss with respect to the convolution input.
+
+    Args:
+        gradIn: Gradient w.r.t. the output, shape (N, C*F, oh, ow)
+        kernel: Filters of shape (F, kh, kw)
+        inputShape (tuple): Shape (N, C, H, W) of the unpadded input
+        stride (int): Convolution stride
+        padding (int): Zero padding used in the forward pass
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Gradient of shape (N, C, H, W)
+    """
+    scratch = scratch or allocate
+    N, C, H, W = inputShape
+    F, kh, kw = kernel.shape
+    oh, ow = gradIn.shape[-2:]
+    dtype = np.result_type(gradIn, kernel)
+
+    grad = scratch("dgrad", (N, C, oh, ow, F), dtype)
+    np.copyto(grad, gradIn.reshape(N, C, F, oh, ow).transpose(0, 1, 3, 4, 2))
+    cols = scratch("dcols", (N, C, oh, ow, kh, kw), dtype)
+    np.matmul(grad.reshape(-1, F), kernel.reshape(F, kh * kw), out=cols.reshape(-1, kh * kw))
+
+    padded = scratch("dpad", (N, C, H + 2 * padding, W + 2 * padding), dtype)
+    window_scatter_add(cols, padded.shape, stride, out=padded)
+    if padding == 0:
+        return padded
+    return padded[:, :, padding:padding + H, padding:padding + W]
+
+def conv_backward_kernel(gradIn, dataIn, kernelShape, stride=1, padding=0):
+    """
+    Gradient of the loss with respect to the filters, summed over the batch.
+
+    Args:
+        gradIn: Gradient w.r.t. the output, shape (N, C*F, oh, ow)
+        dataIn: Input of shape (N, C, H, W) seen in the forward pass
+        kernelShape (tuple): Shape (F, kh, kw) of the filters
+        stride (int): Convolution stride
+        padding (int): Zero padding used in the forward pass
+
+    Returns:
+        Gradient of shape (F, kh, kw)
+    """
+    N, C = dataIn.shape[:2]
+    F, kh, kw = kernelShape
+    windows = window_view(pad2D(dataIn, padding), kh, kw, stride)
+    grad = gradIn.reshape(N, C, F, gradIn.shape[-2], gradIn.shape[-1])
+    return np.tensordot(grad, windows, axes=([0, 1, 3, 4], [0, 1, 2, 3]))
+
+# Multi-channel convolution with (F, C/groups, kh, kw) kernels, as used by
+# ConvLayer. Channels are split into `groups` independent blocks; each output
+# channel sees only the C/groups input channels of its block. The im2col
+# matrix is laid out (groups, N*oh*ow, C/groups*kh*kw) so every group is one
+# slice of a single batched matmul. Depthwise convolution (one input channel
+# per group) has nothing to contract over channels, so it skips im2col and
+# accumulates one strided view of the input per kernel tap instead.
+
+def grouped_cols(dataIn, kernelShape, stride, padding, dilation, groups, scratch):
+    """im2col matrix of shape (groups, N*oh*ow, C/groups*kh*kw) and the output size."""
+    N, C = dataIn.shape[:2]
+    _, cg, kh, kw = kernelShape
+    windows = window_view(pad2D(dataIn, padding, scratch), kh, kw, stride, dilation)
+    oh, ow = windows.shape[2:4]
+    cols = scratch("cols", (groups, N, oh, ow, cg, kh, kw), dataIn.dtype)
+    np.copyto(cols, windows.reshape(N, groups, cg, oh, ow, kh, kw).transpose(1, 0, 3, 4, 2, 5, 6))
+    return cols.reshape(groups, N * oh * ow, cg * kh * kw), (oh, ow)
+
+def tap_view(padded, i, j, outputSize, stride, dilation):
+    """The (N, C, oh, ow) input values that meet kernel tap (i, j)."""
+    (oh, ow), (sh, sw), (dh, dw) = outputSize, pair(stride), pair(dilation)
+    return padded[:, :, i * dh:i * dh + sh * (oh - 1) + 1:sh, j * dw:j * dw + sw * (ow - 1) + 1:sw]
+
+def grouped_conv_forward(dataIn, kernel, stride=1, padding=0, dilation=1, groups=1, scratch=None):
+    """
+    Grouped, dilated convolution of a whole batch.
+
+    Args:
+        dataIn: Input of shape (N, C, H, W)
+        kernel: Filters of shape (F, C/groups, kh, kw)
+        stride (int or tuple): Convolution stride
+        padding (int or tuple): Zero padding added to each spatial side
+        dilation (int or tuple): Spacing between kernel taps
+        groups (int): Number of channel groups; C and F must be divisible by it
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Output of shape (N, F, oh, ow)
+    """
+    scratch = scratch or allocate
+    N, C, H, W = dataIn.shape
+    F, cg, kh, kw = kernel.shape
+    fg = F // groups
+    dtype = np.result_type(dataIn, kernel)
+
+    if cg == 1 and groups == C:
+        padded = pad2D(dataIn, padding, scratch)
+        (ph, pw), (sh, sw), (dh, dw) = pair(padding), pair(stride), pair(dilation)
+        oh = (H + 2 * ph - dh * (kh - 1) - 1) // sh + 1
+        ow = (W + 2 * pw - dw * (kw - 1) - 1) // sw + 1
+        out = scratch("out", (N, C, fg, oh, ow), dtype)
+        out.fill(0)
+        taps = kernel.reshape(C, fg, kh, kw)
+        term = scratch("term", out.shape, dtype)
+        for i in range(kh):
+            for j in range(kw):
+                view = tap_view(padded, i, j, (oh, ow), stride, dilation)
+                np.multiply(view[:, :, np.newaxis], taps[np.newaxis, :, :, i, j, np.newaxis, np.newaxis], out=term)
+                out += term
+        return out.reshape(N, F, oh, ow)
+
+    cols, (oh, ow) = grouped_cols(dataIn, kernel.shape, stride, padding, dilation, groups, scratch)
+    gemm = scratch("gemm", (groups, N * oh * ow, fg), dtype)
+    np.matmul(cols, kernel.reshape(groups, fg, cg * kh * kw).transpose(0, 2, 1), out=gemm)
+    out = scratch("out", (N, F, oh, ow), dtype)
+    np.copyto(out.reshape(N, groups, fg, oh, ow), gemm.reshape(groups, N, oh, ow, fg).transpose(1, 0, 4, 2, 3))
+    return out
+
+def grouped_conv_backward_input(gradIn, kernel, inputShape, stride=1, padding=0, dilation=1, groups=1,
+                                scratch=None):
+    """
+    Gradient of the loss with respect to the input of grouped_conv_forward.
+
+    Args:
+        gradIn: Gradient w.r.t. the output, shape (N, F, oh, ow)
+        kernel: Filters of shape (F, C/groups, kh, kw)
+        inputShape (tuple): Shape (N, C, H, W) of the unpadded input
+        stride, padding, dilation, groups: As in the forward pass
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Gradient of shape (N, C, H, W)
+    """
+    scratch = scratch or allocate
+    N, C, H, W = inputShape
+    F, cg, kh, kw = kernel.shape
+    fg = F // groups
+    oh, ow = gradIn.shape[-2:]
+    ph, pw = pair(padding)
+    dtype = np.result_type(gradIn, kernel)
+    padded = scratch("dpad", (N, C, H + 2 * ph, W + 2 * pw), dtype)
+
+    if cg == 1 and groups == C:
+        padded.fill(0)
+        grad = gradIn.reshape(N, C, fg, oh, ow)
+        taps = kernel.reshape(C, fg, kh, kw)
+        term = scratch("dterm", (N, C, oh, ow), dtype)
+        for i in range(kh):
+            for j in range(kw):
+                np.einsum("ncmhw,cm->nchw", grad, taps[:, :, i, j], out=term)
+                tap_view(padded, i, j, (oh, ow), stride, dilation)[...] += term
+    else:
+        grad = scratch("dgrad", (groups, N, oh, ow, fg), dtype)
+        np.copyto(grad, gradIn.reshape(N, groups, fg, oh, ow).transpose(1, 0, 3, 4, 2))
+        cols = scratch("dcols", (groups, N, oh, ow, cg, kh, kw), dtype)
+        np.matmul(grad.reshape(groups, -1, fg), kernel.reshape(groups, fg, cg * kh * kw),
+                  out=cols.reshape(groups, N * oh * ow, cg * kh * kw))
+        windows = cols.transpose(1, 0, 4, 2, 3, 5, 6).reshape(N, C, oh, ow, kh, kw)
+        window_scatter_add(windows, padded.shape, stride, out=padded, dilation=dilation)
+    return padded[:, :, ph:ph + H, pw:pw + W]
+
+def grouped_conv_backward_kernel(gradIn, dataIn, kernelShape, stride=1, padding=0, dilation=1, groups=1,
+                                 scratch=None):
+    """
+    Gradient of the loss with respect to the filters, summed over the batch.
+
+    Args:
+        gradIn: Gradient w.r.t. the output, shape (N, F, oh, ow)
+        dataIn: Input of shape (N, C, H, W) seen in the forward pass
+        kernelShape (tuple): Shape (F, C/groups, kh, kw) of the filters
+        stride, padding, dilation, groups: As in the forward pass
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Gradient of shape (F, C/groups, kh, kw)
+    """
+    scratch = scratch or allocate
+    N, C = dataIn.shape[:2]
+    F, cg, kh, kw = kernelShape
+    fg = F // groups
+    oh, ow = gradIn.shape[-2:]
+    dtype = np.result_type(gradIn, dataIn)
+
+    if cg == 1 and groups == C:
+        padded = pad2D(dataIn, padding, scratch)
+        grad = gradIn.reshape(N, C, fg, oh, ow)
+        out = np.empty((C, fg, kh, kw), dtype=dtype)
+        for i in range(kh):
+            for j in range(kw):
+                out[:, :, i, j] = np.einsum("ncmhw,nchw->cm", grad, tap_view(padded, i, j, (oh, ow), stride, dilation))
+        return out.reshape(kernelShape)
+
+    cols, _ = grouped_cols(dataIn, kernelShape, stride, padding, dilation, groups, scratch)
+    grad = gradIn.reshape(N, groups, fg, oh * ow).transpose(1, 2, 0, 3).reshape(groups, fg, N * oh * ow)
+    return np.matmul(grad, cols).reshape(kernelShape)
@@ -0,0 +1,172 @@
+# utils/data.py
+
+import threading
+import queue
+import numpy as np
+
+from .statistics import RunningStatistics
+
+def open_shard(path, dtype=None, shape=None):
+    """
+    Memory-map one shard: a .npy file, or a raw binary file of `dtype`
+    samples of `shape`. Nothing is read until the array is indexed.
+    """
+    if str(path).endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if dtype is None or shape is None:
+        raise ValueError(f"raw shard {path} needs a dtype and a sample shape")
+    return np.memmap(path, dtype=dtype, mode="r").reshape((-1,) + tuple(shape))
+
+class ShardedDataset:
+    def __init__(self, paths, dtype=None, shape=None):
+        """
+        Samples stored across one or more memory-mapped shards, indexed as one
+        array along the first axis. Indexing with a slice or an index array
+        reads only the requested rows.
+
+        Args:
+            paths (list): Shard files, .npy or raw binary, in order
+            dtype: Sample dtype of raw shards
+            shape (tuple): Shape of one sample in raw shards
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        self.shards = [open_shard(path, dtype, shape) for path in paths]
+        sampleShapes = {shard.shape[1:] for shard in self.shards}
+        if len(sampleShapes) != 1:
+            raise ValueError(f"shards have different sample shapes: {sorted(sampleShapes)}")
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+        self.dtype = np.result_type(*self.shards)
+        self.shape = (int(self.offsets[-1]),) + self.shards[0].shape[1:]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(len(self)))
+        index = np.asarray(index)
+        if np.any((index < -len(self)) | (index >= len(self))):
+            raise IndexError(f"index out of range for a dataset of {len(self)} samples")
+        index = np.where(index < 0, index + len(self), index)
+        if index.ndim == 0:
+            shard = np.searchsorted(self.offsets, index, side="right") - 1
+            return np.asarray(self.shards[shard][index - self.offsets[shard]])
+
+        out = np.empty((len(index),) + self.shape[1:], dtype=self.dtype)
+        shardOf = np.searchsorted(self.offsets, index, side="right") - 1
+        for shard in np.unique(shardOf):
+            rows = np.flatnonzero(shardOf == shard)
+            local = index[rows] - self.offsets[shard]
+            # Sorted reads walk each shard forward, which the page cache prefers
+            order = np.argsort(local, kind="stable")
+            out[rows[order]] = self.shards[shard][local[order]]
+        return out
+
+def read(data, index):
+    """Rows of `data` copied into memory; slices of a memmap would otherwise stay lazy views."""
+    rows = data[index]
+    return np.array(rows) if isinstance(rows, np.memmap) else np.asarray(rows)
+
+def compute_statistics(data, chunk_size=65536):
+    """
+    Per-feature mean and variance of `data` (an array, memmap or
+    ShardedDataset) in one sequential streaming pass.
+
+    Returns:
+        A RunningStatistics; pass `mean=stats.mean, std=stats.std()` to InputLayer
+    """
+    stats = RunningStatistics()
+    for start in range(0, len(data), chunk_size):
+        stats.update(data[start:start + chunk_size])
+    return stats
+
+class DataLoader:
+    _END = object()
+
+    def __init__(self, X, Y=None, batch_size=32, shuffle=True, seed=None, prefetch=4, drop_last=False):
+        """
+        Mini-batches read from (possibly memory-mapped) data by a background
+        thread into a bounded queue, so disk reads overlap training. At most
+        `prefetch` batches are held in memory at any time. NumPy releases the
+        GIL while it copies rows out of a memory map, so a thread is enough to
+        keep the queue full.
+
+        Iterating yields (X, Y) tuples, or just X if Y is None. Pass the loader
+        as the only data argument of Sequential.fit to train from it.
+
+        Args:
+            X: Inputs indexable along the first axis (array, memmap, ShardedDataset)
+            Y: Optional targets aligned with X
+            batch_size (int): Samples per batch
+            shuffle (bool): Draw a new random sample order every epoch
+            seed (int): Seed for the shuffling order
+            prefetch (int): Maximum number of batches waiting in the queue
+            drop_last (bool): Skip the final incomplete batch
+        """
+        if Y is not None and len(Y) != len(X):
+            raise ValueError(f"X and Y have different lengths: {len(X)} and {len(Y)}")
+        self.X = X
+        self.Y = Y
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.prefetch = prefetch
+        self.drop_last = drop_last
+
+    def __len__(self):
+        n = len(self.X)
+        return n // self.batch_size if self.drop_last else -(-n // self.batch_size)
+
+    def indices(self):
+        """Per-batch index arrays (or slices when not shuffling) for one epoch."""
+        n = len(self.X)
+        stop = n - n % self.batch_size if self.drop_last else n
+        if self.shuffle:
+            order = self.rng.permutation(n)
+            return [np.sort(order[start:start + self.batch_size]) for start in range(0, stop, self.batch_size)]
+        return [slice(start, min(start + self.batch_size, stop)) for start in range(0, stop, self.batch_size)]
+
+    def load(self, index):
+        X = read(self.X, index)
+        if self.Y is None:
+            return X
+        return X, read(self.Y, index)
+
+    def __iter__(self):
+        batches = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        indices = self.indices()
+
+        def put(item):
+            # Give up if the consumer has gone away while the queue is full
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def produce():
+            try:
+                for index in indices:
+                    if not put(self.load(index)):
+                        return
+                put(self._END)
+            except BaseException as error:
+                put(error)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                item = batches.get()
+                if item is self._END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            worker.join()
@@ -0,0 +1,212 @@
+# utils/gradcheck.py
+
+import numpy as np
+
+from ..core.base import no_activation_cache
+
+# Finite-difference settings per dtype: step size and the largest accepted
+# error of a directional derivative relative to the sum of the magnitudes of
+# its terms. Central differences lose about half the mantissa, so float32
+# checks are coarse; check kernels in float64 where possible.
+GRADCHECK_TOLERANCES = {
+    np.dtype(np.float64): {"eps": 1e-6, "rtol": 1e-5},
+    np.dtype(np.float32): {"eps": 1e-2, "rtol": 2e-2},
+    np.dtype(np.float16): {"eps": 1e-1, "rtol": 2e-1},
+}
+
+# Largest accepted normwise relative difference, max|fast - ref| / max|ref|,
+# between a fast kernel and its reference implementation.
+DIFFERENTIAL_TOLERANCES = {
+    np.dtype(np.float64): 1e-10,
+    np.dtype(np.float32): 1e-4,
+    np.dtype(np.float16): 1e-2,
+}
+
+def float_type(*arrays):
+    dtype = np.result_type(*arrays)
+    return dtype if dtype in GRADCHECK_TOLERANCES else np.dtype(np.float64)
+
+def directional_errors(numeric, analytic, scale, floor=1e-12):
+    """Error of each directional derivative relative to the magnitude of its terms."""
+    return np.abs(numeric - analytic) / np.maximum(scale, floor)
+
+def report(errors, rtol):
+    worst = float(np.max(errors)) if len(errors) else 0.0
+    return {"max_error": worst, "passed": bool(worst <= rtol)}
+
+def projected(R, out):
+    """sum(R * out) per leading entry of out, accumulated in float64."""
+    R = np.asarray(R, dtype=np.float64)
+    out = np.asarray(out, dtype=np.float64).reshape((-1,) + R.shape)
+    return np.tensordot(out, R, axes=R.ndim)
+
+def gradcheck(layer, X, forward=None, directions=8, batched=True, seed=0, eps=None, rtol=None):
+    """
+    Check a layer's backward and parameter gradients against central finite
+    differences of its forward pass.
+
+    The checked scalar is sum(R * forward(X)) for a random R. Rather than one
+    coordinate at a time, each finite difference perturbs the whole input (or
+    a whole parameter) along a random direction V and is compared with the
+    analytic directional derivative sum(grad * V). With batched=True the 2 *
+    directions perturbed copies of X are concatenated along the batch axis and
+    evaluated in a single forward call; this needs a layer whose samples are
+    independent, so pass batched=False for layers that mix samples or draw a
+    batch-shaped random mask.
+
+    Parameter gradients are compared as batch means, the convention of
+    computeGradients.
+
+    Args:
+        layer (Layer): Layer to check; its caches and gradients are overwritten
+        X: Input batch, ideally away from kinks (e.g. ReLU at 0, pooling ties)
+        forward: Callable used instead of layer.forward, e.g. to fix a dropout step
+        directions (int): Random directions per checked tensor
+        batched (bool): Evaluate all input perturbations in one forward call
+        seed (int): Seed for R and the directions
+        eps (float): Finite-difference step; defaults by dtype
+        rtol (float): Accepted relative error; defaults by dtype
+
+    Returns:
+        Dict with an entry per checked tensor ("input" and each parameter
+        name) holding its max_error and passed flag, and an overall "passed"
+    """
+    forward = forward or layer.forward
+    rng = np.random.default_rng(seed)
+    dtype = float_type(X, *layer.getParameters().values())
+    eps = GRADCHECK_TOLERANCES[dtype]["eps"] if eps is None else eps
+    rtol = GRADCHECK_TOLERANCES[dtype]["rtol"] if rtol is None else rtol
+
+    out = np.array(forward(X))
+    R = rng.standard_normal(out.shape)
+    gradIn = R.astype(out.dtype)
+    layer.computeGradients(gradIn)
+    analytic = {name: np.array(grad, dtype=np.float64) for name, grad in layer.getGradients().items()}
+    gradX = np.array(layer.backward(gradIn), dtype=np.float64)
+
+    def loss(data):
+        return projected(R, forward(data))
+
+    results = {}
+    V = rng.standard_normal((directions,) + X.shape).astype(X.dtype)
+    with no_activation_cache():
+        if batched:
+            shifted = np.concatenate([X + eps * V, X - eps * V]).reshape((-1,) + X.shape[1:])
+            values = loss(shifted).reshape(2, directions)
+            numeric = (values[0] - values[1]) / (2 * eps)
+        else:
+            numeric = np.array([(loss(X + eps * v) - loss(X - eps * v))[0] / (2 * eps) for v in V])
+        terms = gradX * V
+        results["input"] = report(directional_errors(numeric, terms.reshape(directions, -1).sum(axis=1),
+                                                     np.abs(terms).reshape(directions, -1).sum(axis=1)), rtol)
+
+        n = len(X)
+        for name, param in layer.getParameters().items():
+            original = param.copy()
+            errors = []
+            for _ in range(directions):
+                v = rng.standard_normal(param.shape).astype(param.dtype)
+                param += eps * v
+                plus = loss(X)
+                np.copyto(param, original)
+                param -= eps * v
+                minus = loss(X)
+                np.copyto(param, original)
+                terms = analytic[name] * v
+                errors.append(directional_errors((plus - minus)[0] / (2 * eps) / n, terms.sum(),
+                                                 np.abs(terms).sum()))
+            results[name] = report(np.array(errors), rtol)
+
+    results["passed"] = all(entry["passed"] for entry in results.values())
+    return results
+
+def objective_gradcheck(objective, Y, Yhat, mean_over="samples", directions=8, seed=0, eps=None, rtol=None):
+    """
+    Check an objective's gradient against central finite differences of its
+    eval along random directions of Yhat.
+
+    Objectives return the gradient of the per-sample loss, while eval averages:
+    over samples (mean_over="samples") or over every element
+    (mean_over="elements", e.g. SquaredError). The numeric derivative is
+    rescaled accordingly.
+
+    Returns:
+        Dict with max_error and passed
+    """
+    rng = np.random.default_rng(seed)
+    dtype = float_type(Yhat)
+    eps = GRADCHECK_TOLERANCES[dtype]["eps"] if eps is None else eps
+    rtol = GRADCHECK_TOLERANCES[dtype]["rtol"] if rtol is None else rtol
+    scale = len(Yhat) if mean_over == "samples" else np.size(Yhat)
+
+    analytic = np.array(objective.gradient(Y, Yhat), dtype=np.float64)
+    errors = []
+    for _ in range(directions):
+        v = rng.standard_normal(np.shape(Yhat)).astype(dtype)
+        numeric = (float(objective.eval(Y, Yhat + eps * v)) - float(objective.eval(Y, Yhat - eps * v))) / (2 * eps)
+        terms = analytic * v
+        errors.append(directional_errors(numeric * scale, terms.sum(), np.abs(terms).sum()))
+    return report(np.array(errors), rtol)
+
+def compare(fast, reference, rtol=None):
+    """
+    Normwise relative difference between a fast result and its reference,
+    judged with the tolerance for the fast result's dtype.
+
+    Returns:
+        Dict with max_abs, max_error (max_abs / max|reference|) and passed
+    """
+    fast, reference = np.asarray(fast), np.asarray(reference)
+    if fast.shape != reference.shape:
+        return {"max_abs": float("inf"), "max_error": float("inf"), "passed": False}
+    dtype = float_type(fast)
+    rtol = DIFFERENTIAL_TOLERANCES[dtype] if rtol is None else rtol
+    diff = np.abs(fast.astype(np.float64) - reference.astype(np.float64))
+    maxAbs = float(diff.max()) if diff.size else 0.0
+    error = maxAbs / max(float(np.abs(reference).max()) if reference.size else 0.0, 1e-300)
+    return {"max_abs": maxAbs, "max_error": error, "passed": bool(error <= rtol)}
+
+def reference_forward(layer, X):
+    """A layer's reference forward pass (convolve2D / pool2D loops), or None if it has none."""
+    if hasattr(layer, "convolve"):
+        return layer.convolve(layer.castInput(X), layer.kernel, layer.padding, layer.stride)
+    if hasattr(layer, "pool"):
+        return layer.pool(X)
+    return None
+
+def reference_backward(layer, X, gradIn):
+    """
+    A layer's reference backward pass for its last forward, on input X:
+    referenceBackward where defined, otherwise the Jacobian-based
+    Layer.jacobianBackward. None if neither applies (no Jacobian from gradient(), or a convolution, whose
+    gradient() is not a per-sample Jacobian).
+    """
+    if hasattr(layer, "referenceBackward"):
+        return layer.referenceBackward(gradIn, X)
+    if hasattr(layer, "convolve") or layer.gradient() is None:
+        return None
+    return layer.jacobianBackward(gradIn)
+
+def differential(layer, X, seed=0, rtol=None):
+    """
+    Check a layer's fast forward and backward against its reference
+    implementations on the same input.
+
+    Returns:
+        Dict with a compare() entry for "forward" and "backward" where the
+        layer has a reference, and an overall "passed"
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+    out = np.array(layer.forward(X))
+    expected = reference_forward(layer, X)
+    if expected is not None:
+        results["forward"] = compare(out, expected, rtol)
+
+    gradIn = rng.standard_normal(out.shape).astype(out.dtype)
+    fast = np.array(layer.backward(gradIn))
+    expected = reference_backward(layer, X, gradIn)
+    if expected is not None:
+        results["backward"] = compare(fast, expected, rtol)
+    results["passed"] = all(entry["passed"] for entry in results.values())
+    return results
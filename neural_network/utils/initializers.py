@@ -1,24 +1,41 @@
 # utils/initializers.py
 
+from ..core.precision import resolve_dtype
 import numpy as np
 
-def xavier_init(size_in, size_out):
+def cast(weights, biases, dtype=None):
+    """Contiguous weights and biases in the requested (or default) dtype."""
+    dtype = resolve_dtype(dtype)
+    return np.ascontiguousarray(weights, dtype=dtype), np.ascontiguousarray(biases, dtype=dtype)
+
+def generator(rng=None):
+    """
+    The source of random numbers for an initializer: NumPy's global RNG if
+    rng is None, otherwise a Generator built from rng (a seed, a
+    Generator, or e.g. RandomStream(seed, layer).generator()).
+    """
+    return np.random if rng is None else np.random.default_rng(rng)
+
+def xavier_init(size_in, size_out, dtype=None, rng=None):
     """Xavier/Glorot initialization."""
+    rng = generator(rng)
     bound = np.sqrt(6/(size_in + size_out))
-    weights = np.random.uniform(-bound, bound, (size_out, size_in)).T
-    biases = np.random.uniform(-bound, bound, (1, size_out))
-    return weights, biases
+    weights = rng.uniform(-bound, bound, (size_out, size_in)).T
+    biases = rng.uniform(-bound, bound, (1, size_out))
+    return cast(weights, biases, dtype)
 
-def he_init(size_in, size_out):
+def he_init(size_in, size_out, dtype=None, rng=None):
     """He initialization."""
+    rng = generator(rng)
     std_dev1 = np.sqrt(2/size_in)
     std_dev2 = np.sqrt(2/1)
-    weights = np.random.normal(0, std_dev1, (size_in, size_out))
-    biases = np.random.normal(0, std_dev2, (1, size_out))
-    return weights, biases
+    weights = rng.normal(0, std_dev1, (size_in, size_out))
+    biases = rng.normal(0, std_dev2, (1, size_out))
+    return cast(weights, biases, dtype)
 
-def uniform_init(size_in, size_out, scale=0.001):
+def uniform_init(size_in, size_out, scale=0.001, dtype=None, rng=None):
     """Simple uniform initialization."""
-    weights = np.random.uniform(-scale, scale, (size_out, size_in)).T
-    biases = np.random.uniform(-scale, scale, (1, size_out))
-    return weights, biases
\ No newline at end of file
+    rng = generator(rng)
+    weights = rng.uniform(-scale, scale, (size_out, size_in)).T
+    biases = rng.uniform(-scale, scale, (1, size_out))
+    return cast(weights, biases, dtype)
\ No newline at end of file
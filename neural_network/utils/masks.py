@@ -0,0 +1,33 @@
+# utils/masks.py
+
+import numpy as np
+
+class PackedMask:
+    def __init__(self, bits, shape):
+        """
+        A boolean array stored one bit per element in np.packbits order: 1/8
+        the size of a bool array and 1/64 of a float64 one. Layers cache these
+        between forward and backward instead of full activations.
+
+        Args:
+            bits: uint8 array from np.packbits over the flattened mask
+            shape (tuple): Shape of the unpacked mask
+        """
+        self.bits = bits
+        self.shape = tuple(shape)
+
+    @classmethod
+    def pack(cls, mask):
+        return cls(np.packbits(mask, axis=None), np.shape(mask))
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def unpack(self):
+        """The mask as a freshly unpacked bool array."""
+        return np.unpackbits(self.bits, count=self.size).reshape(self.shape).view(bool)
@@ -3,33 +3,167 @@
 import numpy as np
 
 class Optimizer:
-    def __init__(self, learning_rate):
+    def __init__(self, learning_rate, master_weights=False):
+        """
+        Base optimizer. Subclasses implement initState and updateParameter;
+        step() applies them in place to every parameter a layer exposes
+        through getParameters()/getGradients().
+
+        Args:
+            learning_rate (float): Step size
+            master_weights (bool): Keep a float64 master copy of every
+                lower-precision parameter; the update is applied to the master
+                and the result cast back. Parameters should only be changed
+                through the optimizer once it holds a master copy.
+        """
         self.learning_rate = learning_rate
+        self.master_weights = master_weights
+        self.state = {}
+        self.t = 0
 
-    def update(self, weights, gradients):
+    def step(self, layers, t=None):
+        """
+        Update every parameter of every layer in place. Call once per training step.
+
+        Args:
+            layers (list): Objects exposing getParameters() and getGradients()
+            t (int): Step number for bias correction; defaults to an internal counter
+        """
+        self.t = self.t + 1 if t is None else t
+        for layer in layers:
+            params = layer.getParameters()
+            if not params:
+                continue
+            grads = layer.getGradients()
+            for name, param in params.items():
+                state = self.getState((id(layer), name), param)
+                master = state.get("master")
+                if master is None:
+                    self.updateParameter(param, grads[name], state)
+                else:
+                    masterGrad = state["masterGrad"]
+                    np.copyto(masterGrad, grads[name])
+                    self.updateParameter(master, masterGrad, state)
+                    np.copyto(param, master, casting="same_kind")
+
+    def getState(self, key, param):
+        """Preallocated state buffers for one parameter, rebuilt if its shape or dtype changes."""
+        state = self.state.get(key)
+        if state is None or state["shape"] != param.shape or state["dtype"] != param.dtype:
+            target = param
+            state = {"shape": param.shape, "dtype": param.dtype}
+            if self.master_weights and param.dtype != np.float64:
+                target = param.astype(np.float64)
+                state["master"] = target
+                state["masterGrad"] = np.empty_like(target)
+            state.update(self.initState(target))
+            state["scratch"] = np.empty_like(target)
+            self.state[key] = state
+        return state
+
+    def initState(self, param):
+        return {}
+
+    def updateParameter(self, param, grad, state):
         raise NotImplementedError("Subclass must implement this abstract method")
 
+    def update(self, weights, gradients):
+        """Return updated weights without modifying the inputs."""
+        weights = np.array(weights, dtype=np.result_type(weights, gradients, float))
+        self.t += 1
+        self.updateParameter(weights, gradients, self.getState("update", weights))
+        return weights
+
 class SGD(Optimizer):
-    def __init__(self, learning_rate=0.01):
-        super().__init__(learning_rate)
+    def __init__(self, learning_rate=0.01, master_weights=False):
+        super().__init__(learning_rate, master_weights)
 
-    def update(self, weights, gradients):
-        return weights - self.learning_rate * gradients
+    def updateParameter(self, param, grad, state):
+        scratch = state["scratch"]
+        np.multiply(grad, self.learning_rate, out=scratch)
+        param -= scratch
+
+class Momentum(Optimizer):
+    def __init__(self, learning_rate=0.01, momentum=0.9, nesterov=False, master_weights=False):
+        super().__init__(learning_rate, master_weights)
+        self.momentum = momentum
+        self.nesterov = nesterov
+
+    def initState(self, param):
+        return {"velocity": np.zeros_like(param)}
+
+    def updateParameter(self, param, grad, state):
+        velocity, scratch = state["velocity"], state["scratch"]
+        velocity *= self.momentum
+        velocity += grad
+        if self.nesterov:
+            np.multiply(velocity, self.momentum, out=scratch)
+            scratch += grad
+        else:
+            np.copyto(scratch, velocity)
+        scratch *= self.learning_rate
+        param -= scratch
+
+class RMSprop(Optimizer):
+    def __init__(self, learning_rate=0.001, rho=0.9, epsilon=1e-8, master_weights=False):
+        super().__init__(learning_rate, master_weights)
+        self.rho = rho
+        self.epsilon = epsilon
+
+    def initState(self, param):
+        return {"r": np.zeros_like(param)}
+
+    def updateParameter(self, param, grad, state):
+        r, scratch = state["r"], state["scratch"]
+        np.multiply(grad, grad, out=scratch)
+        scratch *= 1 - self.rho
+        r *= self.rho
+        r += scratch
+        np.sqrt(r, out=scratch)
+        scratch += self.epsilon
+        np.divide(grad, scratch, out=scratch)
+        scratch *= self.learning_rate
+        param -= scratch
 
 class Adam(Optimizer):
-    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8):
-        super().__init__(learning_rate)
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8, master_weights=False):
+        super().__init__(learning_rate, master_weights)
         self.beta1 = beta1
         self.beta2 = beta2
         self.epsilon = epsilon
-        self.m = 0
-        self.v = 0
-        self.t = 0
 
-    def update(self, weights, gradients):
-        self.t += 1
-        self.m = self.beta1 * self.m + (1 - self.beta1) * gradients
-        self.v = self.beta2 * self.v + (1 - self.beta2) * (gradients ** 2)
-        m_hat = self.m / (1 - self.beta1 ** self.t)
-        v_hat = self.v / (1 - self.beta2 ** self.t)
-        return weights - self.learning_rate * m_hat / (np.sqrt(v_hat) + self.epsilon)
\ No newline at end of file
+    def initState(self, param):
+        return {"m": np.zeros_like(param), "v": np.zeros_like(param)}
+
+    def updateParameter(self, param, grad, state):
+        m, v, scratch = state["m"], state["v"], state["scratch"]
+
+        # m = beta1 * m + (1 - beta1) * g
+        m *= self.beta1
+        np.multiply(grad, 1 - self.beta1, out=scratch)
+        m += scratch
+
+        # v = beta2 * v + (1 - beta2) * g^2
+        v *= self.beta2
+        np.multiply(grad, grad, out=scratch)
+        scratch *= 1 - self.beta2
+        v += scratch
+
+        # param -= lr * m_hat / (sqrt(v_hat) + epsilon)
+        np.multiply(v, 1 / (1 - self.beta2 ** self.t), out=scratch)
+        np.sqrt(scratch, out=scratch)
+        scratch += self.epsilon
+        np.divide(m, scratch, out=scratch)
+        scratch *= self.learning_rate / (1 - self.beta1 ** self.t)
+        param -= scratch
+
+class AdamW(Adam):
+    def __init__(self, learning_rate=0.001, beta1=0.9, beta2=0.999, epsilon=1e-8, weight_decay=0.01,
+                 master_weights=False):
+        super().__init__(learning_rate, beta1, beta2, epsilon, master_weights)
+        self.weight_decay = weight_decay
+
+    def updateParameter(self, param, grad, state):
+        # Decoupled weight decay, applied before the Adam step
+        param *= 1 - self.learning_rate * self.weight_decay
+        super().updateParameter(param, grad, state)
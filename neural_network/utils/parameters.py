@@ -0,0 +1,98 @@
+# utils/parameters.py
+
+import numpy as np
+
+class ParameterBuffer:
+    def __init__(self, layers, dtype=None, buffer=None, grad_buffer=None):
+        """
+        Store the parameters of many layers, and their gradients, as views into
+        two contiguous 1-D arrays. Each layer's parameter attributes (and
+        `<name>Grad` buffers) are rebound to those views by
+        Layer.bindParameter, so layers keep working unchanged while
+        optimizers, clipping and checkpoints see a single array.
+
+        The buffer exposes getParameters()/getGradients() like a layer, so
+        `optimizer.step([buffer])` updates the whole model with a few
+        vectorized operations and keeps its moments contiguous too.
+
+        Args:
+            layers (list): Layers whose parameters are moved into the buffer
+            dtype: Storage dtype; defaults to the common dtype of the parameters
+            buffer: Optional writable memory (e.g. shared memory) to hold the
+                parameter values instead of a fresh allocation
+            grad_buffer: Optional writable memory to hold the gradients
+        """
+        self.layers = [layer for layer in layers if layer.getParameters()]
+        params = [(layer, name, value) for layer in self.layers
+                  for name, value in layer.getParameters().items()]
+        if dtype is None:
+            dtype = np.result_type(*[value for _, _, value in params]) if params else np.float64
+        self.dtype = np.dtype(dtype)
+
+        self.entries = []
+        offset = 0
+        for layer, name, value in params:
+            self.entries.append((layer, name, offset, value.shape))
+            offset += value.size
+        self.size = offset
+
+        if buffer is None:
+            self.data = np.empty(self.size, dtype=self.dtype)
+        else:
+            self.data = np.frombuffer(buffer, dtype=self.dtype, count=self.size)
+        if grad_buffer is None:
+            self.grad = np.zeros(self.size, dtype=self.dtype)
+        else:
+            self.grad = np.frombuffer(grad_buffer, dtype=self.dtype, count=self.size)
+            self.grad.fill(0)
+
+        for (layer, name, start, shape), (_, _, value) in zip(self.entries, params):
+            view = self.view(self.data, start, shape)
+            view[...] = value
+            layer.bindParameter(name, view, self.view(self.grad, start, shape), self)
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def view(self, flat, start, shape):
+        return flat[start:start + int(np.prod(shape))].reshape(shape)
+
+    def __len__(self):
+        return self.size
+
+    def getParameters(self):
+        return {"flat": self.data}
+
+    def getGradients(self):
+        return {"flat": self.grad}
+
+    def zeroGrad(self):
+        self.grad.fill(0)
+
+    def globalNorm(self):
+        """L2 norm of all gradients together."""
+        return float(np.sqrt(np.dot(self.grad, self.grad)))
+
+    def clipGradNorm(self, maxNorm):
+        """
+        Scale all gradients so their global L2 norm is at most maxNorm.
+
+        Returns:
+            The norm before clipping
+        """
+        norm = self.globalNorm()
+        if norm > maxNorm:
+            self.grad *= maxNorm / (norm + 1e-12)
+        return norm
+
+    def saveState(self, out=None):
+        """Copy all parameter values out in one memcpy."""
+        if out is None:
+            return self.data.copy()
+        np.copyto(out, self.data)
+        return out
+
+    def loadState(self, state):
+        """Overwrite all parameter values from a flat array in one memcpy."""
+        np.copyto(self.data, state)
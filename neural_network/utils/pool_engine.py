@@ -0,0 +1,91 @@
+# utils/pool_engine.py
+
+from .windows import allocate, window_view, window_scatter_add
+import numpy as np
+
+# Batched pooling engine operating on whole (N, C, H, W) batches through a
+# sliding-window view. Max pooling returns the in-window argmax so backward
+# can scatter gradients without searching the windows again. Window sizes
+# may be an int or an (h, w) tuple. As in the conv engine, `scratch` is an
+# optional allocator scratch(tag, shape, dtype) for reusable buffers.
+
+def window_shape(size):
+    """Normalise a pooling size to an (h, w) tuple."""
+    return (size, size) if np.isscalar(size) else tuple(size)
+
+def max_pool_forward(dataIn, size, stride=1, scratch=None):
+    """
+    Max pooling over every channel of every sample at once.
+
+    Args:
+        dataIn: Input of shape (N, C, H, W)
+        size (int or tuple): Pooling window size
+        stride (int): Pooling stride
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Tuple of the pooled output (N, C, oh, ow) and the flat in-window
+        argmax of each output, used by max_pool_backward
+    """
+    scratch = scratch or allocate
+    kh, kw = window_shape(size)
+    windows = window_view(dataIn, kh, kw, stride)
+    flat = scratch("cols", windows.shape[:4] + (kh * kw,), dataIn.dtype)
+    np.copyto(flat.reshape(windows.shape), windows)
+
+    argmax = scratch("argmax", flat.shape[:4], np.intp)
+    np.argmax(flat, axis=-1, out=argmax)
+    out = scratch("out", flat.shape[:4], dataIn.dtype)
+    np.max(flat, axis=-1, out=out)
+    if kh * kw <= np.iinfo(np.uint8).max + 1:
+        small = scratch("argmax8", argmax.shape, np.uint8)
+        np.copyto(small, argmax, casting="unsafe")
+        argmax = small
+    return out, argmax
+
+def max_pool_backward(gradIn, argmax, inputShape, size, stride=1, scratch=None):
+    """
+    Route each output gradient to the input position that won its window.
+
+    Args:
+        gradIn: Gradient w.r.t. the pooled output, shape (N, C, oh, ow)
+        argmax: In-window argmax returned by max_pool_forward
+        inputShape (tuple): Shape (N, C, H, W) of the pooled input
+        size (int or tuple): Pooling window size
+        stride (int): Pooling stride
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        Gradient of shape (N, C, H, W)
+    """
+    scratch = scratch or allocate
+    kh, kw = window_shape(size)
+    N, C, H, W = inputShape
+    oh, ow = gradIn.shape[-2:]
+    argmax = argmax.astype(np.intp)
+    index = (np.arange(N * C).reshape(N, C, 1, 1) * (H * W)
+             + (np.arange(oh) * stride * W)[:, np.newaxis]
+             + np.arange(ow) * stride
+             + (argmax // kw) * W + argmax % kw)
+
+    if stride >= max(kh, kw):
+        # Windows do not overlap, so every input receives at most one gradient
+        out = scratch("grad", (N * C * H * W,), gradIn.dtype)
+        out.fill(0)
+        out[index.ravel()] = gradIn.ravel()
+    else:
+        out = np.bincount(index.ravel(), weights=gradIn.ravel(),
+                          minlength=N * C * H * W).astype(gradIn.dtype, copy=False)
+    return out.reshape(inputShape)
+
+def avg_pool_forward(dataIn, size, stride=1):
+    """Average pooling of an (N, C, H, W) batch; returns (N, C, oh, ow)."""
+    kh, kw = window_shape(size)
+    return window_view(dataIn, kh, kw, stride).mean(axis=(4, 5))
+
+def avg_pool_backward(gradIn, inputShape, size, stride=1):
+    """Spread each output gradient evenly over its window."""
+    kh, kw = window_shape(size)
+    share = (gradIn / (kh * kw))[..., np.newaxis, np.newaxis]
+    windows = np.broadcast_to(share, gradIn.shape + (kh, kw))
+    return window_scatter_add(windows, inputShape, stride)
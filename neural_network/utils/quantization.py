@@ -0,0 +1,149 @@
+# utils/quantization.py
+
+import numpy as np
+
+from .windows import allocate
+
+# Symmetric int8 quantization: a real value x is stored as q = round(x / scale)
+# clipped to [-QMAX, QMAX], so zero is exact and no zero point is needed.
+# Weights get one scale per output channel, activations one per tensor.
+QMAX = 127
+
+# NumPy has no BLAS kernel for integer matrix products; its int32 matmul is
+# two orders of magnitude slower than a float32 GEMM. A float32 dot product
+# of int8 values is exact as long as every partial sum stays below 2**24, so
+# int8_matmul runs float32 GEMMs over K-blocks of at most EXACT_BLOCK terms
+# and adds the blocks in int32: the result is int32 accumulation bit for bit.
+EXACT_BLOCK = 2**24 // QMAX**2
+
+def quantize_weights(weights, axis):
+    """
+    Per-channel symmetric int8 quantization.
+
+    Args:
+        weights: Float array
+        axis (int): Output-channel axis; each index along it gets its own scale
+
+    Returns:
+        (int8 array of weights' shape, float32 scales of shape (weights.shape[axis],))
+    """
+    weights = np.asarray(weights)
+    axis = axis % weights.ndim
+    others = tuple(i for i in range(weights.ndim) if i != axis)
+    peak = np.max(np.abs(weights), axis=others)
+    scales = np.where(peak > 0, peak / QMAX, 1.0).astype(np.float32)
+    shape = [1] * weights.ndim
+    shape[axis] = -1
+    q = np.clip(np.rint(weights / scales.reshape(shape)), -QMAX, QMAX)
+    return q.astype(np.int8), scales
+
+def activation_scale(peak):
+    """Per-tensor scale mapping [-peak, peak] onto the int8 range."""
+    return float(peak) / QMAX if peak > 0 else 1.0
+
+def quantize_activations(dataIn, scale, out=None):
+    """
+    round(dataIn / scale) clipped to the int8 range, held in a float32 array
+    (every value is an integer) ready to be a GEMM operand of int8_matmul.
+    """
+    if out is None:
+        out = np.empty(np.shape(dataIn), dtype=np.float32)
+    np.multiply(dataIn, 1 / scale, out=out, casting="same_kind")
+    np.rint(out, out=out)
+    return np.clip(out, -QMAX, QMAX, out=out)
+
+def int8_matmul(a, b, scratch=None):
+    """
+    Exact int32 product of int8-valued matrices.
+
+    Args:
+        a: (M, K) float32 array of int8 values, e.g. from quantize_activations
+        b: (K, N) int8 array
+        scratch: Optional allocator scratch(tag, shape, dtype)
+
+    Returns:
+        (M, N) int32 array
+    """
+    scratch = scratch or allocate
+    (M, K), N = a.shape, b.shape[1]
+    out = scratch("acc", (M, N), np.int32)
+    partial = scratch("partial", (M, N), np.float32)
+    # Weights are widened one block at a time, so only int8 storage stays resident
+    block = scratch("block", (min(K, EXACT_BLOCK), N), np.float32)
+    for start in range(0, K, EXACT_BLOCK):
+        stop = min(start + EXACT_BLOCK, K)
+        rows = block[:stop - start]
+        np.copyto(rows, b[start:stop], casting="unsafe")
+        np.matmul(a[:, start:stop], rows, out=partial)
+        if start == 0:
+            np.copyto(out, partial, casting="unsafe")
+        else:
+            np.add(out, partial, out=out, casting="unsafe")
+    return out
+
+class RangeObserver:
+    def __init__(self, percentile=100.0):
+        """
+        Tracks the magnitude an activation reaches over calibration batches.
+        With percentile < 100, each batch contributes that percentile of |x|
+        instead of its maximum, so rare outliers do not stretch the scale;
+        the observed range is the largest contribution of any batch.
+
+        Args:
+            percentile (float): Percentile of |x| taken per batch
+        """
+        self.percentile = percentile
+        self.peak = 0.0
+
+    def update(self, batch):
+        magnitude = np.abs(np.asarray(batch))
+        value = magnitude.max() if self.percentile >= 100 else np.percentile(magnitude, self.percentile)
+        self.peak = max(self.peak, float(value))
+        return self
+
+    def scale(self):
+        return activation_scale(self.peak)
+
+def model_bytes(model):
+    """Bytes of every parameter and state tensor of a model's layers."""
+    return sum(int(np.asarray(value).nbytes) for layer in model.layers for value in layer.getTensors().values())
+
+def quantization_report(model, quantized, X, Y=None, objective=None, batch_size=None):
+    """
+    How much a quantized model differs from the float model it came from.
+
+    Args:
+        model (Sequential): The float model
+        quantized (Sequential): Its quantized counterpart
+        X: Evaluation inputs, ideally not the calibration sample
+        Y: Optional targets, one-hot or integer labels for classifiers
+        objective: Optional objective to evaluate both models with on (X, Y)
+        batch_size (int): Prediction batch size
+
+    Returns:
+        Dict with the output error (max_abs_error and the normwise
+        relative_error), the models' tensor bytes and their ratio, and with Y
+        the accuracy of both models and its delta (for outputs with more
+        than one column) and, with an objective, both losses and their delta
+    """
+    expected = np.asarray(model.predict(X, batch_size), dtype=np.float64)
+    actual = np.asarray(quantized.predict(X, batch_size), dtype=np.float64)
+    error = np.abs(actual - expected)
+    floatBytes, quantizedBytes = model_bytes(model), model_bytes(quantized)
+    report = {
+        "max_abs_error": float(error.max()),
+        "relative_error": float(error.max() / max(np.abs(expected).max(), 1e-300)),
+        "float_bytes": floatBytes,
+        "quantized_bytes": quantizedBytes,
+        "compression": floatBytes / max(quantizedBytes, 1),
+    }
+    if Y is not None and expected.ndim == 2 and expected.shape[1] > 1:
+        labels = np.argmax(Y, axis=1) if np.ndim(Y) == 2 else np.asarray(Y)
+        report["float_accuracy"] = float(np.mean(np.argmax(expected, axis=1) == labels))
+        report["quantized_accuracy"] = float(np.mean(np.argmax(actual, axis=1) == labels))
+        report["accuracy_delta"] = report["quantized_accuracy"] - report["float_accuracy"]
+    if Y is not None and objective is not None:
+        report["float_loss"] = float(objective.eval(Y, expected))
+        report["quantized_loss"] = float(objective.eval(Y, actual))
+        report["loss_delta"] = report["quantized_loss"] - report["float_loss"]
+    return report
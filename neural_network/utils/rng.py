@@ -0,0 +1,83 @@
+# utils/rng.py
+
+import numpy as np
+
+def draw_seed():
+    """
+    A seed taken from NumPy's global RNG. Streams created without a seed use
+    one, so np.random.seed() before building a model still makes it
+    reproducible; the global RNG is only read once, at construction.
+    """
+    return int(np.random.randint(0, 2**31 - 1))
+
+class RandomStream:
+    def __init__(self, seed=None, stream=0, replica=0):
+        """
+        Counter-based random numbers for one layer. Each (seed, stream,
+        replica) triple is an independent Philox key and each step owns a
+        2**192-long block of that key's counter space, so what is drawn at a
+        step depends only on (seed, stream, replica, step): not on call order,
+        on other layers, or on which thread or process draws it. NumPy's
+        global RNG is never touched after construction.
+
+        Args:
+            seed (int): Base seed; drawn from the global RNG if None
+            stream (int): Stream id, e.g. the layer's index in its model
+            replica (int): Data-parallel worker id, so replicas draw
+                different numbers for their shards
+        """
+        self.seed = draw_seed() if seed is None else int(seed)
+        self.stream = stream
+        self.replica = replica
+        self.key = np.random.SeedSequence([self.seed, stream, replica]).generate_state(2, np.uint64)
+        self.step = 0
+
+    def generator(self, step=None):
+        """A Generator positioned at the start of `step` (default: the current step)."""
+        step = self.step if step is None else step
+        counter = np.array([0, 0, 0, step], dtype=np.uint64)
+        return np.random.Generator(np.random.Philox(counter=counter, key=self.key))
+
+    def next(self):
+        """The generator for the current step; the stream then moves to the next step."""
+        generator = self.generator()
+        self.step += 1
+        return generator
+
+    def fork(self, replica):
+        """The same stream for another data-parallel replica, at the same step."""
+        forked = RandomStream(self.seed, self.stream, replica)
+        forked.step = self.step
+        return forked
+
+def bernoulli(generator, p, shape=None, out=None, scratch=None):
+    """
+    Boolean mask that is True with probability p.
+
+    Args:
+        generator: np.random.Generator to draw from
+        p (float): Probability of True
+        shape (tuple): Mask shape, if out is not given
+        out: Preallocated bool array to write the mask into
+        scratch: Preallocated float32 array of the same shape for the uniform draws
+
+    Returns:
+        The mask (out, if given)
+    """
+    if out is None:
+        out = np.empty(shape, dtype=bool)
+    if scratch is None:
+        scratch = np.empty(out.shape, dtype=np.float32)
+    generator.random(dtype=np.float32, out=scratch)
+    return np.less(scratch, p, out=out)
+
+def packed_bernoulli(generator, p, shape):
+    """
+    A bernoulli mask over the flattened shape packed eight elements per byte
+    (np.packbits order); recover it with np.unpackbits(packed, count=size).
+    For p = 0.5 random bytes already are such a mask and are drawn directly.
+    """
+    size = int(np.prod(shape))
+    if p == 0.5:
+        return generator.integers(0, 256, size=-(-size // 8), dtype=np.uint8)
+    return np.packbits(bernoulli(generator, p, (size,)))
@@ -0,0 +1,194 @@
+# utils/serving.py
+
+import asyncio
+import collections
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+class BatchingServer:
+    def __init__(self, model, max_batch_size=32, max_delay=0.002, latency_window=100000):
+        """
+        asyncio front end that serves single-sample requests with batched
+        forward passes. Requests wait in a queue until max_batch_size of them
+        have arrived or the oldest has waited max_delay seconds; the batch is
+        then stacked (one stack per sample shape, so a malformed request
+        only fails its own) and run through model.predict (inference mode,
+        no activation caching) on a dedicated worker thread, so the event
+        loop keeps accepting requests while the model runs.
+
+        Use inside a running event loop:
+
+            async with BatchingServer(model) as server:
+                y = await server.predict(x)
+
+        Args:
+            model: Object with predict(X), e.g. a Sequential
+            max_batch_size (int): Largest micro-batch
+            max_delay (float): Longest time in seconds a request waits for others
+            latency_window (int): Number of recent latencies kept for percentiles
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.latencies = collections.deque(maxlen=latency_window)
+        self.queue = None
+        self.task = None
+        self.executor = None
+        self.resetStats()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def start(self):
+        if self.task is not None:
+            return
+        self.queue = asyncio.Queue()
+        # One thread: forward passes run one at a time, and inference_mode's
+        # shared buffers are per thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        self.task = asyncio.get_running_loop().create_task(self.serve())
+
+    async def stop(self):
+        """Finish the requests already queued, then stop the batching task and worker thread."""
+        if self.task is None:
+            return
+        await self.queue.put(None)
+        await self.task
+        self.executor.shutdown()
+        self.task = self.executor = None
+
+    async def predict(self, sample):
+        """Model output for one sample (without a batch axis)."""
+        if self.task is None:
+            raise RuntimeError("BatchingServer is not running; use 'async with' or start()")
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((np.asarray(sample), future, time.perf_counter()))
+        return await future
+
+    async def collect(self, first):
+        """A micro-batch: `first` plus whatever arrives before the size limit or deadline."""
+        batch = [first]
+        deadline = first[2] + self.max_delay
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get_nowait() if remaining <= 0 else \
+                    await asyncio.wait_for(self.queue.get(), remaining)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+            if item is None:
+                # Put the stop marker back so serve() sees it after this batch
+                self.queue.put_nowait(None)
+                break
+            batch.append(item)
+        return batch
+
+    async def serve(self):
+        while True:
+            first = await self.queue.get()
+            if first is None:
+                return
+            batch = await self.collect(first)
+            # Samples of another shape cannot be stacked with the rest; each
+            # shape runs as its own batch so a malformed request only fails
+            # the requests shaped like it
+            groups = {}
+            for item in batch:
+                groups.setdefault(item[0].shape, []).append(item)
+            for group in groups.values():
+                await self.run(group)
+
+    async def run(self, batch):
+        """Stack a micro-batch of same-shape samples, predict it and resolve its futures."""
+        try:
+            X = np.stack([sample for sample, _, _ in batch])
+            out = await asyncio.get_running_loop().run_in_executor(self.executor, self.model.predict, X)
+        except Exception as error:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        now = time.perf_counter()
+        for i, (_, future, enqueued) in enumerate(batch):
+            self.latencies.append(now - enqueued)
+            if not future.done():
+                future.set_result(out[i])
+        self.requests += len(batch)
+        self.batches += 1
+        self.firstArrival = min(self.firstArrival, batch[0][2])
+        self.lastCompletion = now
+
+    def resetStats(self):
+        self.latencies.clear()
+        self.requests = 0
+        self.batches = 0
+        self.firstArrival = float("inf")
+        self.lastCompletion = 0.0
+
+    def stats(self):
+        """
+        Served requests and batches, mean batch size, throughput in requests
+        per second since the first request (or last resetStats), and latency
+        percentiles in milliseconds over the recent window.
+        """
+        elapsed = self.lastCompletion - self.firstArrival
+        latencies = np.array(self.latencies) * 1e3
+        percentiles = np.percentile(latencies, [50, 90, 99]) if len(latencies) else [float("nan")] * 3
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "throughput_rps": self.requests / elapsed if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "p50": float(percentiles[0]),
+                "p90": float(percentiles[1]),
+                "p99": float(percentiles[2]),
+                "max": float(latencies.max()) if len(latencies) else float("nan"),
+            },
+        }
+
+async def synthetic_load(server, X, requests=1000, concurrency=64, rate=None, seed=0):
+    """
+    Drive a server with single-sample requests drawn from X.
+
+    Args:
+        server: Object with an async predict(sample)
+        X: Pool of samples to draw requests from
+        requests (int): Total number of requests
+        concurrency (int): Closed loop: number of clients that each send a
+            new request as soon as their previous one returns
+        rate (float): Open loop instead: Poisson arrivals at this many
+            requests per second, regardless of completions
+        seed (int): Seed for sample choice and arrival times
+
+    Returns:
+        The wall time in seconds to serve all requests
+    """
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(X), requests)
+    start = time.perf_counter()
+
+    if rate is not None:
+        pending = []
+        arrivals = np.cumsum(rng.exponential(1 / rate, requests))
+        for pick, arrival in zip(picks, arrivals):
+            delay = start + arrival - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            pending.append(asyncio.ensure_future(server.predict(X[pick])))
+        await asyncio.gather(*pending)
+    else:
+        picks = iter(picks)
+
+        async def client():
+            for pick in picks:
+                await server.predict(X[pick])
+
+        await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start
@@ -0,0 +1,70 @@
+# utils/statistics.py
+
+import numpy as np
+
+class RunningStatistics:
+    def __init__(self, shape=None):
+        """
+        Per-feature mean and variance accumulated one batch at a time with
+        Welford's update, so statistics of a dataset far larger than memory
+        can be computed in a single streaming pass. Batches are folded in with
+        the pairwise form of the update (batch mean and sum of squared
+        deviations), which is as stable as the per-sample recurrence, and
+        partial statistics of different shards or workers can be merged.
+
+        Accumulation is always in float64.
+
+        Args:
+            shape (tuple): Feature shape; inferred from the first batch if omitted
+        """
+        self.count = 0
+        self.mean = None if shape is None else np.zeros(shape)
+        self.M2 = None if shape is None else np.zeros(shape)
+
+    def update(self, batch):
+        """Fold a batch (samples along the first axis) into the statistics."""
+        batch = np.asarray(batch)
+        n = len(batch)
+        if n == 0:
+            return self
+        batchMean = np.mean(batch, axis=0, dtype=np.float64)
+        deviation = batch - batchMean
+        return self.combine(n, batchMean, np.einsum("i...,i...->...", deviation, deviation))
+
+    def merge(self, other):
+        """
+        Fold in statistics accumulated separately, e.g. over another data
+        shard or by another worker, with Chan et al.'s parallel update. The
+        result is the same as if every sample had gone through one object.
+        """
+        if other.count == 0:
+            return self
+        return self.combine(other.count, other.mean, other.M2)
+
+    @classmethod
+    def merged(cls, parts):
+        """One RunningStatistics holding all of `parts`, which are left unchanged."""
+        total = cls()
+        for part in parts:
+            total.merge(part)
+        return total
+
+    def combine(self, n, mean, M2):
+        """Fold in n samples with the given mean and sum of squared deviations."""
+        if self.mean is None:
+            self.mean = np.zeros(np.shape(mean))
+            self.M2 = np.zeros(np.shape(mean))
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * (n / total)
+        self.M2 += M2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        return self
+
+    def variance(self, ddof=1):
+        if self.count <= ddof:
+            raise ValueError(f"need more than {ddof} samples, got {self.count}")
+        return self.M2 / (self.count - ddof)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
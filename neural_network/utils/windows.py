@@ -0,0 +1,92 @@
+# utils/windows.py
+
+import numpy as np
+
+def pair(value):
+    """Normalise an int or (h, w) spatial parameter to an (h, w) tuple."""
+    return (value, value) if np.isscalar(value) else tuple(value)
+
+def output_size(size, kernel, stride=1, padding=0, dilation=1):
+    """Number of window positions along one spatial axis."""
+    return (size - dilation * (kernel - 1) - 1 + 2 * padding) // stride + 1
+
+def allocate(tag, shape, dtype):
+    """Default scratch allocator for the engines: a fresh uninitialised array."""
+    return np.empty(shape, dtype=dtype)
+
+def pad2D(dataIn, padding, scratch=None):
+    """
+    Zero-pad the last two axes of an array.
+
+    Args:
+        dataIn: Array whose last two axes are spatial
+        padding (int or tuple): Zeros added on each side, per axis if a tuple
+        scratch: Optional allocator scratch(tag, shape, dtype) for the result
+    """
+    ph, pw = pair(padding)
+    if ph == 0 and pw == 0:
+        return dataIn
+    if scratch is None:
+        pad_dims = [(0, 0)] * (dataIn.ndim - 2) + [(ph, ph), (pw, pw)]
+        return np.pad(dataIn, pad_dims)
+    H, W = dataIn.shape[-2:]
+    out = scratch("pad", dataIn.shape[:-2] + (H + 2 * ph, W + 2 * pw), dataIn.dtype)
+    # Scratch contents are undefined, so the border is cleared every time
+    out[..., :ph, :] = 0
+    out[..., H + ph:, :] = 0
+    out[..., :, :pw] = 0
+    out[..., :, W + pw:] = 0
+    out[..., ph:ph + H, pw:pw + W] = dataIn
+    return out
+
+def window_view(dataIn, kh, kw, stride=1, dilation=1):
+    """
+    Read-only sliding-window view over the spatial axes of a batch.
+
+    Args:
+        dataIn: Array of shape (N, C, H, W)
+        kh (int): Window height
+        kw (int): Window width
+        stride (int or tuple): Step between windows
+        dilation (int or tuple): Step between the taps inside a window
+
+    Returns:
+        View of shape (N, C, oh, ow, kh, kw); no data is copied
+    """
+    N, C, H, W = dataIn.shape
+    (strideH, strideW), (dilationH, dilationW) = pair(stride), pair(dilation)
+    oh = output_size(H, kh, strideH, dilation=dilationH)
+    ow = output_size(W, kw, strideW, dilation=dilationW)
+    sn, sc, sh, sw = dataIn.strides
+    return np.lib.stride_tricks.as_strided(
+        dataIn,
+        shape=(N, C, oh, ow, kh, kw),
+        strides=(sn, sc, sh * strideH, sw * strideW, sh * dilationH, sw * dilationW),
+        writeable=False,
+    )
+
+def window_scatter_add(windows, shape, stride=1, out=None, dilation=1):
+    """
+    Sum per-window values back onto the array they were taken from (col2im).
+
+    Args:
+        windows: Array of shape (N, C, oh, ow, kh, kw)
+        shape (tuple): Shape (N, C, H, W) of the destination array
+        stride (int or tuple): Stride used to build the windows
+        out: Optional destination array; it is zeroed first
+        dilation (int or tuple): Dilation used to build the windows
+
+    Returns:
+        Array of the given shape where overlapping window entries are summed
+    """
+    _, _, oh, ow, kh, kw = windows.shape
+    (strideH, strideW), (dilationH, dilationW) = pair(stride), pair(dilation)
+    if out is None:
+        out = np.zeros(shape, dtype=windows.dtype)
+    else:
+        out.fill(0)
+    for i in range(kh):
+        for j in range(kw):
+            y, x = i * dilationH, j * dilationW
+            out[:, :, y:y + strideH * (oh - 1) + 1:strideH, x:x + strideW * (ow - 1) + 1:strideW] += windows[:, :, :, :, i, j]
+    return out